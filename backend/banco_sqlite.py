@@ -0,0 +1,49 @@
+"""
+Inicialização do banco SQLite.
+
+Ativa o WAL (leitores não bloqueiam o escritor), aplica os PRAGMAs do perfil
+de configuração a cada conexão do pool e executa 'PRAGMA optimize' quando o
+processo encerra, para que o planejador mantenha estatísticas atualizadas.
+"""
+import atexit
+from sqlalchemy import event
+from backend.models.database import db
+
+
+def _aplicar_pragmas(pragmas):
+    def _ao_conectar(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for nome, valor in pragmas.items():
+                cursor.execute(f"PRAGMA {nome}={valor}")
+        finally:
+            cursor.close()
+    return _ao_conectar
+
+
+def _otimizar(app):
+    try:
+        with app.app_context():
+            with db.engine.connect() as connection:
+                connection.exec_driver_sql("PRAGMA optimize")
+            db.engine.dispose()
+    except Exception as e:
+        app.logger.warning(f"PRAGMA optimize não executado: {e}")
+
+
+def init_app(app):
+    """Registra os PRAGMAs no engine da aplicação (somente SQLite)."""
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name != 'sqlite':
+        return
+
+    event.listen(engine, 'connect', _aplicar_pragmas(app.config.get('SQLITE_PRAGMAS', {})))
+
+    journal_mode = app.config.get('SQLITE_JOURNAL_MODE')
+    if journal_mode and engine.url.database not in (None, '', ':memory:'):
+        with engine.connect() as connection:
+            connection.exec_driver_sql(f"PRAGMA journal_mode={journal_mode}")
+
+    if app.config.get('SQLITE_OPTIMIZE_AO_ENCERRAR'):
+        atexit.register(_otimizar, app)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos índices compostos (migração 3e7b5c1d9a24).
+
+Cria um banco SQLite temporário com volume de produção (dados sintéticos do seed-bench:
+vários pelotões, um ano de semanas e a grade cheia), mede a latência das telas mais usadas
+sem os índices secundários e, em seguida, com eles.
+Execute: python backend/bench_indices.py [--pelotoes 12] [--semanas 40] [--repeticoes 30]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmp = tempfile.mkdtemp(prefix='bench_indices_')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_tmp, 'bench.db')
+os.environ['SITE_CONFIG_VERSION_FILE'] = os.path.join(_tmp, 'site_config.version')
+os.environ.setdefault('APP_CONFIG', 'bench')
+
+from sqlalchemy import select, text
+from backend.app import create_app
+from backend.models.database import db
+from backend.models.user import User
+from backend.models.instrutor import Instrutor
+from backend.models.turma import Turma
+from backend.models.semana import Semana
+from backend.models.disciplina_turma import DisciplinaTurma
+from backend.models.horario import Horario
+from backend.models.historico_disciplina import HistoricoDisciplina
+from backend.dados_sinteticos import popular as popular_sintetico
+
+app = create_app()
+
+TABELAS_INDEXADAS = [Horario, DisciplinaTurma, HistoricoDisciplina, Semana]
+AULAS_POR_SEMANA = 30
+
+
+def popular(n_pelotoes, n_semanas):
+    resumo = popular_sintetico(pelotoes=n_pelotoes, semanas=n_semanas, alunos=0, disciplinas=120,
+                               horarios=n_pelotoes * n_semanas * AULAS_POR_SEMANA)
+    admin_id = db.session.scalar(select(User.id).where(User.role == 'admin'))
+    instrutor_user_id = db.session.scalar(select(Instrutor.user_id).order_by(Instrutor.id))
+    turma_ids = db.session.scalars(select(Turma.id).order_by(Turma.id)).all()
+    semanas = db.session.execute(select(Semana.id, Semana.ciclo).order_by(Semana.id)).all()
+    return admin_id, instrutor_user_id, turma_ids, semanas, resumo['horarios']
+
+
+def indices():
+    return [indice for modelo in TABELAS_INDEXADAS for indice in modelo.__table__.indexes]
+
+
+def medir(cliente, rotas, repeticoes):
+    resultados = {}
+    for nome, metodo, url, dados in rotas:
+        tempos = []
+        for _ in range(repeticoes):
+            t0 = time.perf_counter()
+            resposta = cliente.open(url, method=metodo, data=dados)
+            tempos.append((time.perf_counter() - t0) * 1000)
+            assert resposta.status_code == 200, f"{nome}: HTTP {resposta.status_code}"
+        tempos.sort()
+        resultados[nome] = (statistics.median(tempos), tempos[int(len(tempos) * 0.95) - 1])
+    return resultados
+
+
+def cliente_logado(user_id):
+    cliente = app.test_client()
+    with cliente.session_transaction() as sessao:
+        sessao['_user_id'] = str(user_id)
+        sessao['_fresh'] = True
+    return cliente
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pelotoes', type=int, default=12)
+    parser.add_argument('--semanas', type=int, default=40)
+    parser.add_argument('--repeticoes', type=int, default=30)
+    args = parser.parse_args()
+
+    app.config['WTF_CSRF_ENABLED'] = False
+    with app.app_context():
+        print(f"Populando banco em {_tmp} ...")
+        admin_id, instrutor_user_id, turma_ids, semanas, total = popular(args.pelotoes, args.semanas)
+        print(f"{len(turma_ids)} pelotões, {len(semanas)} semanas, {total} aulas.\n")
+
+        turma_id = turma_ids[len(turma_ids) // 2]
+        semana = semanas[len(semanas) // 2]
+        relatorio = {'data_inicio': '2025-03-01', 'data_fim': '2025-03-31', 'action': 'preview', 'curso_nome': 'Bench'}
+        rotas_admin = [
+            ('quadro (admin)', 'GET', f'/horario/{turma_id}?semana_id={semana.id}&ciclo={semana.ciclo}', None),
+            ('editor (admin)', 'GET', f'/horario/editar/{turma_id}/{semana.id}/{semana.ciclo}', None),
+            ('relatório mensal', 'POST', '/relatorios/gerar?tipo=mensal', relatorio),
+        ]
+        rotas_instrutor = [
+            ('quadro (instrutor)', 'GET', f'/horario/{turma_id}?semana_id={semana.id}&ciclo={semana.ciclo}', None),
+            ('editor (instrutor)', 'GET', f'/horario/editar/{turma_id}/{semana.id}/{semana.ciclo}', None),
+        ]
+
+    def rodada():
+        # Fora de um app_context, para que cada requisição tenha sessão e usuário próprios
+        resultado = medir(cliente_logado(admin_id), rotas_admin, args.repeticoes)
+        resultado.update(medir(cliente_logado(instrutor_user_id), rotas_instrutor, args.repeticoes))
+        return resultado
+
+    def alternar_indices(criar):
+        with app.app_context():
+            for indice in indices():
+                if criar:
+                    indice.create(db.engine, checkfirst=True)
+                else:
+                    indice.drop(db.engine, checkfirst=True)
+            db.session.execute(text('ANALYZE'))
+            db.session.commit()
+
+    alternar_indices(criar=False)
+    antes = rodada()
+    alternar_indices(criar=True)
+    depois = rodada()
+
+    print(f"{'tela':<22}{'sem índices (mediana/p95 ms)':>32}{'com índices (mediana/p95 ms)':>32}")
+    for nome in antes:
+        a, d = antes[nome], depois[nome]
+        print(f"{nome:<22}{a[0]:>20.1f} / {a[1]:<9.1f}{d[0]:>20.1f} / {d[1]:<9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark do tempo de inicialização.
+
+Mede, em processos novos (partida a frio), a importação do módulo da
+aplicação, a criação da app como num worker WSGI e os comandos 'flask' mais
+simples. Também confere que a importação não cria a app e que o worker não
+carrega dependências pesadas (Alembic, WeasyPrint, Pillow, openpyxl).
+Com --salvar grava a linha de base em JSON; com --comparar termina com
+código 1 se algum cenário piorar além da tolerância.
+
+Execute: python backend/bench_inicializacao.py [--repeticoes 10]
+         [--salvar base.json | --comparar base.json] [--tolerancia 0.2]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Não devem ser carregados ao subir um worker web
+MODULOS_PESADOS = ['flask_migrate', 'alembic', 'weasyprint', 'PIL', 'openpyxl']
+
+_PYTHON = [sys.executable, '-c']
+_FLASK = [sys.executable, '-m', 'flask']
+
+CENARIOS = [
+    ('python (referência)', _PYTHON + ['pass']),
+    ('import backend.app', _PYTHON + ['import backend.app']),
+    ('create_app() (worker web)', _PYTHON + ['from backend.app import create_app; create_app()']),
+    ('flask --help', _FLASK + ['--help']),
+    ('flask routes', _FLASK + ['routes']),
+]
+
+_VERIFICACAO = f"""
+import sys
+import backend.app
+assert not hasattr(backend.app, 'app'), 'backend.app cria a aplicação ao ser importado'
+backend.app.create_app()
+carregados = [m for m in {MODULOS_PESADOS!r} if m in sys.modules]
+assert not carregados, 'create_app() carregou: ' + ', '.join(carregados)
+"""
+
+
+def _argumentos():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeticoes', type=int, default=10)
+    parser.add_argument('--salvar', metavar='JSON', help='Grava o resultado como linha de base.')
+    parser.add_argument('--comparar', metavar='JSON', help='Compara com uma linha de base gravada.')
+    parser.add_argument('--tolerancia', type=float, default=0.2, help='Piora aceitável da mediana (0.2 = 20%%).')
+    return parser.parse_args()
+
+
+def _ambiente():
+    tmp = tempfile.mkdtemp(prefix='bench_inicializacao_')
+    env = dict(os.environ)
+    env.update({
+        'DATABASE_URL': 'sqlite:///' + os.path.join(tmp, 'bench.db'),
+        'SITE_CONFIG_VERSION_FILE': os.path.join(tmp, 'site_config.version'),
+        'APP_CONFIG': 'bench',
+        'FLASK_APP': 'backend.app:create_app(cli=True)',
+        'PYTHONPATH': RAIZ,
+    })
+    env.pop('FLASK_DEBUG', None)
+    return env
+
+
+def _executar(comando, env):
+    resultado = subprocess.run(comando, cwd=RAIZ, env=env, capture_output=True, text=True)
+    if resultado.returncode != 0:
+        raise SystemExit(f"Falha ao executar {' '.join(comando[1:])}:\n{resultado.stderr}")
+
+
+def verificar(env):
+    _executar(_PYTHON + [_VERIFICACAO], env)
+    print("Importação sem efeitos colaterais e worker sem dependências pesadas: OK")
+
+
+def medir(repeticoes, env):
+    resultados = {}
+    for nome, comando in CENARIOS:
+        _executar(comando, env)  # aquecimento (bytecode e cache de disco)
+        tempos = []
+        for _ in range(repeticoes):
+            t0 = time.perf_counter()
+            _executar(comando, env)
+            tempos.append((time.perf_counter() - t0) * 1000)
+        resultados[nome] = {
+            'mediana_ms': round(statistics.median(tempos), 1),
+            'max_ms': round(max(tempos), 1),
+        }
+    return resultados
+
+
+def comparar(resultados, base, tolerancia):
+    regressoes = []
+    print(f"\n{'cenário':<30}{'mediana base':>14}{'mediana atual':>15}{'variação':>10}")
+    for nome, atual in resultados.items():
+        anterior = base.get(nome)
+        if not anterior:
+            print(f"{nome:<30}{'-':>14}{atual['mediana_ms']:>15.1f}{'nova':>10}")
+            continue
+        variacao = atual['mediana_ms'] / anterior['mediana_ms'] - 1 if anterior['mediana_ms'] else 0.0
+        marca = ''
+        if variacao > tolerancia:
+            regressoes.append(nome)
+            marca = '  <-- regressão'
+        print(f"{nome:<30}{anterior['mediana_ms']:>14.1f}{atual['mediana_ms']:>15.1f}{variacao:>+10.0%}{marca}")
+    return regressoes
+
+
+def main():
+    args = _argumentos()
+    env = _ambiente()
+
+    verificar(env)
+    resultados = medir(args.repeticoes, env)
+
+    print(f"\n{'cenário':<30}{'mediana':>10}{'máximo':>10}  (ms, {args.repeticoes} repetições)")
+    for nome, r in resultados.items():
+        print(f"{nome:<30}{r['mediana_ms']:>10.1f}{r['max_ms']:>10.1f}")
+
+    if args.salvar:
+        with open(args.salvar, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+        print(f"\nLinha de base gravada em {args.salvar}.")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            base = json.load(f)
+        regressoes = comparar(resultados, base, args.tolerancia)
+        if regressoes:
+            raise SystemExit(f"\n{len(regressoes)} cenário(s) com regressão: {', '.join(regressoes)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Benchmark das rotas principais.
+
+Percorre as telas mais usadas pelo test client do Flask e imprime, por rota,
+as latências (mediana, p95, p99) e o número de consultas SQL. Sem --banco,
+cria um banco temporário com os dados sintéticos do 'flask seed-bench'.
+Com --salvar, grava o resultado como linha de base em JSON; com --comparar,
+confronta a execução com uma linha de base e termina com código 1 se alguma
+rota piorar além da tolerância ou passar a fazer mais consultas.
+
+Execute: python backend/bench_rotas.py [--banco escola_bench.db] [--repeticoes 20]
+         [--salvar base.json | --comparar base.json] [--tolerancia 0.2]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _argumentos():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--banco', help='Banco SQLite já populado com o seed-bench (padrão: gera um temporário).')
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--pelotoes', type=int, default=20)
+    parser.add_argument('--alunos', type=int, default=3000)
+    parser.add_argument('--horarios', type=int, default=200000)
+    parser.add_argument('--repeticoes', type=int, default=20)
+    parser.add_argument('--salvar', metavar='JSON', help='Grava o resultado como linha de base.')
+    parser.add_argument('--comparar', metavar='JSON', help='Compara com uma linha de base gravada.')
+    parser.add_argument('--tolerancia', type=float, default=0.2, help='Piora aceitável da mediana (0.2 = 20%%).')
+    return parser.parse_args()
+
+
+args = _argumentos() if __name__ == '__main__' else None
+
+_tmp = tempfile.mkdtemp(prefix='bench_rotas_')
+_banco = os.path.abspath(args.banco) if args and args.banco else os.path.join(_tmp, 'bench.db')
+_banco_existente = os.path.exists(_banco)
+os.environ['DATABASE_URL'] = 'sqlite:///' + _banco
+os.environ['SITE_CONFIG_VERSION_FILE'] = os.path.join(_tmp, 'site_config.version')
+os.environ['HORARIO_CACHE_VERSOES_DIR'] = os.path.join(_tmp, 'horario_versoes')
+os.environ.setdefault('APP_CONFIG', 'bench')
+
+from sqlalchemy import event, select, func
+from backend.app import create_app
+from backend.models.database import db
+from backend.models.user import User
+from backend.models.aluno import Aluno
+from backend.models.semana import Semana
+from backend.models.horario import Horario
+from backend.models.instrutor import Instrutor
+from backend.dados_sinteticos import popular
+
+app = create_app()
+
+_consultas = [0]
+
+
+def _contar_consulta(*_):
+    _consultas[0] += 1
+
+
+def cliente_logado(user_id):
+    cliente = app.test_client()
+    with cliente.session_transaction() as sessao:
+        sessao['_user_id'] = str(user_id)
+        sessao['_fresh'] = True
+    return cliente
+
+
+def montar_rotas():
+    """Escolhe pelotão, semana, aluno e instrutor representativos do banco."""
+    with app.app_context():
+        admin_id = db.session.scalar(select(User.id).where(User.role == 'admin').order_by(User.id))
+        semanas = db.session.execute(select(Semana.id, Semana.ciclo, Semana.data_inicio).order_by(Semana.data_inicio)).all()
+        semana = semanas[len(semanas) // 2]
+        turma_id = db.session.scalar(
+            select(Horario.turma_id).where(Horario.semana_id == semana.id)
+            .group_by(Horario.turma_id).order_by(func.count().desc(), Horario.turma_id)
+        )
+        instrutor_user_id = db.session.scalar(
+            select(Instrutor.user_id).join(Horario, Horario.instrutor_id == Instrutor.id)
+            .where(Horario.turma_id == turma_id, Horario.semana_id == semana.id).order_by(Horario.id)
+        )
+        aluno_id = db.session.scalar(select(Aluno.id).where(Aluno.turma_id == turma_id).order_by(Aluno.id))
+
+        mes = semana.data_inicio.replace(day=1)
+        relatorio = {'data_inicio': mes.isoformat(), 'data_fim': (mes.replace(day=28)).isoformat(),
+                     'action': 'preview', 'curso_nome': 'Bench'}
+
+        with app.test_request_context():
+            from flask import url_for
+            rotas = [
+                ('horario.index_com_turma', admin_id, 'GET',
+                 url_for('horario.index_com_turma', turma_id=turma_id, semana_id=semana.id, ciclo=semana.ciclo), None),
+                ('horario.index_com_turma (instrutor)', instrutor_user_id, 'GET',
+                 url_for('horario.index_com_turma', turma_id=turma_id, semana_id=semana.id, ciclo=semana.ciclo), None),
+                ('horario.editar_horario_grid', admin_id, 'GET',
+                 url_for('horario.editar_horario_grid', turma_id=turma_id, semana_id=semana.id, ciclo_id=semana.ciclo), None),
+                ('horario.visao_geral', admin_id, 'GET',
+                 url_for('horario.visao_geral', semana_id=semana.id, ciclo=semana.ciclo), None),
+                ('horario.visao_geral_json', admin_id, 'GET', url_for('horario.visao_geral_json', semana_id=semana.id), None),
+                ('aluno.listar_alunos', admin_id, 'GET', url_for('aluno.listar_alunos'), None),
+                ('aluno.listar_alunos (turma)', admin_id, 'GET', url_for('aluno.listar_alunos', turma_id=turma_id), None),
+                ('historico.historico_aluno', admin_id, 'GET', url_for('historico.historico_aluno', aluno_id=aluno_id), None),
+                ('relatorios.gerar_relatorio_horas_aula', admin_id, 'POST',
+                 url_for('relatorios.gerar_relatorio_horas_aula', tipo='mensal'), relatorio),
+            ]
+    return rotas
+
+
+def medir(rotas, repeticoes):
+    resultados = {}
+    clientes = {}
+    for nome, user_id, metodo, url, dados in rotas:
+        cliente = clientes.setdefault(user_id, cliente_logado(user_id))
+        cliente.open(url, method=metodo, data=dados)  # aquecimento
+        tempos, consultas = [], []
+        for _ in range(repeticoes):
+            _consultas[0] = 0
+            t0 = time.perf_counter()
+            resposta = cliente.open(url, method=metodo, data=dados)
+            tempos.append((time.perf_counter() - t0) * 1000)
+            consultas.append(_consultas[0])
+            assert resposta.status_code == 200, f"{nome}: HTTP {resposta.status_code}"
+        tempos.sort()
+        resultados[nome] = {
+            'mediana_ms': round(statistics.median(tempos), 2),
+            'p95_ms': round(tempos[max(0, int(len(tempos) * 0.95) - 1)], 2),
+            'p99_ms': round(tempos[max(0, int(len(tempos) * 0.99) - 1)], 2),
+            'consultas': max(consultas),
+        }
+    return resultados
+
+
+def comparar(resultados, base, tolerancia):
+    regressoes = []
+    print(f"\n{'rota':<42}{'mediana base':>14}{'mediana atual':>15}{'variação':>10}{'consultas':>14}")
+    for nome, atual in resultados.items():
+        anterior = base.get(nome)
+        if not anterior:
+            print(f"{nome:<42}{'-':>14}{atual['mediana_ms']:>15.1f}{'nova':>10}{atual['consultas']:>14}")
+            continue
+        variacao = atual['mediana_ms'] / anterior['mediana_ms'] - 1 if anterior['mediana_ms'] else 0.0
+        consultas = f"{anterior['consultas']} -> {atual['consultas']}"
+        marca = ''
+        if variacao > tolerancia or atual['consultas'] > anterior['consultas']:
+            regressoes.append(nome)
+            marca = '  <-- regressão'
+        print(f"{nome:<42}{anterior['mediana_ms']:>14.1f}{atual['mediana_ms']:>15.1f}{variacao:>+10.0%}{consultas:>14}{marca}")
+    return regressoes
+
+
+def main():
+    app.config['WTF_CSRF_ENABLED'] = False
+
+    if not _banco_existente:
+        with app.app_context():
+            print(f"Populando banco em {_banco} ...")
+            resumo = popular(semente=args.semente, pelotoes=args.pelotoes, alunos=args.alunos, horarios=args.horarios)
+            print(", ".join(f"{quantidade} {nome}" for nome, quantidade in resumo.items()))
+
+    rotas = montar_rotas()
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _contar_consulta)
+
+    # Fora de um app_context, para que cada requisição tenha sessão e usuário próprios
+    resultados = medir(rotas, args.repeticoes)
+
+    print(f"\n{'rota':<42}{'mediana':>10}{'p95':>10}{'p99':>10}{'consultas':>11}  (ms, {args.repeticoes} repetições)")
+    for nome, r in resultados.items():
+        print(f"{nome:<42}{r['mediana_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}{r['consultas']:>11}")
+
+    if args.salvar:
+        with open(args.salvar, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+        print(f"\nLinha de base gravada em {args.salvar}.")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            base = json.load(f)
+        regressoes = comparar(resultados, base, args.tolerancia)
+        if regressoes:
+            raise SystemExit(f"\n{len(regressoes)} rota(s) com regressão: {', '.join(regressoes)}")
+
+
+if __name__ == '__main__':
+    main()
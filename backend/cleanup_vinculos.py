@@ -19,19 +19,19 @@ def cleanup_invalid_vinculos():
     with app.app_context():
         print("Iniciando a limpeza de vínculos inválidos...")
 
-        # 1. Obter todos os nomes de turmas válidas que existem na tabela 'turmas'
-        turmas_validas_query = select(Turma.nome)
-        nomes_turmas_validas = [nome for nome, in db.session.execute(turmas_validas_query).all()]
+        # 1. Obter todas as turmas válidas que existem na tabela 'turmas'
+        turmas_validas = db.session.execute(select(Turma.id, Turma.nome)).all()
+        ids_turmas_validas = [turma_id for turma_id, _ in turmas_validas]
 
-        if not nomes_turmas_validas:
+        if not ids_turmas_validas:
             print("Nenhuma turma encontrada na tabela 'turmas'. A limpeza não pode continuar.")
             return
 
-        print(f"Turmas válidas encontradas: {', '.join(nomes_turmas_validas)}")
+        print(f"Turmas válidas encontradas: {', '.join(nome for _, nome in turmas_validas)}")
 
         # 2. Encontrar todos os vínculos que apontam para turmas que NÃO ESTÃO na lista de turmas válidas
         vinculos_invalidos_query = select(DisciplinaTurma).where(
-            DisciplinaTurma.pelotao.notin_(nomes_turmas_validas)
+            DisciplinaTurma.turma_id.notin_(ids_turmas_validas)
         )
         vinculos_para_deletar = db.session.scalars(vinculos_invalidos_query).all()
 
@@ -43,7 +43,7 @@ def cleanup_invalid_vinculos():
         print(f"Encontrados {len(vinculos_para_deletar)} vínculos inválidos para serem removidos:")
         for vinculo in vinculos_para_deletar:
             instrutor_info = f"(Instrutor ID: {vinculo.instrutor_id_1})" if vinculo.instrutor_id_1 else "(Sem instrutor)"
-            print(f"  - Vínculo ID {vinculo.id}: Turma '{vinculo.pelotao}' (inválida) {instrutor_info}")
+            print(f"  - Vínculo ID {vinculo.id}: Turma ID {vinculo.turma_id} (inválida) {instrutor_info}")
             db.session.delete(vinculo)
 
         # 4. Salvar as alterações no banco de dados
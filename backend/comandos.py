@@ -0,0 +1,169 @@
+"""
+Comandos de linha de comando da aplicação ('flask <comando>').
+
+Registrados pela fábrica em create_app; cada comando roda dentro do contexto
+da aplicação criada pelo próprio 'flask', sem instância global de app.
+"""
+import click
+from flask.cli import with_appcontext
+from backend.models.database import db
+from backend.models.user import User
+
+
+# Comando para criar admin
+@click.command("create-admin")
+@with_appcontext
+def create_admin():
+    admin_user = db.session.execute(db.select(User).filter_by(id_func='ADMIN')).scalar_one_or_none()
+
+    if admin_user:
+        print("O usuário 'admin' já existe.")
+        return
+
+    print("Criando o usuário administrador 'admin'...")
+    new_admin = User(
+        id_func='ADMIN',
+        username='admin',
+        email='admin@escola.com.br',
+        role='admin',
+        is_active=True
+    )
+    new_admin.set_password('@Nk*BC6GAJi8RrT')
+
+    db.session.add(new_admin)
+    db.session.commit()
+
+    print("Usuário administrador 'admin' criado com sucesso!")
+
+
+# Comando para criar programador
+@click.command("create-programmer")
+@with_appcontext
+def create_programmer():
+    prog_user = db.session.execute(db.select(User).filter_by(id_func='PROG001')).scalar_one_or_none()
+
+    if prog_user:
+        print("O usuário 'programador' já existe.")
+        return
+
+    print("Criando o usuário programador...")
+    new_programmer = User(
+        id_func='PROG001',
+        username='programador',
+        email='dev@escola.com.br',
+        role='programador',
+        is_active=True
+    )
+    new_programmer.set_password('DevPass@2025')
+
+    db.session.add(new_programmer)
+    db.session.commit()
+
+    print("Usuário programador criado com sucesso!")
+    print("Login: programador")
+    print("Senha: DevPass@2025")
+
+
+@click.command("rebuild-carga-horaria")
+@click.option('--check', is_flag=True, help='Apenas verifica os contadores, sem reconstruí-los.')
+@with_appcontext
+def rebuild_carga_horaria(check):
+    """Reconstrói e verifica a tabela carga_horaria_realizada a partir de 'horarios'."""
+    from backend.services.carga_horaria_service import CargaHorariaService
+
+    if not check:
+        total = CargaHorariaService.rebuild()
+        print(f"{total} contador(es) de carga horária reconstruído(s).")
+
+    divergencias = CargaHorariaService.verify()
+    if not divergencias:
+        print("Contadores de carga horária consistentes com a tabela de horários.")
+        return
+
+    for (disciplina_id, turma_id, status), contador, real in divergencias:
+        print(f"  Disciplina {disciplina_id} / turma {turma_id} / {status}: contador={contador}, real={real}")
+    raise SystemExit(f"{len(divergencias)} divergência(s) encontrada(s).")
+
+
+@click.command("rebuild-busca")
+@with_appcontext
+def rebuild_busca():
+    """Recria o índice de busca (FTS5) de alunos e instrutores e seus triggers."""
+    from backend.services.busca_service import BuscaService
+
+    total = BuscaService.reconstruir()
+    print(f"Índice de busca reconstruído com {total} pessoa(s).")
+
+
+@click.command("limpar-relatorios")
+@click.option('--inicializacao', is_flag=True,
+              help='Expira todas as tarefas ativas; use antes de subir os workers, com a aplicação parada.')
+@with_appcontext
+def limpar_relatorios(inicializacao):
+    """Expira as tarefas de relatório perdidas e apaga as antigas da tabela relatorio_jobs."""
+    from backend.services.relatorio_job_service import RelatorioJobService
+
+    expiradas, apagadas = RelatorioJobService.limpar_jobs_antigos(0 if inicializacao else None)
+    print(f"{expiradas} tarefa(s) expirada(s), {apagadas} tarefa(s) antiga(s) apagada(s).")
+
+
+@click.command("seed-bench")
+@click.option('--semente', default=42, show_default=True, help='Semente do gerador (mesma semente, mesmos dados).')
+@click.option('--pelotoes', default=20, show_default=True)
+@click.option('--alunos', default=3000, show_default=True)
+@click.option('--instrutores', default=150, show_default=True)
+@click.option('--disciplinas', default=45, show_default=True)
+@click.option('--ciclos', default=3, show_default=True)
+@click.option('--horarios', default=200000, show_default=True, help='Total de aulas na grade.')
+@with_appcontext
+def seed_bench(semente, pelotoes, alunos, instrutores, disciplinas, ciclos, horarios):
+    """Popula um banco VAZIO com dados sintéticos em volume de produção (para benchmarks)."""
+    from backend.dados_sinteticos import popular, SENHA_PADRAO
+
+    db.create_all()
+    if db.session.scalar(db.select(db.func.count(User.id))):
+        raise SystemExit("O banco já possui usuários. Aponte DATABASE_URL para um arquivo novo antes de rodar o seed-bench.")
+
+    resumo = popular(semente=semente, pelotoes=pelotoes, alunos=alunos, instrutores=instrutores,
+                     disciplinas=disciplinas, ciclos=ciclos, horarios=horarios)
+    print(", ".join(f"{quantidade} {nome}" for nome, quantidade in resumo.items()))
+    print(f"Login: admin / {SENHA_PADRAO} (a mesma senha vale para todos os usuários gerados)")
+
+
+@click.command("seed-disciplinas")
+@with_appcontext
+def seed_disciplinas():
+    """Adiciona a lista de disciplinas padrão ao banco de dados."""
+    from backend.models.disciplina import Disciplina
+
+    lista_disciplinas = [
+        "Educação Física", "Sistemas de Correição: Atribuição do Escrivão PJM",
+        "A Transversalidade do D. Penal e Processual Penal no Atnd. De Oc.",
+        "Legislação Especial Aplicada a Função Policial Militar", "Policiamento de Trânsito Aplicado a Função",
+        "Gestão e Supervisão pela Qualidade do Serviço", "Sistemas Informatizados da BM e SSPO",
+        "Saúde Mental do Policial Militar e Psicologia da Ativ. Pol.", "Direito Administrativo Aplicado a função Policial Militar",
+        "Gerenciamento de Crise e Desastres", "Ordem Unida", "AMT I", "AMT II",
+        "Atendimento Pré-Hospitalar Tático", "A disposição do C Al /S Ens"
+    ]
+    print("Verificando e adicionando disciplinas...")
+    count = 0
+    for nome_materia in lista_disciplinas:
+        disciplina_existe = db.session.execute(db.select(Disciplina).filter_by(materia=nome_materia)).scalar_one_or_none()
+        if not disciplina_existe:
+            nova_disciplina = Disciplina(materia=nome_materia, carga_horaria_prevista=0)
+            db.session.add(nova_disciplina)
+            count += 1
+    if count > 0:
+        db.session.commit()
+        print(f"{count} nova(s) disciplina(s) adicionada(s) com sucesso!")
+    else:
+        print("Todas as disciplinas padrão já existem no banco de dados.")
+
+
+COMANDOS = [create_admin, create_programmer, rebuild_carga_horaria, rebuild_busca, limpar_relatorios, seed_bench, seed_disciplinas]
+
+
+def init_app(app):
+    """Registra os comandos no grupo 'flask' da aplicação."""
+    for comando in COMANDOS:
+        app.cli.add_command(comando)
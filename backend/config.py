@@ -6,4 +6,94 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'sua-chave-secreta-muito-segura'
     # AJUSTADO AQUI: O banco de dados será criado dentro da pasta 'backend'
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///' + os.path.join(basedir, 'escola.db')
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # PRAGMAs aplicados a cada nova conexão SQLite (o journal_mode WAL é
+    # persistente no arquivo e é ajustado uma vez na inicialização)
+    SQLITE_JOURNAL_MODE = 'WAL'
+    SQLITE_PRAGMAS = {
+        'foreign_keys': 'ON',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'cache_size': -20000,  # KiB (negativo) = ~20 MB por conexão
+        'temp_store': 'MEMORY',
+    }
+    SQLITE_OPTIMIZE_AO_ENCERRAR = True
+    # Cache do usuário autenticado (User + perfis) por processo, em segundos (0 desativa)
+    USUARIO_CACHE_TTL = int(os.environ.get('USUARIO_CACHE_TTL', 30))
+
+    # Arquivo com o contador de versão do cache de configurações do site (compartilhado entre workers)
+    SITE_CONFIG_VERSION_FILE = os.environ.get('SITE_CONFIG_VERSION_FILE') or os.path.join(basedir, 'site_config.version')
+
+    # Cache das matrizes do quadro horário por processo (0 desativa) e pasta com
+    # os arquivos de versão por (pelotão, semana), compartilhados entre workers
+    HORARIO_CACHE_MAX_MATRIZES = int(os.environ.get('HORARIO_CACHE_MAX_MATRIZES', 512))
+    HORARIO_CACHE_VERSOES_DIR = os.environ.get('HORARIO_CACHE_VERSOES_DIR') or os.path.join(basedir, 'horario_versoes')
+
+    # Geração assíncrona de PDFs de relatórios
+    RELATORIO_PDF_CACHE_DIR = os.environ.get('RELATORIO_PDF_CACHE_DIR') or os.path.join(basedir, 'relatorios_gerados')
+    RELATORIO_PDF_CACHE_MAX_BYTES = int(os.environ.get('RELATORIO_PDF_CACHE_MAX_BYTES', 200 * 1024 * 1024))
+    RELATORIO_PDF_WORKERS = int(os.environ.get('RELATORIO_PDF_WORKERS', 2))
+    RELATORIO_PDF_PROCESSOS = int(os.environ.get('RELATORIO_PDF_PROCESSOS', 2))
+    RELATORIO_PDF_MAX_FILA = int(os.environ.get('RELATORIO_PDF_MAX_FILA', 10))
+    # Tarefas ainda ativas após este prazo são dadas como perdidas (reinício ou
+    # worker encerrado) e marcadas como 'erro'; as finalizadas são apagadas
+    # depois da retenção
+    RELATORIO_PDF_TIMEOUT_MINUTOS = int(os.environ.get('RELATORIO_PDF_TIMEOUT_MINUTOS', 30))
+    RELATORIO_JOBS_RETENCAO_DIAS = int(os.environ.get('RELATORIO_JOBS_RETENCAO_DIAS', 7))
+
+    # Importação em massa de alunos (CSV/XLSX)
+    IMPORTACAO_ALUNOS_LOTE = int(os.environ.get('IMPORTACAO_ALUNOS_LOTE', 200))
+    IMPORTACAO_HASH_PROCESSOS = int(os.environ.get('IMPORTACAO_HASH_PROCESSOS', 2))
+
+    # Gerador automático do quadro horário semanal
+    GERADOR_HORARIO_LIMITE_SEGUNDOS = float(os.environ.get('GERADOR_HORARIO_LIMITE_SEGUNDOS', 3))
+    GERADOR_HORARIO_MAX_POR_DIA = int(os.environ.get('GERADOR_HORARIO_MAX_POR_DIA', 4))
+
+    # Instrumentação de SQL por requisição (Server-Timing, N+1 e consultas lentas)
+    SQL_INSTRUMENTACAO = os.environ.get('SQL_INSTRUMENTACAO', '1') == '1'
+    SQL_PAINEL_DEPURACAO = os.environ.get('SQL_PAINEL_DEPURACAO', '0') == '1'
+    SQL_LIMIAR_N_MAIS_UM = int(os.environ.get('SQL_LIMIAR_N_MAIS_UM', 5))
+    SQL_LIMIAR_LENTA_MS = float(os.environ.get('SQL_LIMIAR_LENTA_MS', 100))
+    SQL_LOG_LENTAS_ARQUIVO = os.environ.get('SQL_LOG_LENTAS_ARQUIVO')
+    # Os valores das consultas lentas podem conter e-mails e hashes de senha;
+    # por padrão o log traz só o formato da consulta
+    SQL_LOG_PARAMETROS = os.environ.get('SQL_LOG_PARAMETROS', '0') == '1'
+
+
+class DevConfig(Config):
+    """Desenvolvimento local: painel de SQL visível para o perfil programador."""
+    SQL_PAINEL_DEPURACAO = os.environ.get('SQL_PAINEL_DEPURACAO', '1') == '1'
+
+
+class ProdConfig(Config):
+    """Servidor multi-thread: mais espera por locks, cache e mmap maiores e pool dimensionado."""
+    SQLITE_PRAGMAS = dict(Config.SQLITE_PRAGMAS,
+                          busy_timeout=15000,
+                          cache_size=-65536,
+                          mmap_size=256 * 1024 * 1024)
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+        'pool_timeout': 30,
+    }
+
+
+class BenchConfig(ProdConfig):
+    """Benchmarks: ajustes de produção sem a instrumentação por requisição."""
+    SQL_INSTRUMENTACAO = False
+
+
+CONFIGS = {
+    'dev': DevConfig,
+    'prod': ProdConfig,
+    'bench': BenchConfig,
+}
+
+
+def get_config(nome=None):
+    """Perfil de configuração escolhido por nome ou pela variável APP_CONFIG (padrão: dev)."""
+    nome = nome or os.environ.get('APP_CONFIG', 'dev')
+    if nome not in CONFIGS:
+        raise ValueError(f"APP_CONFIG inválido: '{nome}'. Use um de: {', '.join(CONFIGS)}.")
+    return CONFIGS[nome]
@@ -4,6 +4,7 @@ from sqlalchemy import select
 
 from ..models.database import db
 from ..services.aluno_service import AlunoService
+from ..services.importacao_aluno_service import ImportacaoAlunoService, COLUNAS_OBRIGATORIAS, COLUNAS_OPCIONAIS
 from ..models.user import User
 from ..models.turma import Turma
 from utils.decorators import admin_or_programmer_required, aluno_profile_required
@@ -95,14 +96,46 @@ def cadastro_aluno_admin():
     turmas = db.session.scalars(select(Turma).order_by(Turma.nome)).all()
     return render_template('cadastro_aluno_admin.html', form_data={}, turmas=turmas)
 
+@aluno_bp.route('/importar', methods=['GET', 'POST'])
+@login_required
+@admin_or_programmer_required
+def importar_alunos():
+    """Importa alunos em massa a partir de um arquivo CSV ou XLSX."""
+    relatorio = None
+    if request.method == 'POST':
+        arquivo = request.files.get('arquivo')
+        if not arquivo or not arquivo.filename:
+            flash('Selecione um arquivo CSV ou XLSX.', 'danger')
+            return redirect(url_for('aluno.importar_alunos'))
+
+        success, message, relatorio = ImportacaoAlunoService.importar_alunos(arquivo)
+        if success and not relatorio['erros']:
+            flash(message, 'success')
+            return redirect(url_for('aluno.listar_alunos'))
+        flash(message, 'warning' if success else 'danger')
+
+    return render_template('importar_alunos.html', relatorio=relatorio,
+                           colunas_obrigatorias=COLUNAS_OBRIGATORIAS, colunas_opcionais=COLUNAS_OPCIONAIS)
+
 @aluno_bp.route('/listar')
 @login_required
 @aluno_profile_required
 def listar_alunos():
-    turma_filtrada = request.args.get('turma', None)
-    alunos = AlunoService.get_all_alunos(turma_filtrada)
+    turma_filtrada = None
+    turma_id = request.args.get('turma_id', type=int)
+    if turma_id:
+        turma_filtrada = db.session.get(Turma, turma_id)
+    busca = request.args.get('q', '').strip()
+
+    alunos, tem_anterior, tem_proxima = AlunoService.get_alunos_paginados(
+        turma_id=turma_filtrada.id if turma_filtrada else None,
+        busca=busca or None,
+        apos=request.args.get('apos'),
+        antes=request.args.get('antes'),
+    )
     turmas = db.session.scalars(select(Turma).order_by(Turma.nome)).all()
-    return render_template('listar_alunos.html', alunos=alunos, turmas=turmas, turma_filtrada=turma_filtrada)
+    return render_template('listar_alunos.html', alunos=alunos, turmas=turmas, turma_filtrada=turma_filtrada,
+                           busca=busca, tem_anterior=tem_anterior, tem_proxima=tem_proxima)
 
 @aluno_bp.route('/editar/<int:aluno_id>', methods=['GET', 'POST'])
 @login_required
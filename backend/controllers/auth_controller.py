@@ -1,8 +1,10 @@
 from flask import Blueprint, flash, redirect, render_template, request, url_for
 from flask_login import login_user, logout_user, login_required
 
-from ..app import db
+from ..models.database import db
 from ..models.user import User
+from ..models.horario import Horario
+from ..services.horario_cache_service import HorarioCacheService
 from utils.validators import validate_email, validate_password_strength
 
 auth_bp = Blueprint('auth', __name__)
@@ -52,6 +54,8 @@ def register():
         user.is_active = True
 
         db.session.commit()
+        if user.instrutor_profile:
+            HorarioCacheService.invalidar(HorarioCacheService.pares(Horario.instrutor_id == user.instrutor_profile.id))
 
         flash('Sua conta foi ativada com sucesso! Agora você pode fazer o login.', 'success')
         return redirect(url_for('auth.login'))
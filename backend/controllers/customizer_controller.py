@@ -74,6 +74,7 @@ def reset_configs():
         # Deleta todas as configurações usando o modelo importado
         db.session.query(SiteConfig).delete()
         db.session.commit()
+        SiteConfigService.invalidate_cache()
         
         # Reinicializa com padrões
         SiteConfigService.init_default_configs()
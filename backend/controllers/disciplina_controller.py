@@ -1,14 +1,19 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, current_app
 from flask_login import login_required
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 
 from ..models.database import db
 from ..models.disciplina import Disciplina
 from ..models.instrutor import Instrutor
 from ..models.disciplina_turma import DisciplinaTurma
 from ..models.horario import Horario
+from ..models.turma import Turma
 from ..models.historico_disciplina import HistoricoDisciplina
+from ..models.saldo_horas_pagas import SaldoHorasPagas
 from ..services.disciplina_service import DisciplinaService
+from ..services.carga_horaria_service import CargaHorariaService
+from ..services.horario_cache_service import HorarioCacheService
 from utils.decorators import admin_or_programmer_required
 
 disciplina_bp = Blueprint('disciplina', __name__, url_prefix='/disciplina')
@@ -37,7 +42,11 @@ def listar_disciplinas():
     ciclo_selecionado = request.args.get('ciclo', session.get('ultimo_ciclo_visualizado', 1), type=int)
     session['ultimo_ciclo_visualizado'] = ciclo_selecionado # Salva a escolha do usuário
 
-    pelotao_filtrado = request.args.get('pelotao')
+    turma_filtrada = None
+    turma_filtrada_id = request.args.get('turma_id', type=int)
+    if turma_filtrada_id:
+        turma_filtrada = db.session.get(Turma, turma_filtrada_id)
+    pelotao_filtrado = turma_filtrada.nome if turma_filtrada else None
     
     # Filtra as disciplinas pelo ciclo selecionado
     disciplinas = db.session.scalars(
@@ -45,12 +54,12 @@ def listar_disciplinas():
     ).all()
     
     disciplinas_com_instrutores = []
-    if pelotao_filtrado:
+    if turma_filtrada:
         for disciplina in disciplinas:
             associacao = db.session.execute(
                 select(DisciplinaTurma).where(
                     DisciplinaTurma.disciplina_id == disciplina.id,
-                    DisciplinaTurma.pelotao == pelotao_filtrado
+                    DisciplinaTurma.turma_id == turma_filtrada.id
                 )
             ).scalar_one_or_none()
             disciplinas_com_instrutores.append((disciplina, associacao))
@@ -62,6 +71,8 @@ def listar_disciplinas():
         'listar_disciplinas.html', 
         disciplinas_com_instrutores=disciplinas_com_instrutores, 
         pelotao_filtrado=pelotao_filtrado,
+        turma_filtrada=turma_filtrada,
+        turmas=db.session.scalars(select(Turma).order_by(Turma.nome)).all(),
         ciclos=[1, 2, 3],
         ciclo_selecionado=ciclo_selecionado
     )
@@ -128,24 +139,36 @@ def excluir_disciplina(disciplina_id):
     if not disciplina:
         flash("Disciplina não encontrada.", 'danger')
         return redirect(url_for('disciplina.listar_disciplinas'))
-    
+
+    ciclo_redirect = disciplina.ciclo
+    disciplina_nome = disciplina.materia
+
+    # Os saldos de períodos fechados são histórico de pagamento congelado
+    if db.session.scalar(select(SaldoHorasPagas.id).where(SaldoHorasPagas.disciplina_id == disciplina_id).limit(1)):
+        flash(f'Não é possível excluir a disciplina "{disciplina_nome}": ela consta em períodos de pagamento já fechados.', 'danger')
+        return redirect(url_for('disciplina.listar_disciplinas', ciclo=ciclo_redirect))
+
     try:
-        ciclo_redirect = disciplina.ciclo
-        disciplina_nome = disciplina.materia
-        
         # Remover associações, aulas e históricos
         db.session.query(DisciplinaTurma).filter_by(disciplina_id=disciplina_id).delete()
+        pares = HorarioCacheService.pares(Horario.disciplina_id == disciplina_id)
         db.session.query(Horario).filter_by(disciplina_id=disciplina_id).delete()
+        CargaHorariaService.remover_disciplina(disciplina_id)
         db.session.query(HistoricoDisciplina).filter_by(disciplina_id=disciplina_id).delete()
         
         db.session.delete(disciplina)
         
         db.session.commit()
+        HorarioCacheService.invalidar(pares)
         
         flash(f'Disciplina "{disciplina_nome}" e todos os dados relacionados foram excluídos com sucesso!', 'success')
         
+    except IntegrityError:
+        db.session.rollback()
+        flash(f'Não é possível excluir a disciplina "{disciplina_nome}": há registros vinculados a ela.', 'danger')
     except Exception as e:
         db.session.rollback()
-        flash(f'Erro ao excluir disciplina: {str(e)}', 'danger')
+        current_app.logger.error(f"Erro ao excluir disciplina {disciplina_id}: {e}")
+        flash('Erro ao excluir disciplina. Tente novamente.', 'danger')
     
     return redirect(url_for('disciplina.listar_disciplinas', ciclo=ciclo_redirect))
\ No newline at end of file
@@ -1,6 +1,6 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, session, current_app
 from flask_login import login_required, current_user
-from sqlalchemy import select, func
+from sqlalchemy import select
 from sqlalchemy.orm import joinedload
 from datetime import date, timedelta
 
@@ -11,16 +11,22 @@ from ..models.instrutor import Instrutor
 from ..models.disciplina_turma import DisciplinaTurma
 from ..models.semana import Semana
 from ..models.turma import Turma
+from ..services.horario_service import HorarioService, HorarioPermissionContext, DIAS_SEMANA
+from ..services.carga_horaria_service import CargaHorariaService
+from ..services.horario_cache_service import HorarioCacheService
+from ..services.conflito_horario_service import ConflitoHorarioService
+from ..services.gerador_horario_service import GeradorHorarioService
 from utils.decorators import admin_or_programmer_required
 
 horario_bp = Blueprint('horario', __name__, url_prefix='/horario')
 
 def can_edit_horario(horario_id):
-    if current_user.role in ['admin', 'programador']:
+    contexto = HorarioPermissionContext.from_user(current_user)
+    if contexto.is_admin:
         return True
-    if current_user.role == 'instrutor' and current_user.instrutor_profile:
+    if contexto.instrutor_id is not None:
         horario = db.session.get(Horario, horario_id)
-        if horario and horario.instrutor_id == current_user.instrutor_profile.id:
+        if horario and contexto.can_edit(horario.instrutor_id):
             return True
     return False
 
@@ -45,15 +51,15 @@ def index():
             flash('Você não está vinculado a nenhuma turma ou disciplina.', 'warning')
             return redirect(url_for('main.dashboard'))
 
-        nomes_turmas_instrutor = sorted(list(set([v.pelotao for v in vinculos])))
+        ids_turmas_instrutor = {v.turma_id for v in vinculos}
         
         todas_as_turmas = db.session.scalars(
-            select(Turma).where(Turma.nome.in_(nomes_turmas_instrutor)).order_by(Turma.nome)
+            select(Turma).where(Turma.id.in_(ids_turmas_instrutor)).order_by(Turma.nome)
         ).all()
 
-        if len(nomes_turmas_instrutor) == 1:
+        if len(ids_turmas_instrutor) == 1:
             semana_id = request.args.get('semana_id')
-            return redirect(url_for('horario.index_com_turma', pelotao=nomes_turmas_instrutor[0], semana_id=semana_id, ciclo=ciclo_selecionado))
+            return redirect(url_for('horario.index_com_turma', turma_id=next(iter(ids_turmas_instrutor)), semana_id=semana_id, ciclo=ciclo_selecionado))
     else:
         todas_as_turmas = db.session.scalars(select(Turma).order_by(Turma.nome)).all()
 
@@ -64,6 +70,7 @@ def index():
         return render_template('quadro_horario.html',
                                horario_matrix=None,
                                pelotao_selecionado=None,
+                               turma_selecionada=None,
                                semana_selecionada=None,
                                todas_as_turmas=todas_as_turmas,
                                todas_as_semanas=todas_as_semanas,
@@ -71,9 +78,8 @@ def index():
                                ciclo_selecionado=ciclo_selecionado,
                                datas_semana=datas_semana)
 
-    turma_selecionada_nome = request.args.get('pelotao', session.get('ultima_turma_visualizada'))
-    if not turma_selecionada_nome and todas_as_turmas:
-        turma_selecionada_nome = todas_as_turmas[0].nome
+    turma_selecionada_id = request.args.get('turma_id', type=int) or session.get('ultima_turma_visualizada')
+    turma_selecionada = next((t for t in todas_as_turmas if t.id == turma_selecionada_id), todas_as_turmas[0])
 
     semana_id_selecionada = request.args.get('semana_id')
     semana_selecionada = None
@@ -89,8 +95,9 @@ def index():
             semana_selecionada = todas_as_semanas[0]
 
     if semana_selecionada:
-        session['ultima_turma_visualizada'] = turma_selecionada_nome
-        horario_matrix = construir_matriz_horario(turma_selecionada_nome, semana_selecionada.id, ciclo_selecionado)
+        session['ultima_turma_visualizada'] = turma_selecionada.id
+        contexto = HorarioPermissionContext.from_user(current_user)
+        horario_matrix = construir_matriz_horario(turma_selecionada.id, semana_selecionada.id, ciclo_selecionado, contexto)
         dia_atual = semana_selecionada.data_inicio
         dias_da_semana = ['segunda', 'terca', 'quarta', 'quinta', 'sexta', 'sabado', 'domingo']
         for i in range(7):
@@ -100,7 +107,8 @@ def index():
 
     return render_template('quadro_horario.html',
                            horario_matrix=horario_matrix,
-                           pelotao_selecionado=turma_selecionada_nome,
+                           pelotao_selecionado=turma_selecionada.nome,
+                           turma_selecionada=turma_selecionada,
                            semana_selecionada=semana_selecionada,
                            todas_as_turmas=todas_as_turmas,
                            todas_as_semanas=todas_as_semanas,
@@ -108,9 +116,14 @@ def index():
                            ciclo_selecionado=ciclo_selecionado,
                            datas_semana=datas_semana)
 
-@horario_bp.route('/<pelotao>')
+@horario_bp.route('/<int:turma_id>')
 @login_required
-def index_com_turma(pelotao):
+def index_com_turma(turma_id):
+    turma = db.session.get(Turma, turma_id)
+    if not turma:
+        flash("Turma não encontrada.", "danger")
+        return redirect(url_for('horario.index'))
+
     ciclo_selecionado = request.args.get('ciclo', session.get('ultimo_ciclo_horario', 1), type=int)
     session['ultimo_ciclo_horario'] = ciclo_selecionado
     
@@ -130,7 +143,8 @@ def index_com_turma(pelotao):
             semana_selecionada = todas_as_semanas[0]
     
     if semana_selecionada:
-        horario_matrix = construir_matriz_horario(pelotao, semana_selecionada.id, ciclo_selecionado)
+        contexto = HorarioPermissionContext.from_user(current_user)
+        horario_matrix = construir_matriz_horario(turma.id, semana_selecionada.id, ciclo_selecionado, contexto)
         dia_atual = semana_selecionada.data_inicio
         dias_da_semana = ['segunda', 'terca', 'quarta', 'quinta', 'sexta', 'sabado', 'domingo']
         for i in range(7):
@@ -143,16 +157,17 @@ def index_com_turma(pelotao):
             (DisciplinaTurma.instrutor_id_1 == current_user.instrutor_profile.id) |
             (DisciplinaTurma.instrutor_id_2 == current_user.instrutor_profile.id)
         ).all()
-        nomes_turmas_instrutor = sorted(list(set([v.pelotao for v in vinculos])))
+        ids_turmas_instrutor = {v.turma_id for v in vinculos}
         turmas_visiveis = db.session.scalars(
-            select(Turma).where(Turma.nome.in_(nomes_turmas_instrutor)).order_by(Turma.nome)
+            select(Turma).where(Turma.id.in_(ids_turmas_instrutor)).order_by(Turma.nome)
         ).all()
     else:
         turmas_visiveis = db.session.scalars(select(Turma).order_by(Turma.nome)).all()
 
     return render_template('quadro_horario.html',
                            horario_matrix=horario_matrix,
-                           pelotao_selecionado=pelotao,
+                           pelotao_selecionado=turma.nome,
+                           turma_selecionada=turma,
                            semana_selecionada=semana_selecionada,
                            todas_as_turmas=turmas_visiveis,
                            todas_as_semanas=todas_as_semanas,
@@ -160,13 +175,68 @@ def index_com_turma(pelotao):
                            ciclo_selecionado=ciclo_selecionado,
                            datas_semana=datas_semana)
 
-@horario_bp.route('/editar/<pelotao>/<int:semana_id>/<int:ciclo_id>')
+@horario_bp.route('/visao-geral')
+@login_required
+@admin_or_programmer_required
+def visao_geral():
+    ciclo_selecionado = request.args.get('ciclo', session.get('ultimo_ciclo_horario', 1), type=int)
+    session['ultimo_ciclo_horario'] = ciclo_selecionado
+
+    todas_as_semanas = db.session.scalars(select(Semana).where(Semana.ciclo == ciclo_selecionado).order_by(Semana.data_inicio.desc())).all()
+    semana_id_selecionada = request.args.get('semana_id', type=int)
+    semana_selecionada = next((s for s in todas_as_semanas if s.id == semana_id_selecionada), None)
+    if not semana_selecionada:
+        today = date.today()
+        semana_selecionada = next((s for s in todas_as_semanas if s.data_inicio <= today <= s.data_fim),
+                                  todas_as_semanas[0] if todas_as_semanas else None)
+
+    visao = HorarioService.construir_visao_geral(semana_selecionada) if semana_selecionada else None
+    datas_semana = {}
+    linhas_grade = []
+    if semana_selecionada:
+        for i, dia in enumerate(DIAS_SEMANA):
+            datas_semana[dia] = (semana_selecionada.data_inicio + timedelta(days=i)).strftime('%d/%m')
+        # A tabela é percorrida por (dia, período); cada linha já traz as
+        # células de todos os pelotões, com a aula no lugar do índice
+        aulas = visao['aulas']
+        for dia in visao['dias']:
+            d = DIAS_SEMANA.index(dia)
+            linhas_grade.append((dia, [
+                (periodo, [aulas[c] if c is not None and c >= 0 else c for c in (t[d][periodo - 1] for t in visao['grade'])])
+                for periodo in visao['periodos'][dia]
+            ]))
+
+    return render_template('visao_geral_horario.html',
+                           visao=visao,
+                           linhas_grade=linhas_grade,
+                           semana_selecionada=semana_selecionada,
+                           todas_as_semanas=todas_as_semanas,
+                           ciclos=[1, 2, 3],
+                           ciclo_selecionado=ciclo_selecionado,
+                           datas_semana=datas_semana)
+
+@horario_bp.route('/visao-geral/<int:semana_id>/json')
+@login_required
+@admin_or_programmer_required
+def visao_geral_json(semana_id):
+    """Grade da semana de todos os pelotões (pelotão x dia x período) em JSON."""
+    semana = db.session.get(Semana, semana_id)
+    if not semana:
+        return jsonify({'success': False, 'message': 'Semana não encontrada.'}), 404
+    return jsonify({'success': True, 'semana_id': semana_id, 'dias_semana': DIAS_SEMANA,
+                    **HorarioService.construir_visao_geral(semana)})
+
+@horario_bp.route('/editar/<int:turma_id>/<int:semana_id>/<int:ciclo_id>')
 @login_required
-def editar_horario_grid(pelotao, semana_id, ciclo_id):
+def editar_horario_grid(turma_id, semana_id, ciclo_id):
     semana = db.session.get(Semana, semana_id)
     if not semana:
         flash("Semana não encontrada.", "danger")
         return redirect(url_for('horario.index'))
+    turma = db.session.get(Turma, turma_id)
+    if not turma:
+        flash("Turma não encontrada.", "danger")
+        return redirect(url_for('horario.index'))
 
     is_admin = current_user.role in ['admin', 'programador']
     instrutor_id = current_user.instrutor_profile.id if hasattr(current_user, 'instrutor_profile') and current_user.instrutor_profile else None
@@ -175,7 +245,8 @@ def editar_horario_grid(pelotao, semana_id, ciclo_id):
         flash("Acesso negado.", "danger")
         return redirect(url_for('horario.index'))
 
-    horario_matrix = construir_matriz_horario(pelotao, semana_id, ciclo_id)
+    contexto = HorarioPermissionContext.from_user(current_user)
+    horario_matrix = construir_matriz_horario(turma_id, semana_id, ciclo_id, contexto)
     disciplinas_disponiveis = []
     todos_instrutores = []
     disciplinas_do_ciclo = db.session.scalars(select(Disciplina).where(Disciplina.ciclo == ciclo_id).order_by(Disciplina.materia)).all()
@@ -189,9 +260,12 @@ def editar_horario_grid(pelotao, semana_id, ciclo_id):
                 nome = inst.user.nome_completo or inst.user.username or f"User {inst.user.id}"
             todos_instrutores.append({"id": inst.id, "nome": nome})
 
+        horas_por_disciplina = HorarioService.get_horas_agendadas_por_disciplina(
+            turma_id, [d.id for d in disciplinas_do_ciclo]
+        )
         for disciplina in disciplinas_do_ciclo:
             total_previsto = disciplina.carga_horaria_prevista or 0
-            horas_agendadas = db.session.query(func.sum(Horario.duracao)).filter_by(disciplina_id=disciplina.id, pelotao=pelotao, status='confirmado').scalar() or 0
+            horas_agendadas = horas_por_disciplina.get(disciplina.id, 0)
             disciplinas_disponiveis.append({
                 "id": disciplina.id,
                 "nome": disciplina.materia,
@@ -204,16 +278,19 @@ def editar_horario_grid(pelotao, semana_id, ciclo_id):
         associacoes_query = (
             select(DisciplinaTurma).options(joinedload(DisciplinaTurma.disciplina))
             .where(
-                DisciplinaTurma.pelotao == pelotao, 
+                DisciplinaTurma.turma_id == turma_id,
                 (DisciplinaTurma.instrutor_id_1 == instrutor_id) | (DisciplinaTurma.instrutor_id_2 == instrutor_id),
                 DisciplinaTurma.disciplina_id.in_(ids_disciplinas_ciclo)
             )
             .order_by(DisciplinaTurma.disciplina_id)
         )
         associacoes = db.session.scalars(associacoes_query).unique().all()
+        horas_por_disciplina = HorarioService.get_horas_agendadas_por_disciplina(
+            turma_id, [a.disciplina_id for a in associacoes]
+        )
         for a in associacoes:
             total_previsto = a.disciplina.carga_horaria_prevista or 0
-            horas_agendadas = db.session.query(func.sum(Horario.duracao)).filter_by(disciplina_id=a.disciplina.id, pelotao=pelotao, status='confirmado').scalar() or 0
+            horas_agendadas = horas_por_disciplina.get(a.disciplina.id, 0)
             disciplinas_disponiveis.append({
                 "id": a.disciplina.id,
                 "nome": a.disciplina.materia,
@@ -232,7 +309,8 @@ def editar_horario_grid(pelotao, semana_id, ciclo_id):
     return render_template(
         'editar_quadro_horario.html',
         horario_matrix=horario_matrix,
-        pelotao_selecionado=pelotao,
+        pelotao_selecionado=turma.nome,
+        turma_selecionada=turma,
         semana_selecionada=semana,
         disciplinas_disponiveis=disciplinas_disponiveis,
         todos_instrutores=todos_instrutores,
@@ -260,6 +338,9 @@ def salvar_aula():
     semana = db.session.get(Semana, semana_id)
     if not semana:
         return jsonify({'success': False, 'message': 'Semana não encontrada.'}), 404
+    turma_id = int(data.get('turma_id') or 0)
+    if not db.session.get(Turma, turma_id):
+        return jsonify({'success': False, 'message': 'Turma não encontrada.'}), 404
         
     if not is_admin:
         dia = data.get('dia')
@@ -302,10 +383,9 @@ def salvar_aula():
     if not instrutor:
         return jsonify({'success': False, 'message': 'Instrutor não encontrado.'}), 400
     if not is_admin:
-        pelotao = data.get('pelotao')
         associacao = db.session.execute(
             select(DisciplinaTurma).where(
-                DisciplinaTurma.pelotao == pelotao,
+                DisciplinaTurma.turma_id == turma_id,
                 DisciplinaTurma.disciplina_id == disciplina.id,
                 (DisciplinaTurma.instrutor_id_1 == instrutor_final_id) | (DisciplinaTurma.instrutor_id_2 == instrutor_final_id)
             )
@@ -319,23 +399,27 @@ def salvar_aula():
             aula = db.session.get(Horario, int(horario_id))
             if not aula:
                 return jsonify({'success': False, 'message': 'Aula não encontrada.'}), 404
+            ok, mensagem = ConflitoHorarioService.verificar_aula(
+                aula.semana_id, aula.dia_semana, aula.periodo, int(data.get('duracao', 1)),
+                aula.turma_id, instrutor_final_id, ignorar_id=aula.id
+            )
+            if not ok:
+                return jsonify({'success': False, 'message': mensagem}), 400
+            CargaHorariaService.registrar_aula(aula, -1)
             aula.disciplina_id = int(data.get('disciplina_id'))
             aula.instrutor_id = instrutor_final_id
             aula.duracao = int(data.get('duracao', 1))
             aula.status = 'confirmado' if is_admin else 'pendente'
+            CargaHorariaService.registrar_aula(aula, 1)
         else:
-            conflito = db.session.execute(
-                select(Horario).where(
-                    Horario.pelotao == data.get('pelotao'),
-                    Horario.semana_id == int(data.get('semana_id')),
-                    Horario.dia_semana == data.get('dia'),
-                    Horario.periodo == int(data.get('periodo'))
-                )
-            ).scalar_one_or_none()
-            if conflito:
-                return jsonify({'success': False, 'message': 'Já existe uma aula agendada neste horário.'}), 400
+            ok, mensagem = ConflitoHorarioService.verificar_aula(
+                semana_id, data.get('dia'), int(data.get('periodo')), int(data.get('duracao', 1)),
+                turma_id, instrutor_final_id
+            )
+            if not ok:
+                return jsonify({'success': False, 'message': mensagem}), 400
             aula = Horario()
-            aula.pelotao = data.get('pelotao')
+            aula.turma_id = turma_id
             aula.semana_id = int(data.get('semana_id'))
             aula.dia_semana = data.get('dia')
             aula.periodo = int(data.get('periodo'))
@@ -344,7 +428,9 @@ def salvar_aula():
             aula.duracao = int(data.get('duracao', 1))
             aula.status = 'confirmado' if is_admin else 'pendente'
             db.session.add(aula)
+            CargaHorariaService.registrar_aula(aula, 1)
         db.session.commit()
+        HorarioCacheService.invalidar({(aula.turma_id, aula.semana_id)})
         return jsonify({'success': True, 'message': 'Aula salva com sucesso!'})
     except ValueError as e:
         db.session.rollback()
@@ -364,8 +450,11 @@ def remover_aula():
     try:
         aula = db.session.get(Horario, int(horario_id))
         if aula:
+            par = (aula.turma_id, aula.semana_id)
+            CargaHorariaService.registrar_aula(aula, -1)
             db.session.delete(aula)
             db.session.commit()
+            HorarioCacheService.invalidar({par})
             return jsonify({'success': True, 'message': 'Aula removida com sucesso!'})
         return jsonify({'success': False, 'message': 'Aula não encontrada.'}), 404
     except Exception as e:
@@ -373,6 +462,37 @@ def remover_aula():
         current_app.logger.error(f"Erro ao remover aula: {e}")
         return jsonify({'success': False, 'message': 'Ocorreu um erro ao remover a aula.'}), 500
 
+@horario_bp.route('/conflitos/<int:semana_id>')
+@login_required
+@admin_or_programmer_required
+def conflitos_semana(semana_id):
+    """Sobreposições de aulas da semana por instrutor e por pelotão (JSON)."""
+    if not db.session.get(Semana, semana_id):
+        return jsonify({'success': False, 'message': 'Semana não encontrada.'}), 404
+    conflitos = ConflitoHorarioService.conflitos_da_semana(semana_id)
+    return jsonify({'success': True, 'semana_id': semana_id, 'total': len(conflitos), 'conflitos': conflitos})
+
+@horario_bp.route('/gerar-proposta/<int:turma_id>/<int:semana_id>', methods=['POST'])
+@login_required
+@admin_or_programmer_required
+def gerar_proposta(turma_id, semana_id):
+    """Proposta automática das aulas da semana para as vagas livres do pelotão (nada é gravado)."""
+    success, message, proposta = GeradorHorarioService.gerar_proposta(turma_id, semana_id)
+    return jsonify({'success': success, 'message': message, 'proposta': proposta}), 200 if success else 400
+
+@horario_bp.route('/aplicar-proposta', methods=['POST'])
+@login_required
+@admin_or_programmer_required
+def aplicar_proposta():
+    data = request.json or {}
+    try:
+        turma_id = int(data.get('turma_id'))
+        semana_id = int(data.get('semana_id'))
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'message': 'Dados inválidos fornecidos.'}), 400
+    success, message = GeradorHorarioService.aplicar_proposta(turma_id, semana_id, data.get('aulas') or [])
+    return jsonify({'success': success, 'message': message}), 200 if success else 400
+
 @horario_bp.route('/aprovar', methods=['GET', 'POST'])
 @login_required
 @admin_or_programmer_required
@@ -382,56 +502,25 @@ def aprovar_horarios():
         action = request.form.get('action')
         horario = db.session.get(Horario, int(horario_id))
         if horario:
+            par = (horario.turma_id, horario.semana_id)
             if action == 'aprovar':
+                CargaHorariaService.registrar_aula(horario, -1)
                 horario.status = 'confirmado'
+                CargaHorariaService.registrar_aula(horario, 1)
                 flash(f'Aula de {horario.disciplina.materia} aprovada com sucesso!', 'success')
             elif action == 'negar':
+                CargaHorariaService.registrar_aula(horario, -1)
                 db.session.delete(horario)
                 flash(f'Aula de {horario.disciplina.materia} negada e removida com sucesso!', 'warning')
             db.session.commit()
+            HorarioCacheService.invalidar({par})
         else:
             flash('Horário não encontrado.', 'danger')
         return redirect(url_for('horario.aprovar_horarios'))
-    aulas_pendentes = db.session.scalars(select(Horario).options(joinedload(Horario.disciplina)).where(Horario.status == 'pendente').order_by(Horario.id)).all()
+    aulas_pendentes = db.session.scalars(select(Horario).options(joinedload(Horario.disciplina), joinedload(Horario.turma)).where(Horario.status == 'pendente').order_by(Horario.id)).all()
     return render_template('aprovar_horarios.html', aulas_pendentes=aulas_pendentes)
 
-def construir_matriz_horario(pelotao, semana_id, ciclo):
-    a_disposicao = {'materia': 'A disposição do C Al /S Ens', 'instrutor': None, 'duracao': 1, 'is_disposicao': True, 'id': None}
-    horario_matrix = [[dict(a_disposicao) for _ in range(7)] for _ in range(15)]
-    dias = ['segunda', 'terca', 'quarta', 'quinta', 'sexta', 'sabado', 'domingo']
-    
-    aulas_agendadas = db.session.scalars(
-        select(Horario).options(joinedload(Horario.disciplina), joinedload(Horario.instrutor).joinedload(Instrutor.user))
-        .join(Disciplina)
-        .where(
-            Horario.pelotao == pelotao, 
-            Horario.semana_id == semana_id,
-            Disciplina.ciclo == ciclo
-        )
-    ).all()
-
-    for aula in aulas_agendadas:
-        try:
-            dia_idx = dias.index(aula.dia_semana)
-            periodo_idx = aula.periodo - 1
-            if 0 <= periodo_idx < 15 and 0 <= dia_idx < 7:
-                instrutor_nome = "N/D"
-                if aula.instrutor and aula.instrutor.user:
-                    instrutor_nome = aula.instrutor.user.nome_completo or aula.instrutor.user.username
-                can_edit = can_edit_horario(aula.id)
-                aula_info = {
-                    'id': aula.id,
-                    'materia': aula.disciplina.materia,
-                    'instrutor': instrutor_nome,
-                    'duracao': aula.duracao,
-                    'status': aula.status,
-                    'is_disposicao': False,
-                    'can_edit': can_edit,
-                }
-                horario_matrix[periodo_idx][dia_idx] = aula_info
-                for i in range(1, aula.duracao):
-                    if periodo_idx + i < 15:
-                        horario_matrix[periodo_idx + i][dia_idx] = 'SKIP'
-        except (ValueError, IndexError):
-            continue
-    return horario_matrix
\ No newline at end of file
+def construir_matriz_horario(turma_id, semana_id, ciclo, contexto=None):
+    if contexto is None:
+        contexto = HorarioPermissionContext.from_user(current_user)
+    return HorarioService.construir_matriz_horario(turma_id, semana_id, ciclo, contexto)
@@ -1,10 +1,16 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app
 from flask_login import login_required, current_user
 from werkzeug.security import generate_password_hash
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
 
 from ..models.database import db
 from ..models.user import User
+from ..models.horario import Horario
+from ..models.disciplina_turma import DisciplinaTurma
+from ..models.saldo_horas_pagas import SaldoHorasPagas
 from ..services.instrutor_service import InstrutorService
+from ..services.auth_service import AuthService
 from ..services.disciplina_service import DisciplinaService
 from utils.decorators import admin_or_programmer_required
 from utils.validators import validate_email, validate_password_strength
@@ -115,13 +121,29 @@ def excluir_instrutor(instrutor_id):
         flash("Instrutor não encontrado.", 'danger')
         return redirect(url_for('instrutor.listar_instrutores'))
 
+    # Aulas e saldos de períodos fechados são o histórico de pagamento do instrutor
+    if (db.session.scalar(select(Horario.id).where(Horario.instrutor_id == instrutor_id).limit(1))
+            or db.session.scalar(select(SaldoHorasPagas.id).where(SaldoHorasPagas.instrutor_id == instrutor_id).limit(1))):
+        flash('Não é possível excluir este instrutor: há aulas ou pagamentos registrados em seu nome.', 'danger')
+        return redirect(url_for('instrutor.listar_instrutores'))
+
     try:
         user_a_deletar = instrutor.user
+        user_id = user_a_deletar.id
+        # Libera as vagas de instrutor nos vínculos de disciplina por turma
+        db.session.execute(update(DisciplinaTurma).where(DisciplinaTurma.instrutor_id_1 == instrutor_id).values(instrutor_id_1=None))
+        db.session.execute(update(DisciplinaTurma).where(DisciplinaTurma.instrutor_id_2 == instrutor_id).values(instrutor_id_2=None))
+        AuthService.desvincular_registros(user_id)
         db.session.delete(user_a_deletar)
         db.session.commit()
+        AuthService.invalidar_usuario(user_id)
         flash('Instrutor excluído com sucesso!', 'success')
+    except IntegrityError:
+        db.session.rollback()
+        flash('Não é possível excluir este instrutor: há imagens ou outros registros cadastrados em seu nome.', 'danger')
     except Exception as e:
         db.session.rollback()
-        flash(f'Erro ao excluir instrutor: {e}', 'danger')
+        current_app.logger.error(f"Erro ao excluir instrutor {instrutor_id}: {e}")
+        flash('Erro ao excluir instrutor. Tente novamente.', 'danger')
 
     return redirect(url_for('instrutor.listar_instrutores'))
\ No newline at end of file
@@ -1,9 +1,9 @@
-from flask import Blueprint, render_template, redirect, url_for, request, flash
+from flask import Blueprint, render_template, redirect, url_for, request, flash, jsonify
 from flask_login import login_required, current_user
-from ..models.user import User
-from ..app import db
+from ..services.auth_service import AuthService
+from ..services.busca_service import BuscaService
 # IMPORTAÇÃO DO NOVO DECORADOR
-from utils.decorators import aluno_profile_required
+from utils.decorators import aluno_profile_required, admin_or_programmer_required
 
 main_bp = Blueprint('main', __name__)
 
@@ -29,32 +29,46 @@ def pre_cadastro():
         return redirect(url_for('main.dashboard'))
 
     if request.method == 'POST':
-        id_func = request.form.get('id_func', '').strip()
+        id_funcs_raw = request.form.get('id_funcs', '')
         role = request.form.get('role')
 
-        if not id_func or not role:
+        if not id_funcs_raw.strip() or role not in ['aluno', 'instrutor']:
             flash('Por favor, preencha todos os campos.', 'warning')
             return render_template('pre_cadastro.html')
 
-        if not id_func.isdigit():
-            flash('A Identidade Funcional deve conter apenas números.', 'danger')
-            return render_template('pre_cadastro.html')
+        criados, ignorados, invalidos = AuthService.pre_cadastrar_em_lote(id_funcs_raw, role)
 
-        # Verifica se um usuário com esta Id Func já existe
-        user_exists = db.session.execute(db.select(User).filter_by(id_func=id_func)).scalar_one_or_none()
-
-        if user_exists:
-            flash(f'A Id Func "{id_func}" já está pré-cadastrada no sistema.', 'danger')
-        else:
-            new_user = User(
-                id_func=id_func,
-                role=role,
-                is_active=False # O usuário é criado como inativo
-            )
-            db.session.add(new_user)
-            db.session.commit()
-            flash(f'Usuário com Id Func "{id_func}" pré-cadastrado com sucesso!', 'success')
+        if criados:
+            flash(f'{criados} usuário(s) pré-cadastrado(s) com sucesso!', 'success')
+        if ignorados:
+            flash(f'{ignorados} Id Func já estava(m) pré-cadastrada(s) no sistema e foi(ram) ignorada(s).', 'info')
+        if invalidos:
+            exemplos = ', '.join(invalidos[:10]) + ('...' if len(invalidos) > 10 else '')
+            flash(f'{len(invalidos)} valor(es) ignorado(s) por não conter(em) apenas números: {exemplos}', 'danger')
 
         return redirect(url_for('main.pre_cadastro'))
 
-    return render_template('pre_cadastro.html')
\ No newline at end of file
+    return render_template('pre_cadastro.html')
+
+@main_bp.route('/busca/pessoas')
+@login_required
+@admin_or_programmer_required
+def buscar_pessoas():
+    """Typeahead de alunos e instrutores (nome, nome de guerra, Id Func, e-mail, matrícula, OPM)."""
+    limite = min(max(request.args.get('limite', 10, type=int), 1), 50)
+    resultados = []
+    for pessoa in BuscaService.buscar_pessoas(request.args.get('q', ''), limite):
+        url = None
+        if pessoa['aluno_id']:
+            url = url_for('aluno.editar_aluno', aluno_id=pessoa['aluno_id'])
+        elif pessoa['instrutor_id']:
+            url = url_for('instrutor.editar_instrutor', instrutor_id=pessoa['instrutor_id'])
+        resultados.append({
+            'user_id': pessoa['user_id'],
+            'nome': pessoa['nome_completo'] or pessoa['id_func'],
+            'nome_de_guerra': pessoa['nome_de_guerra'],
+            'id_func': pessoa['id_func'],
+            'role': pessoa['role'],
+            'url': url,
+        })
+    return jsonify(resultados)
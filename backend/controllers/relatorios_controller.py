@@ -1,20 +1,13 @@
-from flask import Blueprint, render_template, request, flash, Response
-from flask_login import login_required
-from weasyprint import HTML
+from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify, send_file, abort, Response, stream_with_context
+from flask_login import login_required, current_user
 from datetime import datetime
 from ..services.relatorio_service import RelatorioService
 from ..services.instrutor_service import InstrutorService
+from ..services.pagamento_service import PagamentoService
+from ..services.relatorio_job_service import RelatorioJobService
+from ..services.relatorio_cache_service import RelatorioCacheService
+from ..services.relatorio_lote_service import RelatorioLoteService
 from utils.decorators import admin_or_programmer_required
-import locale
-
-# Configura o locale para Português do Brasil para traduzir o mês
-try:
-    locale.setlocale(locale.LC_TIME, 'pt_BR.UTF-8')
-except locale.Error:
-    try:
-        locale.setlocale(locale.LC_TIME, 'Portuguese_Brazil')
-    except locale.Error:
-        print("Locale pt_BR não pôde ser configurado.")
 
 
 relatorios_bp = Blueprint('relatorios', __name__, url_prefix='/relatorios')
@@ -26,6 +19,27 @@ def index():
     """Página que exibe os tipos de relatório disponíveis."""
     return render_template('relatorios/index.html')
 
+def _prefere_json():
+    return request.accept_mimetypes.best_match(['application/json', 'text/html']) == 'application/json'
+
+def _job_payload(job):
+    payload = {
+        'success': True,
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': url_for('relatorios.status_job', job_id=job.id),
+    }
+    if job.status == 'concluido':
+        payload['download_url'] = url_for('relatorios.download_job', job_id=job.id)
+    if job.status == 'erro':
+        payload['message'] = job.erro
+    return payload
+
+def _enviar_pdf(chave, report_type):
+    return send_file(RelatorioCacheService.caminho(chave), mimetype='application/pdf',
+                     as_attachment=True, download_name=f'relatorio_{report_type}.pdf',
+                     etag=chave, conditional=True)
+
 @relatorios_bp.route('/gerar', methods=['GET', 'POST'])
 @login_required
 @admin_or_programmer_required
@@ -55,44 +69,102 @@ def gerar_relatorio_horas_aula():
             flash('Formato de data inválido. Use AAAA-MM-DD.', 'danger')
             return render_template('relatorios/horas_aula_form.html', tipo_relatorio=report_type.replace("_", " ").title(), todos_instrutores=todos_instrutores)
 
-        is_rr_filter = report_type == 'efetivo_rr'
         instrutor_ids_filter = None
         if report_type == 'por_instrutor':
             instrutor_ids_filter = [int(id) for id in request.form.getlist('instrutor_ids')]
-            if not instrutor_ids_filter:
+            # No lote, nenhuma seleção significa todos os instrutores com aulas no período
+            if not instrutor_ids_filter and action != 'lote':
                 flash('Por favor, selecione pelo menos um instrutor para este tipo de relatório.', 'warning')
                 return render_template('relatorios/horas_aula_form.html', tipo_relatorio=report_type.replace("_", " ").title(), todos_instrutores=todos_instrutores)
 
-        dados_relatorio = RelatorioService.get_horas_aula_por_instrutor(
-            data_inicio, data_fim, is_rr_filter, instrutor_ids_filter
-        )
-
-        # String de Mês e Ano formatada corretamente
-        nome_mes_ano = data_inicio.strftime("%B de %Y").capitalize()
-        
-        titulo_curso = f"NOME DO CURSO: {curso_nome}"
-        if report_type == 'efetivo_rr':
-            titulo_curso += " (EFETIVO RR)"
-        
-        rendered_html = render_template('relatorios/pdf_template.html',
-                                        dados=dados_relatorio,
-                                        data_inicio=data_inicio,
-                                        data_fim=data_fim,
-                                        titulo_curso=titulo_curso,
-                                        nome_mes_ano=nome_mes_ano, # Variável atualizada
-                                        comandante_nome=comandante_nome,
-                                        auxiliar_nome=auxiliar_nome,
-                                        valor_hora_aula=55.19)
+        parametros = {
+            'tipo': report_type,
+            'data_inicio': data_inicio.isoformat(),
+            'data_fim': data_fim.isoformat(),
+            'instrutor_ids': instrutor_ids_filter,
+            'curso_nome': curso_nome,
+            'comandante_nome': comandante_nome,
+            'auxiliar_nome': auxiliar_nome,
+        }
 
         if action == 'preview':
-            return rendered_html
+            return RelatorioService.render_relatorio_horas_aula(parametros)
+
+        if action == 'lote' and report_type == 'por_instrutor':
+            return Response(
+                stream_with_context(RelatorioLoteService.gerar_zip_por_instrutor(parametros)),
+                mimetype='application/zip',
+                headers={'Content-Disposition': 'attachment; filename=relatorios_por_instrutor.zip'}
+            )
 
         if action == 'download':
-            pdf = HTML(string=rendered_html).write_pdf()
-            return Response(pdf, mimetype='application/pdf', headers={
-                'Content-Disposition': f'attachment; filename=relatorio_{report_type}.pdf'
-            })
+            dados_relatorio = RelatorioService.get_dados_relatorio(parametros)
+            chave = RelatorioCacheService.chave(parametros, dados_relatorio)
+            if RelatorioCacheService.get(chave):
+                if _prefere_json():
+                    return jsonify({'success': True, 'status': 'concluido',
+                                    'download_url': url_for('relatorios.download_pdf', chave=chave, tipo=report_type)})
+                return _enviar_pdf(chave, report_type)
+
+            success, message, job = RelatorioJobService.enfileirar(parametros, current_user.id)
+            if not success:
+                if _prefere_json():
+                    return jsonify({'success': False, 'message': message}), 429
+                flash(message, 'warning')
+                return render_template('relatorios/horas_aula_form.html', tipo_relatorio=report_type.replace("_", " ").title(), todos_instrutores=todos_instrutores)
+
+            if _prefere_json():
+                return jsonify(_job_payload(job)), 202
+            return render_template('relatorios/job_status.html', job=job, status=_job_payload(job))
 
     return render_template('relatorios/horas_aula_form.html', 
                            tipo_relatorio=report_type.replace("_", " ").title(), 
-                           todos_instrutores=todos_instrutores)
\ No newline at end of file
+                           todos_instrutores=todos_instrutores)
+
+@relatorios_bp.route('/jobs/<int:job_id>')
+@login_required
+@admin_or_programmer_required
+def status_job(job_id):
+    """Consulta o andamento da geração de um PDF."""
+    job = RelatorioJobService.get_job(job_id)
+    if not job:
+        return jsonify({'success': False, 'message': 'Relatório não encontrado.'}), 404
+    return jsonify(_job_payload(job))
+
+@relatorios_bp.route('/jobs/<int:job_id>/download')
+@login_required
+@admin_or_programmer_required
+def download_job(job_id):
+    job = RelatorioJobService.get_job(job_id)
+    if not job or job.status != 'concluido' or not RelatorioJobService.caminho_arquivo(job):
+        abort(404)
+    return _enviar_pdf(job.arquivo.rsplit('.', 1)[0], job.tipo)
+
+@relatorios_bp.route('/pdf/<chave>')
+@login_required
+@admin_or_programmer_required
+def download_pdf(chave):
+    """Entrega um PDF já presente no cache."""
+    if not RelatorioCacheService.get(chave):
+        abort(404)
+    return _enviar_pdf(chave, request.args.get('tipo', 'mensal'))
+
+@relatorios_bp.route('/fechar-periodo', methods=['GET', 'POST'])
+@login_required
+@admin_or_programmer_required
+def fechar_periodo():
+    """Fecha um período de pagamento, congelando o saldo de horas pagas por instrutor e disciplina."""
+    if request.method == 'POST':
+        try:
+            data_inicio = datetime.strptime(request.form.get('data_inicio', ''), '%Y-%m-%d').date()
+            data_fim = datetime.strptime(request.form.get('data_fim', ''), '%Y-%m-%d').date()
+        except ValueError:
+            flash('Formato de data inválido. Use AAAA-MM-DD.', 'danger')
+            return redirect(url_for('relatorios.fechar_periodo'))
+
+        success, message = PagamentoService.fechar_periodo(data_inicio, data_fim, current_user.id)
+        flash(message, 'success' if success else 'danger')
+        return redirect(url_for('relatorios.fechar_periodo'))
+
+    periodos = PagamentoService.get_periodos_fechados()
+    return render_template('relatorios/fechar_periodo.html', periodos=periodos)
\ No newline at end of file
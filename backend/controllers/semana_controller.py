@@ -7,6 +7,8 @@ import re
 from ..models.database import db
 from ..models.semana import Semana
 from ..models.horario import Horario
+from ..services.carga_horaria_service import CargaHorariaService
+from ..services.horario_cache_service import HorarioCacheService
 from utils.decorators import admin_or_programmer_required
 
 semana_bp = Blueprint('semana', __name__, url_prefix='/semana')
@@ -138,9 +140,12 @@ def deletar_semana(semana_id):
     semana = db.session.get(Semana, semana_id)
     if semana:
         ciclo_redirect = semana.ciclo
+        pares = HorarioCacheService.pares(Horario.semana_id == semana_id)
+        CargaHorariaService.descontar_horarios(Horario.semana_id == semana_id)
         db.session.query(Horario).filter_by(semana_id=semana_id).delete()
         db.session.delete(semana)
         db.session.commit()
+        HorarioCacheService.invalidar(pares)
         flash('Semana e todas as suas aulas foram deletadas com sucesso.', 'success')
         return redirect(url_for('semana.gerenciar_semanas', ciclo=ciclo_redirect))
     else:
@@ -1,6 +1,7 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app
 from flask_login import login_required, current_user
 from sqlalchemy import select, or_
+from sqlalchemy.exc import IntegrityError
 
 from ..models.database import db
 from ..models.turma import Turma
@@ -9,6 +10,9 @@ from ..models.disciplina_turma import DisciplinaTurma
 from ..models.instrutor import Instrutor
 from ..models.disciplina import Disciplina
 from ..models.turma_cargo import TurmaCargo
+from ..models.horario import Horario
+from ..services.carga_horaria_service import CargaHorariaService
+from ..services.auth_service import AuthService
 from utils.decorators import admin_or_programmer_required
 
 turma_bp = Blueprint('turma', __name__, url_prefix='/turma')
@@ -117,6 +121,8 @@ def cadastrar_turma():
                 if aluno:
                     aluno.turma_id = nova_turma.id
             db.session.commit()
+            # A turma faz parte do perfil de aluno guardado no cache de usuários
+            AuthService.invalidar_usuario()
 
         flash('Turma cadastrada com sucesso!', 'success')
         return redirect(url_for('turma.listar_turmas'))
@@ -163,6 +169,7 @@ def editar_turma(turma_id):
                 aluno.turma_id = turma.id
 
         db.session.commit()
+        AuthService.invalidar_usuario()
         flash('Turma atualizada com sucesso!', 'success')
         return redirect(url_for('turma.listar_turmas'))
 
@@ -183,17 +190,29 @@ def excluir_turma(turma_id):
         flash('Turma não encontrada.', 'danger')
         return redirect(url_for('turma.listar_turmas'))
 
+    # As aulas são o histórico usado no relatório de horas-aula (pagamento)
+    # e não podem ser apagadas junto com a turma
+    if db.session.scalar(select(Horario.id).where(Horario.turma_id == turma_id).limit(1)):
+        flash(f'Não é possível excluir a turma "{turma.nome}": há aulas registradas no quadro horário dela.', 'danger')
+        return redirect(url_for('turma.listar_turmas'))
+
     try:
         nome_turma_excluida = turma.nome
         for aluno in turma.alunos:
             aluno.turma_id = None
         db.session.query(TurmaCargo).filter_by(turma_id=turma_id).delete()
-        db.session.query(DisciplinaTurma).filter_by(pelotao=turma.nome).delete()
+        CargaHorariaService.remover_turma(turma_id)
+        db.session.query(DisciplinaTurma).filter_by(turma_id=turma_id).delete()
         db.session.delete(turma)
         db.session.commit()
+        AuthService.invalidar_usuario()
         flash(f'Turma "{nome_turma_excluida}" e todos os seus vínculos foram excluídos com sucesso!', 'success')
+    except IntegrityError:
+        db.session.rollback()
+        flash(f'Não é possível excluir a turma "{nome_turma_excluida}": há registros vinculados a ela.', 'danger')
     except Exception as e:
         db.session.rollback()
-        flash(f'Erro ao excluir a turma: {str(e)}', 'danger')
+        current_app.logger.error(f"Erro ao excluir a turma {turma_id}: {e}")
+        flash('Erro ao excluir a turma. Tente novamente.', 'danger')
 
     return redirect(url_for('turma.listar_turmas'))
\ No newline at end of file
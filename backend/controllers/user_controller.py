@@ -2,6 +2,9 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_required, current_user
 from ..models.database import db
 from ..models.user import User
+from ..models.horario import Horario
+from ..services.auth_service import AuthService
+from ..services.horario_cache_service import HorarioCacheService
 from werkzeug.security import check_password_hash
 
 user_bp = Blueprint('user', __name__, url_prefix='/usuario')
@@ -22,6 +25,7 @@ def meu_perfil():
         confirmar_nova_senha = request.form.get('confirmar_nova_senha')
 
         # Atualiza informações básicas do usuário
+        renomeado = current_user.nome_completo != nome_completo
         current_user.nome_completo = nome_completo
         current_user.nome_de_guerra = nome_de_guerra
         current_user.email = email
@@ -45,6 +49,10 @@ def meu_perfil():
                 flash('Senha alterada com sucesso!', 'success')
         
         db.session.commit()
+        AuthService.invalidar_usuario(current_user.id)
+        if renomeado and current_user.instrutor_profile:
+            # O nome do instrutor aparece nas matrizes do quadro horário em cache
+            HorarioCacheService.invalidar(HorarioCacheService.pares(Horario.instrutor_id == current_user.instrutor_profile.id))
         flash('Perfil atualizado com sucesso!', 'success')
         return redirect(url_for('user.meu_perfil'))
 
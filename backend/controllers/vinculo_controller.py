@@ -16,21 +16,22 @@ vinculo_bp = Blueprint('vinculo', __name__, url_prefix='/vinculos')
 @login_required
 @admin_or_programmer_required
 def gerenciar_vinculos():
-    turma_filtrada = request.args.get('turma', '')
+    turma_filtrada = request.args.get('turma', type=int)
     disciplina_filtrada_id = request.args.get('disciplina_id', '')
 
     query = db.select(DisciplinaTurma).options(
         joinedload(DisciplinaTurma.instrutor_1).joinedload(Instrutor.user),
-        joinedload(DisciplinaTurma.disciplina)
-    ).filter(DisciplinaTurma.instrutor_id_1.isnot(None))
+        joinedload(DisciplinaTurma.disciplina),
+        joinedload(DisciplinaTurma.turma)
+    ).join(Turma, DisciplinaTurma.turma_id == Turma.id).filter(DisciplinaTurma.instrutor_id_1.isnot(None))
 
     if turma_filtrada:
-        query = query.filter(DisciplinaTurma.pelotao == turma_filtrada)
+        query = query.filter(DisciplinaTurma.turma_id == turma_filtrada)
 
     if disciplina_filtrada_id:
         query = query.filter(DisciplinaTurma.disciplina_id == int(disciplina_filtrada_id))
 
-    query = query.order_by(DisciplinaTurma.pelotao, DisciplinaTurma.disciplina_id)
+    query = query.order_by(Turma.nome, DisciplinaTurma.disciplina_id)
 
     vinculos = db.session.scalars(query).all()
 
@@ -66,7 +67,7 @@ def adicionar_vinculo():
 
         vinculo_existente = DisciplinaTurma.query.filter_by(
             disciplina_id=int(disciplina_id),
-            pelotao=turma.nome
+            turma_id=turma.id
         ).first()
 
         if vinculo_existente:
@@ -75,7 +76,7 @@ def adicionar_vinculo():
         else:
             novo_vinculo = DisciplinaTurma(
                 instrutor_id_1=int(instrutor_id),
-                pelotao=turma.nome,
+                turma_id=turma.id,
                 disciplina_id=int(disciplina_id)
             )
             db.session.add(novo_vinculo)
@@ -112,7 +113,7 @@ def editar_vinculo(vinculo_id):
             return redirect(url_for('vinculo.editar_vinculo', vinculo_id=vinculo_id))
 
         vinculo.instrutor_id_1 = int(instrutor_id)
-        vinculo.pelotao = turma.nome
+        vinculo.turma_id = turma.id
         vinculo.disciplina_id = int(disciplina_id)
         db.session.commit()
 
@@ -6,8 +6,9 @@ import sys
 # Isso resolve o erro de importação.
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
 
-from app import create_app, db
-from models.user import User
+from backend.app import create_app
+from backend.models.database import db
+from backend.models.user import User
 from werkzeug.security import generate_password_hash # type: ignore
 
 # Cria e inicializa o aplicativo Flask
@@ -0,0 +1,169 @@
+"""
+Gerador determinístico de dados sintéticos em volume de produção.
+
+Usado pelo comando 'flask seed-bench' e pelos scripts de benchmark. A mesma
+semente gera sempre os mesmos pelotões, pessoas, vínculos, grade e notas.
+Todas as inserções são feitas em lote pelo Core (sem instâncias ORM por linha).
+"""
+import math
+import random
+from datetime import date, timedelta
+from sqlalchemy import insert, select
+from werkzeug.security import generate_password_hash
+from backend.models.database import db
+from backend.models.user import User
+from backend.models.aluno import Aluno
+from backend.models.instrutor import Instrutor
+from backend.models.turma import Turma
+from backend.models.semana import Semana
+from backend.models.disciplina import Disciplina
+from backend.models.disciplina_turma import DisciplinaTurma
+from backend.models.horario import Horario
+from backend.models.historico_disciplina import HistoricoDisciplina
+from backend.services.carga_horaria_service import CargaHorariaService
+
+SENHA_PADRAO = 'Bench@2025'
+
+DIAS = ['segunda', 'terca', 'quarta', 'quinta', 'sexta', 'sabado']
+PERIODOS = 15
+VAGAS_POR_SEMANA = len(DIAS) * PERIODOS
+
+_NOMES = ['Ana', 'Bruno', 'Carla', 'Diego', 'Eduarda', 'Felipe', 'Gabriela', 'Henrique', 'Isabela', 'João',
+          'Juliana', 'Lucas', 'Mariana', 'Nicolas', 'Otávio', 'Paula', 'Rafael', 'Sabrina', 'Thiago', 'Vitória']
+_SOBRENOMES = ['Almeida', 'Barbosa', 'Cardoso', 'Dias', 'Esteves', 'Ferreira', 'Gonçalves', 'Hoffmann', 'Ilha',
+               'Jardim', 'Klein', 'Lopes', 'Machado', 'Nunes', 'Oliveira', 'Pereira', 'Ribeiro', 'Santos', 'Teixeira', 'Vieira']
+_OPMS = ['1º BPM', '3º BPM', '9º BPM', '11º BPM', '19º BPM', '20º BPM', 'BOE', 'CPC', 'BPTran', '4º BPChq']
+_POSTOS = ['Sd PM', 'Sgt PM', '2º Sgt PM', '1º Sgt PM', 'Ten PM', 'Cap PM']
+
+
+def _nome(rng):
+    return f"{rng.choice(_NOMES)} {rng.choice(_SOBRENOMES)} {rng.choice(_SOBRENOMES)}"
+
+
+def popular(semente=42, pelotoes=20, alunos=3000, instrutores=150, disciplinas=45,
+            ciclos=3, horarios=200000, semanas=None):
+    """
+    Popula um banco vazio e retorna um resumo com as quantidades geradas.
+    Sem 'semanas', cria as necessárias para acomodar 'horarios' aulas
+    distribuídas igualmente entre os ciclos.
+    """
+    rng = random.Random(semente)
+    db.create_all()
+
+    senha_hash = generate_password_hash(SENHA_PADRAO)
+    db.session.execute(insert(User), [{'id_func': 'ADMIN', 'username': 'admin', 'email': 'admin@bench.local',
+                                       'role': 'admin', 'is_active': True, 'password_hash': senha_hash}])
+
+    # Instrutores
+    db.session.execute(insert(User), [
+        {'id_func': str(100000 + i), 'username': str(100000 + i), 'nome_completo': _nome(rng),
+         'nome_de_guerra': rng.choice(_SOBRENOMES), 'email': f'instrutor{i}@bench.local',
+         'role': 'instrutor', 'is_active': True, 'password_hash': senha_hash}
+        for i in range(instrutores)
+    ])
+    user_ids = db.session.scalars(select(User.id).where(User.role == 'instrutor').order_by(User.id)).all()
+    db.session.execute(insert(Instrutor), [
+        {'user_id': uid, 'matricula': str(100000 + i), 'especializacao': rng.choice(['Tiro', 'Direito', 'Trânsito', 'APH', 'Gestão']),
+         'formacao': 'Superior', 'posto_graduacao': rng.choice(_POSTOS), 'is_rr': rng.random() < 0.2}
+        for i, uid in enumerate(user_ids)
+    ])
+    instrutor_ids = db.session.scalars(select(Instrutor.id).order_by(Instrutor.id)).all()
+
+    # Pelotões, semanas e disciplinas
+    db.session.execute(insert(Turma), [{'nome': f'{i + 1}º Pelotão', 'ano': 2025} for i in range(pelotoes)])
+    turma_ids = db.session.scalars(select(Turma.id).order_by(Turma.id)).all()
+
+    if semanas is None:
+        semanas = max(ciclos, math.ceil(horarios / (pelotoes * VAGAS_POR_SEMANA)))
+    inicio = date(2025, 1, 6)
+    db.session.execute(insert(Semana), [
+        {'nome': f'Semana {i + 1}', 'data_inicio': inicio + timedelta(weeks=i),
+         'data_fim': inicio + timedelta(weeks=i, days=5), 'ciclo': 1 + i * ciclos // semanas}
+        for i in range(semanas)
+    ])
+    lista_semanas = db.session.execute(select(Semana.id, Semana.ciclo).order_by(Semana.id)).all()
+
+    db.session.execute(insert(Disciplina), [
+        {'materia': f'Disciplina {i + 1:03d}', 'carga_horaria_prevista': rng.choice([20, 30, 40, 60]), 'ciclo': 1 + i % ciclos}
+        for i in range(disciplinas)
+    ])
+    lista_disciplinas = db.session.execute(select(Disciplina.id, Disciplina.ciclo).order_by(Disciplina.id)).all()
+    por_ciclo = {}
+    for d in lista_disciplinas:
+        por_ciclo.setdefault(d.ciclo, []).append(d.id)
+
+    # Vínculos disciplina x pelotão (um quarto com segundo instrutor)
+    vinculos, instrutor_da = [], {}
+    for turma_id in turma_ids:
+        for d in lista_disciplinas:
+            instrutor_id = rng.choice(instrutor_ids)
+            instrutor_da[(turma_id, d.id)] = instrutor_id
+            vinculos.append({'turma_id': turma_id, 'disciplina_id': d.id, 'instrutor_id_1': instrutor_id,
+                             'instrutor_id_2': rng.choice(instrutor_ids) if rng.random() < 0.25 else None})
+    db.session.execute(insert(DisciplinaTurma), vinculos)
+
+    # Grade: as aulas são repartidas entre todas as semanas de todos os pelotões
+    por_semana = min(VAGAS_POR_SEMANA, math.ceil(horarios / (pelotoes * semanas)))
+    vagas = [(dia, periodo) for dia in DIAS for periodo in range(1, PERIODOS + 1)]
+    lote, total_horarios = [], 0
+    for turma_id in turma_ids:
+        for s in lista_semanas:
+            for dia, periodo in rng.sample(vagas, por_semana):
+                if total_horarios >= horarios:
+                    break
+                disciplina_id = rng.choice(por_ciclo[s.ciclo])
+                lote.append({'turma_id': turma_id, 'dia_semana': dia, 'periodo': periodo, 'duracao': 1,
+                             'semana_id': s.id, 'disciplina_id': disciplina_id,
+                             'instrutor_id': instrutor_da[(turma_id, disciplina_id)],
+                             'status': 'pendente' if rng.random() < 0.05 else 'confirmado'})
+                total_horarios += 1
+            if len(lote) >= 20000:
+                db.session.execute(insert(Horario), lote)
+                lote = []
+    if lote:
+        db.session.execute(insert(Horario), lote)
+
+    # Alunos, distribuídos entre os pelotões, com as notas do primeiro ciclo lançadas
+    aluno_ids = []
+    if alunos:
+        db.session.execute(insert(User), [
+            {'id_func': str(500000 + i), 'username': str(500000 + i), 'nome_completo': _nome(rng),
+             'nome_de_guerra': rng.choice(_SOBRENOMES), 'email': f'aluno{i}@bench.local',
+             'role': 'aluno', 'is_active': True, 'password_hash': senha_hash}
+            for i in range(alunos)
+        ])
+        aluno_user_ids = db.session.scalars(select(User.id).where(User.role == 'aluno').order_by(User.id)).all()
+        db.session.execute(insert(Aluno), [
+            {'user_id': uid, 'matricula': str(500000 + i), 'opm': rng.choice(_OPMS), 'num_aluno': str(i + 1),
+             'turma_id': turma_ids[i % len(turma_ids)], 'foto_perfil': 'default.png'}
+            for i, uid in enumerate(aluno_user_ids)
+        ])
+        aluno_ids = db.session.scalars(select(Aluno.id).order_by(Aluno.id)).all()
+
+        matriculas = []
+        for aluno_id in aluno_ids:
+            for d in lista_disciplinas:
+                linha = {'aluno_id': aluno_id, 'disciplina_id': d.id, 'status': 'cursando',
+                         'nota_p1': None, 'nota_p2': None, 'nota': None}
+                if d.ciclo == 1:
+                    linha['nota_p1'] = round(rng.uniform(5, 10), 1)
+                    linha['nota_p2'] = round(rng.uniform(5, 10), 1)
+                    linha['nota'] = round((linha['nota_p1'] + linha['nota_p2']) / 2, 3)
+                matriculas.append(linha)
+            if len(matriculas) >= 20000:
+                db.session.execute(insert(HistoricoDisciplina), matriculas)
+                matriculas = []
+        if matriculas:
+            db.session.execute(insert(HistoricoDisciplina), matriculas)
+
+    db.session.commit()
+    CargaHorariaService.rebuild()
+
+    return {
+        'pelotoes': len(turma_ids),
+        'semanas': len(lista_semanas),
+        'disciplinas': len(lista_disciplinas),
+        'instrutores': len(instrutor_ids),
+        'alunos': len(aluno_ids),
+        'horarios': total_horarios,
+    }
@@ -11,6 +11,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from backend.app import create_app
 from backend.models.database import db
 from backend.models.disciplina_turma import DisciplinaTurma
+from backend.models.turma import Turma
 from backend.models.disciplina import Disciplina
 from backend.models.instrutor import Instrutor
 from backend.models.user import User
@@ -62,10 +63,12 @@ def debug_associacoes():
         
         # 3. Verificar associação para Turma 5
         pelotao = "5° Pelotão"
+        turma = db.session.execute(select(Turma).where(Turma.nome == pelotao)).scalar_one_or_none()
+        turma_id = turma.id if turma else None
         associacao = db.session.execute(
             select(DisciplinaTurma).where(
                 DisciplinaTurma.disciplina_id == disciplina.id,
-                DisciplinaTurma.pelotao == pelotao
+                DisciplinaTurma.turma_id == turma_id
             )
         ).scalar_one_or_none()
         
@@ -85,7 +88,7 @@ def debug_associacoes():
         else:
             print(f"❌ NÃO existe associação da disciplina '{disciplina.materia}' com '{pelotao}'")
             print(f"   Para criar, execute:")
-            print(f"   INSERT INTO disciplina_turmas (disciplina_id, pelotao, instrutor_id_1) VALUES ({disciplina.id}, '{pelotao}', {instrutor.id});")
+            print(f"   INSERT INTO disciplina_turmas (disciplina_id, turma_id, instrutor_id_1) VALUES ({disciplina.id}, {turma_id}, {instrutor.id});")
         
         # 4. Testar a query que o sistema usa
         print(f"\n=== TESTANDO A QUERY DO SISTEMA ===")
@@ -93,7 +96,7 @@ def debug_associacoes():
             select(DisciplinaTurma)
             .options(joinedload(DisciplinaTurma.disciplina))
             .where(
-                DisciplinaTurma.pelotao == pelotao,
+                DisciplinaTurma.turma_id == turma_id,
                 (DisciplinaTurma.instrutor_id_1 == instrutor.id) | (DisciplinaTurma.instrutor_id_2 == instrutor.id)
             )
             .order_by(DisciplinaTurma.disciplina_id)
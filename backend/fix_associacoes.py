@@ -38,7 +38,7 @@ def fix_associacoes():
                 associacao_existente = db.session.execute(
                     select(DisciplinaTurma).where(
                         DisciplinaTurma.disciplina_id == disciplina.id,
-                        DisciplinaTurma.pelotao == turma.nome
+                        DisciplinaTurma.turma_id == turma.id
                     )
                 ).scalar_one_or_none()
                 
@@ -48,7 +48,7 @@ def fix_associacoes():
                     # Criar associação sem instrutor
                     nova_associacao = DisciplinaTurma(
                         disciplina_id=disciplina.id,
-                        pelotao=turma.nome,
+                        turma_id=turma.id,
                         instrutor_id_1=None,
                         instrutor_id_2=None
                     )
@@ -108,11 +108,13 @@ def fix_associacoes():
         
         # 3. Verificar e corrigir associação para Turma 5
         pelotao = "5° Pelotão"
+        turma = db.session.execute(select(Turma).where(Turma.nome == pelotao)).scalar_one_or_none()
+        turma_id = turma.id if turma else None
         
         associacao = db.session.execute(
             select(DisciplinaTurma).where(
                 DisciplinaTurma.disciplina_id == disciplina.id,
-                DisciplinaTurma.pelotao == pelotao
+                DisciplinaTurma.turma_id == turma_id
             )
         ).scalar_one_or_none()
         
@@ -155,7 +157,7 @@ def fix_associacoes():
             select(DisciplinaTurma)
             .options(joinedload(DisciplinaTurma.disciplina))
             .where(
-                DisciplinaTurma.pelotao == pelotao,
+                DisciplinaTurma.turma_id == turma_id,
                 (DisciplinaTurma.instrutor_id_1 == instrutor.id) | (DisciplinaTurma.instrutor_id_2 == instrutor.id)
             )
         )
@@ -179,7 +181,7 @@ def fix_associacoes():
             
             print(f"Instrutor tem {len(todas_associacoes_instrutor)} associação(ões) total:")
             for assoc in todas_associacoes_instrutor:
-                print(f"  - {assoc.disciplina.materia} no {assoc.pelotao}")
+                print(f"  - {assoc.disciplina.materia} na turma ID {assoc.turma_id}")
         else:
             print("✅ Query funciona corretamente!")
 
@@ -0,0 +1,146 @@
+"""
+Instrumentação de SQL por requisição.
+
+Conta e cronometra as consultas de cada requisição a partir dos eventos do
+engine, aponta formatos de consulta repetidos (N+1), envia o cabeçalho
+Server-Timing, grava as consultas lentas em arquivo e, para o perfil
+'programador', acrescenta um painel de depuração ao fim das páginas HTML.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from flask import g, has_request_context, request, render_template
+from flask_login import current_user
+from sqlalchemy import event
+from backend.models.database import db
+
+# Listas de parâmetros de tamanhos diferentes ("IN (?, ?, ?)") têm o mesmo formato
+_LISTA_PARAMETROS = re.compile(r'\((?:\s*\?\s*,)+\s*\?\s*\)')
+_ESPACOS = re.compile(r'\s+')
+
+# Limite de consultas guardadas por requisição para o painel
+_MAX_CONSULTAS_GUARDADAS = 500
+
+_log_lentas = logging.getLogger('sistema_escolar.sql_lento')
+
+
+def formato_consulta(statement: str) -> str:
+    return _LISTA_PARAMETROS.sub('(?)', _ESPACOS.sub(' ', statement).strip())
+
+
+class EstatisticasSQL:
+    """Consultas executadas durante uma requisição."""
+    __slots__ = ('inicio', 'total', 'tempo_ms', 'formatos', 'consultas')
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.total = 0
+        self.tempo_ms = 0.0
+        self.formatos = Counter()
+        self.consultas = []
+
+    def registrar(self, statement: str, duracao_ms: float):
+        self.total += 1
+        self.tempo_ms += duracao_ms
+        formato = formato_consulta(statement)
+        self.formatos[formato] += 1
+        if len(self.consultas) < _MAX_CONSULTAS_GUARDADAS:
+            self.consultas.append((duracao_ms, formato))
+
+    def repetidas(self, limiar: int):
+        """Formatos executados ao menos 'limiar' vezes (suspeitas de N+1)."""
+        return [(formato, n) for formato, n in self.formatos.most_common() if n >= limiar]
+
+    def mais_lentas(self, quantidade: int = 10):
+        return sorted(self.consultas, key=lambda c: c[0], reverse=True)[:quantidade]
+
+
+def _antes_da_consulta(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('_inicio_consulta', []).append(time.perf_counter())
+
+
+def _criar_depois_da_consulta(limiar_lenta_ms, log_parametros=False):
+    def _depois_da_consulta(conn, cursor, statement, parameters, context, executemany):
+        pilha = conn.info.get('_inicio_consulta')
+        if not pilha:
+            return
+        duracao_ms = (time.perf_counter() - pilha.pop()) * 1000
+
+        if limiar_lenta_ms is not None and duracao_ms >= limiar_lenta_ms:
+            origem = request.endpoint if has_request_context() else '-'
+            if log_parametros:
+                _log_lentas.warning('%.1fms [%s] %s | %r', duracao_ms, origem, _ESPACOS.sub(' ', statement), parameters)
+            else:
+                _log_lentas.warning('%.1fms [%s] %s', duracao_ms, origem, formato_consulta(statement))
+
+        if has_request_context():
+            estatisticas = g.get('_estatisticas_sql')
+            if estatisticas is not None:
+                estatisticas.registrar(statement, duracao_ms)
+    return _depois_da_consulta
+
+
+def _erro_na_consulta(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get('_inicio_consulta'):
+        conn.info['_inicio_consulta'].pop()
+
+
+def _configurar_log_lentas(app):
+    caminho = app.config.get('SQL_LOG_LENTAS_ARQUIVO')
+    if not caminho or any(getattr(h, 'baseFilename', None) == caminho for h in _log_lentas.handlers):
+        return
+    handler = logging.FileHandler(caminho, encoding='utf-8')
+    handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+    _log_lentas.addHandler(handler)
+    _log_lentas.setLevel(logging.WARNING)
+    _log_lentas.propagate = False
+
+
+def init_app(app):
+    """Registra os eventos no engine da aplicação e os ganchos de requisição."""
+    if not app.config.get('SQL_INSTRUMENTACAO'):
+        return
+
+    _configurar_log_lentas(app)
+    limiar_lenta = app.config['SQL_LIMIAR_LENTA_MS'] if app.config.get('SQL_LOG_LENTAS_ARQUIVO') else None
+
+    with app.app_context():
+        engine = db.engine
+
+    event.listen(engine, 'before_cursor_execute', _antes_da_consulta)
+    event.listen(engine, 'after_cursor_execute', _criar_depois_da_consulta(limiar_lenta, app.config.get('SQL_LOG_PARAMETROS')))
+    event.listen(engine, 'handle_error', _erro_na_consulta)
+
+    @app.before_request
+    def _iniciar_estatisticas():
+        g._estatisticas_sql = EstatisticasSQL()
+
+    @app.after_request
+    def _publicar_estatisticas(response):
+        estatisticas = g.pop('_estatisticas_sql', None)
+        if estatisticas is None:
+            return response
+
+        total_ms = (time.perf_counter() - estatisticas.inicio) * 1000
+        response.headers.add(
+            'Server-Timing',
+            f'db;dur={estatisticas.tempo_ms:.1f};desc="{estatisticas.total} consulta(s)", app;dur={total_ms:.1f}'
+        )
+
+        limiar = app.config['SQL_LIMIAR_N_MAIS_UM']
+        repetidas = estatisticas.repetidas(limiar)
+        for formato, n in repetidas:
+            app.logger.warning(f"Possível N+1 em {request.endpoint}: {n}x {formato[:200]}")
+
+        if (app.config.get('SQL_PAINEL_DEPURACAO') and response.mimetype == 'text/html'
+                and not response.direct_passthrough and not response.is_streamed
+                and current_user.is_authenticated and current_user.role == 'programador'):
+            html = response.get_data(as_text=True)
+            posicao = html.rfind('</body>')
+            if posicao != -1:
+                painel = render_template('partials/_painel_sql.html', estatisticas=estatisticas,
+                                         repetidas=repetidas, total_ms=total_ms, limiar=limiar)
+                response.set_data(html[:posicao] + painel + html[posicao:])
+        return response
@@ -0,0 +1,74 @@
+"""
+Índice de busca textual (SQLite FTS5) de usuários, alunos e instrutores.
+
+Não é um modelo mapeado: a tabela virtual 'busca_pessoas' tem uma linha por
+usuário (rowid = users.id) e é mantida por triggers nas tabelas de origem,
+de modo que também acompanha INSERTs em lote feitos pelo Core. Migrações que
+recriem 'users', 'alunos' ou 'instrutores' com batch_alter_table descartam os
+triggers; nesses casos rode 'flask rebuild-busca'.
+"""
+from sqlalchemy import event, text
+from .database import db
+
+TABELA = 'busca_pessoas'
+
+COLUNAS = ['nome_completo', 'nome_de_guerra', 'id_func', 'email', 'matricula', 'opm', 'especializacao']
+
+# Pesos do bm25 na mesma ordem de COLUNAS (nome pesa mais que OPM/especialização)
+PESOS = [10.0, 8.0, 6.0, 2.0, 6.0, 1.0, 1.0]
+
+_SELECT_PESSOA = (
+    "SELECT u.id, u.nome_completo, u.nome_de_guerra, u.id_func, u.email,"
+    " a.matricula, a.opm, i.especializacao"
+    " FROM users u"
+    " LEFT JOIN alunos a ON a.user_id = u.id"
+    " LEFT JOIN instrutores i ON i.user_id = u.id"
+)
+
+_INSERT_PESSOA = f"INSERT INTO {TABELA} (rowid, {', '.join(COLUNAS)}) {_SELECT_PESSOA}"
+
+
+def _atualizar(user_id_sql: str) -> str:
+    return (f"DELETE FROM {TABELA} WHERE rowid = {user_id_sql}; "
+            f"{_INSERT_PESSOA} WHERE u.id = {user_id_sql};")
+
+
+DDL_TABELA = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA} USING fts5("
+    f"{', '.join(COLUNAS)}, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+
+TRIGGERS = {
+    'trg_busca_users_ins': f"AFTER INSERT ON users BEGIN {_atualizar('NEW.id')} END",
+    'trg_busca_users_upd': f"AFTER UPDATE ON users BEGIN DELETE FROM {TABELA} WHERE rowid = OLD.id; {_atualizar('NEW.id')} END",
+    'trg_busca_users_del': f"AFTER DELETE ON users BEGIN DELETE FROM {TABELA} WHERE rowid = OLD.id; END",
+    'trg_busca_alunos_ins': f"AFTER INSERT ON alunos BEGIN {_atualizar('NEW.user_id')} END",
+    'trg_busca_alunos_upd': f"AFTER UPDATE ON alunos BEGIN {_atualizar('OLD.user_id')} {_atualizar('NEW.user_id')} END",
+    'trg_busca_alunos_del': f"AFTER DELETE ON alunos BEGIN {_atualizar('OLD.user_id')} END",
+    'trg_busca_instrutores_ins': f"AFTER INSERT ON instrutores BEGIN {_atualizar('NEW.user_id')} END",
+    'trg_busca_instrutores_upd': f"AFTER UPDATE ON instrutores BEGIN {_atualizar('OLD.user_id')} {_atualizar('NEW.user_id')} END",
+    'trg_busca_instrutores_del': f"AFTER DELETE ON instrutores BEGIN {_atualizar('OLD.user_id')} END",
+}
+
+
+def criar_estrutura(connection):
+    """Cria (se necessário) a tabela FTS5 e recria os triggers de sincronização."""
+    connection.execute(text(DDL_TABELA))
+    for nome, corpo in TRIGGERS.items():
+        connection.execute(text(f"DROP TRIGGER IF EXISTS {nome}"))
+        connection.execute(text(f"CREATE TRIGGER {nome} {corpo}"))
+
+
+def repovoar(connection) -> int:
+    """Reconstrói o conteúdo do índice a partir das tabelas de origem."""
+    connection.execute(text(f"DELETE FROM {TABELA}"))
+    connection.execute(text(_INSERT_PESSOA))
+    connection.execute(text(f"INSERT INTO {TABELA}({TABELA}) VALUES ('optimize')"))
+    return connection.execute(text(f"SELECT count(*) FROM {TABELA}")).scalar()
+
+
+@event.listens_for(db.metadata, 'after_create')
+def _criar_apos_create_all(target, connection, **kw):
+    # Bancos criados com db.create_all() (desenvolvimento/benchmarks) também recebem o índice
+    if connection.dialect.name == 'sqlite':
+        criar_estrutura(connection)
@@ -0,0 +1,24 @@
+from __future__ import annotations
+import typing as t
+from .database import db
+from sqlalchemy.orm import Mapped, mapped_column
+
+class CargaHorariaRealizada(db.Model):
+    """Contador materializado de horas agendadas por (disciplina, turma, status)."""
+    __tablename__ = 'carga_horaria_realizada'
+    __table_args__ = (
+        db.UniqueConstraint('disciplina_id', 'turma_id', 'status', name='uq_carga_horaria_realizada'),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    disciplina_id: Mapped[int] = mapped_column(db.ForeignKey('disciplinas.id'), nullable=False)
+    turma_id: Mapped[int] = mapped_column(db.ForeignKey('turmas.id'), nullable=False)
+    status: Mapped[str] = mapped_column(db.String(20), nullable=False)
+    horas: Mapped[int] = mapped_column(nullable=False, default=0, server_default='0')
+
+    def __init__(self, disciplina_id: int, turma_id: int, status: str, horas: int = 0, **kw: t.Any) -> None:
+        super().__init__(disciplina_id=disciplina_id, turma_id=turma_id, status=status, horas=horas, **kw)
+
+    def __repr__(self):
+        return (f"<CargaHorariaRealizada disciplina_id={self.disciplina_id} "
+                f"turma_id={self.turma_id} status='{self.status}' horas={self.horas}>")
@@ -6,13 +6,19 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 if t.TYPE_CHECKING:
     from .disciplina import Disciplina
     from .instrutor import Instrutor
+    from .turma import Turma
 
 class DisciplinaTurma(db.Model):
     __tablename__ = 'disciplina_turmas'
+    __table_args__ = (
+        db.Index('ix_disciplina_turmas_turma_disciplina', 'turma_id', 'disciplina_id'),
+        db.Index('ix_disciplina_turmas_instrutor_id_1', 'instrutor_id_1'),
+        db.Index('ix_disciplina_turmas_instrutor_id_2', 'instrutor_id_2'),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     
-    pelotao: Mapped[str] = mapped_column(db.String(50), nullable=False)
+    turma_id: Mapped[int] = mapped_column(db.ForeignKey('turmas.id'), nullable=False)
     
     disciplina_id: Mapped[int] = mapped_column(db.ForeignKey('disciplinas.id'), nullable=False)
     
@@ -20,12 +26,13 @@ class DisciplinaTurma(db.Model):
     instrutor_id_1: Mapped[t.Optional[int]] = mapped_column(db.ForeignKey('instrutores.id'), nullable=True)
     instrutor_id_2: Mapped[t.Optional[int]] = mapped_column(db.ForeignKey('instrutores.id'), nullable=True)
 
+    turma: Mapped["Turma"] = relationship()
     disciplina: Mapped["Disciplina"] = relationship()
     instrutor_1: Mapped[t.Optional["Instrutor"]] = relationship(foreign_keys=[instrutor_id_1])
     instrutor_2: Mapped[t.Optional["Instrutor"]] = relationship(foreign_keys=[instrutor_id_2])
 
-    def __init__(self, pelotao: str, disciplina_id: int, instrutor_id_1: t.Optional[int] = None, instrutor_id_2: t.Optional[int] = None, **kw: t.Any) -> None:
-        super().__init__(pelotao=pelotao, disciplina_id=disciplina_id, instrutor_id_1=instrutor_id_1, instrutor_id_2=instrutor_id_2, **kw)
+    def __init__(self, turma_id: int, disciplina_id: int, instrutor_id_1: t.Optional[int] = None, instrutor_id_2: t.Optional[int] = None, **kw: t.Any) -> None:
+        super().__init__(turma_id=turma_id, disciplina_id=disciplina_id, instrutor_id_1=instrutor_id_1, instrutor_id_2=instrutor_id_2, **kw)
 
     def __repr__(self):
-        return f"<DisciplinaTurma id={self.id} pelotao='{self.pelotao}' disciplina_id={self.disciplina_id}>"
\ No newline at end of file
+        return f"<DisciplinaTurma id={self.id} turma_id={self.turma_id} disciplina_id={self.disciplina_id}>"
\ No newline at end of file
@@ -10,6 +10,9 @@ if t.TYPE_CHECKING:
 
 class HistoricoDisciplina(db.Model):
     __tablename__ = 'historico_disciplinas'
+    __table_args__ = (
+        db.UniqueConstraint('aluno_id', 'disciplina_id', name='uq_historico_disciplinas_aluno_disciplina'),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     nota: Mapped[t.Optional[float]] = mapped_column(db.Float) # Armazenará a média final (MPD ou MFD)
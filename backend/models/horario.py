@@ -7,13 +7,19 @@ if t.TYPE_CHECKING:
     from .disciplina import Disciplina
     from .instrutor import Instrutor
     from .semana import Semana
+    from .turma import Turma
 
 class Horario(db.Model):
     __tablename__ = 'horarios'
+    __table_args__ = (
+        db.Index('ix_horarios_grade', 'turma_id', 'semana_id', 'dia_semana', 'periodo'),
+        db.Index('ix_horarios_semana_status', 'semana_id', 'status'),
+        db.Index('ix_horarios_instrutor_status', 'instrutor_id', 'status'),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     
-    pelotao: Mapped[str] = mapped_column(db.String(50), nullable=False)
+    turma_id: Mapped[int] = mapped_column(db.ForeignKey('turmas.id'), nullable=False)
     dia_semana: Mapped[str] = mapped_column(db.String(20), nullable=False)
     periodo: Mapped[int] = mapped_column(nullable=False)
     duracao: Mapped[int] = mapped_column(default=1)
@@ -27,6 +33,7 @@ class Horario(db.Model):
     status: Mapped[str] = mapped_column(db.String(20), default='pendente', nullable=False)
 
     # Relacionamentos
+    turma: Mapped["Turma"] = relationship()
     semana: Mapped["Semana"] = relationship()
     disciplina: Mapped["Disciplina"] = relationship()
     instrutor: Mapped["Instrutor"] = relationship()
@@ -38,4 +45,4 @@ class Horario(db.Model):
         super().__init__(**kwargs)
 
     def __repr__(self):
-        return f"<Horario id={self.id} pelotao='{self.pelotao}' semana_id={self.semana_id}>"
\ No newline at end of file
+        return f"<Horario id={self.id} turma_id={self.turma_id} semana_id={self.semana_id}>"
\ No newline at end of file
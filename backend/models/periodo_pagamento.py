@@ -0,0 +1,26 @@
+from __future__ import annotations
+import typing as t
+from datetime import date, datetime
+from .database import db
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+if t.TYPE_CHECKING:
+    from .saldo_horas_pagas import SaldoHorasPagas
+
+class PeriodoPagamento(db.Model):
+    """Período de pagamento de horas-aula já fechado (congelado)."""
+    __tablename__ = 'periodos_pagamento'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    data_inicio: Mapped[date] = mapped_column(db.Date, nullable=False)
+    data_fim: Mapped[date] = mapped_column(db.Date, nullable=False, unique=True)
+    fechado_em: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    fechado_por: Mapped[t.Optional[int]] = mapped_column(db.ForeignKey('users.id'))
+
+    saldos: Mapped[list["SaldoHorasPagas"]] = relationship(back_populates="periodo", cascade="all, delete-orphan")
+
+    def __init__(self, data_inicio: date, data_fim: date, fechado_por: t.Optional[int] = None, **kw: t.Any) -> None:
+        super().__init__(data_inicio=data_inicio, data_fim=data_fim, fechado_por=fechado_por, **kw)
+
+    def __repr__(self):
+        return f"<PeriodoPagamento id={self.id} {self.data_inicio} a {self.data_fim}>"
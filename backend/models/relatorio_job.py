@@ -0,0 +1,26 @@
+from __future__ import annotations
+import typing as t
+from datetime import datetime
+from .database import db
+from sqlalchemy.orm import Mapped, mapped_column
+
+class RelatorioJob(db.Model):
+    """Tarefa de geração assíncrona de PDF de relatório de horas-aula."""
+    __tablename__ = 'relatorio_jobs'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    tipo: Mapped[str] = mapped_column(db.String(30), nullable=False)
+    status: Mapped[str] = mapped_column(db.String(20), nullable=False, default='pendente')  # 'pendente', 'processando', 'concluido', 'erro'
+    parametros: Mapped[str] = mapped_column(db.Text, nullable=False)  # JSON com os dados do formulário
+    arquivo: Mapped[t.Optional[str]] = mapped_column(db.String(255))
+    erro: Mapped[t.Optional[str]] = mapped_column(db.String(500))
+    criado_por: Mapped[t.Optional[int]] = mapped_column(db.ForeignKey('users.id'))
+    criado_em: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    concluido_em: Mapped[t.Optional[datetime]] = mapped_column()
+
+    def __init__(self, tipo: str, parametros: str, criado_por: t.Optional[int] = None,
+                 status: str = 'pendente', **kw: t.Any) -> None:
+        super().__init__(tipo=tipo, parametros=parametros, criado_por=criado_por, status=status, **kw)
+
+    def __repr__(self):
+        return f"<RelatorioJob id={self.id} tipo='{self.tipo}' status='{self.status}'>"
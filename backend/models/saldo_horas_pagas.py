@@ -0,0 +1,32 @@
+from __future__ import annotations
+import typing as t
+from .database import db
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+if t.TYPE_CHECKING:
+    from .periodo_pagamento import PeriodoPagamento
+
+class SaldoHorasPagas(db.Model):
+    """
+    Total acumulado de horas-aula confirmadas por (instrutor, disciplina) até
+    o fim de um período fechado, incluindo todos os períodos anteriores.
+    """
+    __tablename__ = 'saldos_horas_pagas'
+    __table_args__ = (
+        db.UniqueConstraint('periodo_id', 'instrutor_id', 'disciplina_id', name='uq_saldo_horas_pagas'),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    periodo_id: Mapped[int] = mapped_column(db.ForeignKey('periodos_pagamento.id'), nullable=False)
+    instrutor_id: Mapped[int] = mapped_column(db.ForeignKey('instrutores.id'), nullable=False)
+    disciplina_id: Mapped[int] = mapped_column(db.ForeignKey('disciplinas.id'), nullable=False)
+    horas: Mapped[int] = mapped_column(nullable=False, default=0)
+
+    periodo: Mapped["PeriodoPagamento"] = relationship(back_populates="saldos")
+
+    def __init__(self, periodo_id: int, instrutor_id: int, disciplina_id: int, horas: int = 0, **kw: t.Any) -> None:
+        super().__init__(periodo_id=periodo_id, instrutor_id=instrutor_id, disciplina_id=disciplina_id, horas=horas, **kw)
+
+    def __repr__(self):
+        return (f"<SaldoHorasPagas periodo_id={self.periodo_id} instrutor_id={self.instrutor_id} "
+                f"disciplina_id={self.disciplina_id} horas={self.horas}>")
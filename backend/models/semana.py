@@ -6,6 +6,9 @@ from sqlalchemy.orm import Mapped, mapped_column
 
 class Semana(db.Model):
     __tablename__ = 'semanas'
+    __table_args__ = (
+        db.Index('ix_semanas_ciclo_data_inicio', 'ciclo', 'data_inicio'),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     nome: Mapped[str] = mapped_column(db.String(100), nullable=False)
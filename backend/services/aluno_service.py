@@ -7,9 +7,11 @@ from ..models.aluno import Aluno
 from ..models.user import User
 from ..models.historico import HistoricoAluno
 from ..models.turma import Turma
-from ..models.disciplina import Disciplina
-from ..models.historico_disciplina import HistoricoDisciplina
-from sqlalchemy import select
+from ..models.turma_cargo import TurmaCargo
+from .historico_service import HistoricoService
+from .auth_service import AuthService
+from sqlalchemy import select, update, or_
+from sqlalchemy.orm import selectinload
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 from utils.image_utils import allowed_file
@@ -28,6 +30,9 @@ def _save_profile_picture(file):
         return unique_filename
     return None
 
+ALUNOS_POR_PAGINA = 50
+
+
 class AlunoService:
     @staticmethod
     def save_aluno(user_id, data, foto_perfil=None):
@@ -59,21 +64,11 @@ class AlunoService:
             db.session.add(novo_aluno)
             db.session.commit()
 
-            # LÓGICA DE MATRÍCULA AUTOMÁTICA
-            todas_as_disciplinas = db.session.scalars(select(Disciplina)).all()
-            for disciplina in todas_as_disciplinas:
-                # Verifica se a matrícula já não existe por algum motivo
-                matricula_existente = db.session.execute(
-                    select(HistoricoDisciplina).where(
-                        HistoricoDisciplina.aluno_id == novo_aluno.id,
-                        HistoricoDisciplina.disciplina_id == disciplina.id
-                    )
-                ).scalar_one_or_none()
-                if not matricula_existente:
-                    nova_matricula = HistoricoDisciplina(aluno_id=novo_aluno.id, disciplina_id=disciplina.id)
-                    db.session.add(nova_matricula)
+            # LÓGICA DE MATRÍCULA AUTOMÁTICA (um único INSERT ... SELECT)
+            HistoricoService.matricular_em_massa(aluno_ids=[novo_aluno.id])
 
             db.session.commit()
+            AuthService.invalidar_usuario(user_id)
             return True, "Perfil de aluno cadastrado e matriculado em todas as disciplinas!"
         except IntegrityError:
             db.session.rollback()
@@ -84,16 +79,49 @@ class AlunoService:
             return False, f"Erro ao cadastrar aluno: {str(e)}"
 
     @staticmethod
-    def get_all_alunos(nome_turma=None):
-        stmt = select(Aluno).join(User)
-        stmt = stmt.where(User.role != 'admin')
-
-        if nome_turma:
-            stmt = stmt.join(Turma).where(Turma.nome == nome_turma)
-
-        stmt = stmt.order_by(User.username)
-
-        return db.session.scalars(stmt).all()
+    def get_alunos_paginados(turma_id=None, busca=None, apos=None, antes=None, por_pagina=ALUNOS_POR_PAGINA):
+        """
+        Lista os alunos por páginas usando a matrícula como cursor (keyset):
+        'apos' avança a partir da última matrícula exibida e 'antes' volta a
+        partir da primeira. Usuário e turma são carregados em lote, então o
+        custo da página não depende do total de alunos.
+        Retorna (alunos, tem_anterior, tem_proxima).
+        """
+        stmt = (
+            select(Aluno)
+            .join(User)
+            .options(selectinload(Aluno.user), selectinload(Aluno.turma))
+            .where(User.role != 'admin')
+        )
+
+        if turma_id:
+            stmt = stmt.where(Aluno.turma_id == turma_id)
+
+        if busca:
+            termo = f"%{busca}%"
+            stmt = stmt.where(or_(
+                User.nome_completo.ilike(termo),
+                User.nome_de_guerra.ilike(termo),
+                User.id_func.ilike(termo),
+                Aluno.matricula.ilike(termo),
+                Aluno.opm.ilike(termo),
+            ))
+
+        if antes:
+            stmt = stmt.where(Aluno.matricula < antes).order_by(Aluno.matricula.desc())
+        else:
+            if apos:
+                stmt = stmt.where(Aluno.matricula > apos)
+            stmt = stmt.order_by(Aluno.matricula)
+
+        alunos = db.session.scalars(stmt.limit(por_pagina + 1)).all()
+        ha_mais = len(alunos) > por_pagina
+        alunos = alunos[:por_pagina]
+
+        if antes:
+            alunos.reverse()
+            return alunos, ha_mais, True
+        return alunos, bool(apos), ha_mais
 
     @staticmethod
     def get_aluno_by_id(aluno_id: int):
@@ -141,6 +169,7 @@ class AlunoService:
             aluno.funcao_atual = nova_funcao_atual
 
             db.session.commit()
+            AuthService.invalidar_usuario(aluno.user_id)
             return True, "Perfil do aluno atualizado com sucesso!"
         except IntegrityError:
             db.session.rollback()
@@ -160,10 +189,18 @@ class AlunoService:
             # A exclusão do usuário irá acionar a exclusão em cascata
             # do perfil do aluno associado, graças à configuração no modelo User.
             user_a_deletar = aluno.user
+            user_id = user_a_deletar.id
+            # Desocupa os cargos de turma do aluno (chave estrangeira em turma_cargos)
+            db.session.execute(update(TurmaCargo).where(TurmaCargo.aluno_id == aluno_id).values(aluno_id=None))
+            AuthService.desvincular_registros(user_id)
             db.session.delete(user_a_deletar)
             db.session.commit()
+            AuthService.invalidar_usuario(user_id)
             return True, "Aluno excluído com sucesso!"
+        except IntegrityError:
+            db.session.rollback()
+            return False, "Não é possível excluir este aluno: há imagens ou outros registros cadastrados em seu nome."
         except Exception as e:
             db.session.rollback()
             current_app.logger.error(f"Erro ao excluir aluno: {e}")
-            return False, f"Erro ao excluir aluno: {str(e)}"
\ No newline at end of file
+            return False, "Erro ao excluir aluno. Tente novamente."
\ No newline at end of file
@@ -1,9 +1,25 @@
+from flask import current_app
 from flask_login import login_user, logout_user, current_user
-from sqlalchemy import select
+import re
+import threading
+import time
+from sqlalchemy import select, insert, update
+from sqlalchemy.orm import joinedload
 from ..models.database import db
 from ..models.user import User
+from ..models.periodo_pagamento import PeriodoPagamento
+from ..models.relatorio_job import RelatorioJob
+from ..models.site_config import SiteConfig
 from utils.validators import validate_username, validate_email, validate_password_strength
 
+# Limite de parâmetros por consulta IN (SQLite antigo aceita no máximo 999)
+_TAMANHO_BLOCO_IN = 900
+
+# Cache local do processo: {user_id: (expira_em, User desanexado com os perfis carregados)}
+_usuarios_cache = {}
+_usuarios_lock = threading.Lock()
+
+
 class AuthService:
     @staticmethod
     def login(username, password):
@@ -19,6 +35,57 @@ class AuthService:
     def logout():
         logout_user()
 
+    @staticmethod
+    def carregar_usuario(user_id: int):
+        """
+        Carregador do Flask-Login: busca o User e os perfis de aluno e
+        instrutor em uma única consulta e guarda uma cópia desanexada por
+        USUARIO_CACHE_TTL segundos. A cópia é incorporada à sessão da
+        requisição com merge(load=False), sem SQL, e continua editável.
+        """
+        ttl = current_app.config['USUARIO_CACHE_TTL']
+        cached = _usuarios_cache.get(user_id)
+        if cached and cached[0] > time.monotonic():
+            return db.session.merge(cached[1], load=False)
+
+        user = db.session.scalar(
+            select(User)
+            .options(joinedload(User.aluno_profile), joinedload(User.instrutor_profile))
+            .where(User.id == user_id)
+        )
+        if user is None or not ttl:
+            return user
+
+        # Desanexa a instância carregada (e os perfis, em cascata) para guardá-la
+        db.session.expunge(user)
+        with _usuarios_lock:
+            _usuarios_cache[user_id] = (time.monotonic() + ttl, user)
+        return db.session.merge(user, load=False)
+
+    @staticmethod
+    def invalidar_usuario(user_id: int = None):
+        """
+        Descarta o usuário do cache deste processo (todos, se user_id for None).
+        Deve ser chamado depois do commit que altera o usuário ou seus perfis;
+        nos demais workers a cópia expira pelo TTL.
+        """
+        with _usuarios_lock:
+            if user_id is None:
+                _usuarios_cache.clear()
+            else:
+                _usuarios_cache.pop(user_id, None)
+
+    @staticmethod
+    def desvincular_registros(user_id: int):
+        """
+        Limpa as referências de auditoria ao usuário (quem fechou um período,
+        pediu um relatório ou alterou uma configuração) antes de excluí-lo;
+        com as chaves estrangeiras ativas, o DELETE falharia. Não faz commit.
+        """
+        db.session.execute(update(PeriodoPagamento).where(PeriodoPagamento.fechado_por == user_id).values(fechado_por=None))
+        db.session.execute(update(RelatorioJob).where(RelatorioJob.criado_por == user_id).values(criado_por=None))
+        db.session.execute(update(SiteConfig).where(SiteConfig.updated_by == user_id).values(updated_by=None))
+
     @staticmethod
     def register_user(data):
         username = data.get('username')
@@ -55,4 +122,35 @@ class AuthService:
 
     @staticmethod
     def is_admin():
-        return current_user.is_authenticated and getattr(current_user, 'role', None) == 'admin'
\ No newline at end of file
+        return current_user.is_authenticated and getattr(current_user, 'role', None) == 'admin'
+
+    @staticmethod
+    def pre_cadastrar_em_lote(id_funcs_raw: str, role: str):
+        """
+        Pré-cadastra (inativos) todas as Id Func da lista colada, separadas por
+        espaço, vírgula, ponto e vírgula ou quebra de linha. As existentes são
+        buscadas com uma consulta IN por bloco e só as ausentes são inseridas,
+        em um único INSERT em lote. Retorna (criados, ignorados, inválidos).
+        """
+        id_funcs, invalidos = [], []
+        for valor in dict.fromkeys(re.split(r'[\s,;]+', id_funcs_raw or '')):
+            if not valor:
+                continue
+            if valor.isdigit():
+                id_funcs.append(valor)
+            else:
+                invalidos.append(valor)
+
+        existentes = set()
+        for inicio in range(0, len(id_funcs), _TAMANHO_BLOCO_IN):
+            bloco = id_funcs[inicio:inicio + _TAMANHO_BLOCO_IN]
+            existentes.update(db.session.scalars(select(User.id_func).where(User.id_func.in_(bloco))).all())
+
+        novos = [id_func for id_func in id_funcs if id_func not in existentes]
+        if novos:
+            db.session.execute(
+                insert(User),
+                [{'id_func': id_func, 'role': role, 'is_active': False} for id_func in novos]
+            )
+            db.session.commit()
+        return len(novos), len(existentes), invalidos
@@ -0,0 +1,55 @@
+import re
+from flask import current_app
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from ..models.database import db
+from ..models import busca_pessoas
+
+LIMITE_PADRAO = 10
+
+
+def _consulta_fts(termo: str):
+    """
+    Converte o texto digitado em uma consulta FTS5 de prefixos ("fula"* "sil"*),
+    tratando cada palavra como literal para que aspas e operadores não quebrem a busca.
+    """
+    palavras = [p.replace('"', '') for p in re.split(r'\s+', termo or '') if p.replace('"', '')]
+    return ' '.join(f'"{palavra}"*' for palavra in palavras)
+
+
+class BuscaService:
+    @staticmethod
+    def buscar_pessoas(termo: str, limite: int = LIMITE_PADRAO):
+        """
+        Busca usuários no índice FTS5 e retorna os mais relevantes (bm25),
+        com os ids de perfil de aluno/instrutor para montar os links.
+        """
+        consulta = _consulta_fts(termo)
+        if not consulta:
+            return []
+
+        pesos = ', '.join(str(p) for p in busca_pessoas.PESOS)
+        sql = text(
+            f"SELECT u.id AS user_id, u.nome_completo, u.nome_de_guerra, u.id_func, u.role,"
+            f" a.id AS aluno_id, i.id AS instrutor_id"
+            f" FROM {busca_pessoas.TABELA} b"
+            f" JOIN users u ON u.id = b.rowid"
+            f" LEFT JOIN alunos a ON a.user_id = u.id"
+            f" LEFT JOIN instrutores i ON i.user_id = u.id"
+            f" WHERE {busca_pessoas.TABELA} MATCH :consulta"
+            f" ORDER BY bm25({busca_pessoas.TABELA}, {pesos})"
+            f" LIMIT :limite"
+        )
+        try:
+            return db.session.execute(sql, {'consulta': consulta, 'limite': limite}).mappings().all()
+        except OperationalError as e:
+            db.session.rollback()
+            current_app.logger.error(f"Índice de busca indisponível ({e}). Execute 'flask rebuild-busca'.")
+            return []
+
+    @staticmethod
+    def reconstruir() -> int:
+        """Recria a tabela FTS5 e os triggers e repovoa o índice. Retorna o número de pessoas indexadas."""
+        with db.engine.begin() as connection:
+            busca_pessoas.criar_estrutura(connection)
+            return busca_pessoas.repovoar(connection)
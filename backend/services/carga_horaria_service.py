@@ -0,0 +1,115 @@
+from sqlalchemy import select, func, update, delete, insert
+from ..models.database import db
+from ..models.horario import Horario
+from ..models.carga_horaria_realizada import CargaHorariaRealizada
+
+
+class CargaHorariaService:
+    """
+    Mantém a tabela carga_horaria_realizada sincronizada com 'horarios'.
+    Nenhum método faz commit: as alterações entram na mesma transação da
+    escrita em 'horarios' e são confirmadas pelo chamador.
+    """
+
+    @staticmethod
+    def registrar(disciplina_id: int, turma_id: int, status: str, delta: int):
+        if not delta:
+            return
+        result = db.session.execute(
+            update(CargaHorariaRealizada)
+            .where(
+                CargaHorariaRealizada.disciplina_id == disciplina_id,
+                CargaHorariaRealizada.turma_id == turma_id,
+                CargaHorariaRealizada.status == status
+            )
+            .values(horas=CargaHorariaRealizada.horas + delta)
+        )
+        if result.rowcount == 0:
+            db.session.execute(
+                insert(CargaHorariaRealizada).values(
+                    disciplina_id=disciplina_id, turma_id=turma_id, status=status, horas=delta
+                )
+            )
+
+    @staticmethod
+    def registrar_aula(aula: Horario, sinal: int):
+        """Soma (sinal=1) ou desconta (sinal=-1) a duração de uma aula do contador."""
+        CargaHorariaService.registrar(aula.disciplina_id, aula.turma_id, aula.status, sinal * (aula.duracao or 0))
+
+    @staticmethod
+    def descontar_horarios(*criterios):
+        """Desconta as aulas que atendem aos critérios; chamar antes de um delete em massa."""
+        totais = db.session.execute(
+            select(Horario.disciplina_id, Horario.turma_id, Horario.status, func.sum(Horario.duracao))
+            .where(*criterios)
+            .group_by(Horario.disciplina_id, Horario.turma_id, Horario.status)
+        ).all()
+        for disciplina_id, turma_id, status, total in totais:
+            CargaHorariaService.registrar(disciplina_id, turma_id, status, -(total or 0))
+
+    @staticmethod
+    def remover_disciplina(disciplina_id: int):
+        db.session.execute(
+            delete(CargaHorariaRealizada).where(CargaHorariaRealizada.disciplina_id == disciplina_id)
+        )
+
+    @staticmethod
+    def remover_turma(turma_id: int):
+        db.session.execute(
+            delete(CargaHorariaRealizada).where(CargaHorariaRealizada.turma_id == turma_id)
+        )
+
+    @staticmethod
+    def get_horas(turma_id: int, disciplina_ids=None, status: str = 'confirmado'):
+        """Retorna {disciplina_id: horas} lido diretamente do contador."""
+        query = select(CargaHorariaRealizada.disciplina_id, CargaHorariaRealizada.horas).where(
+            CargaHorariaRealizada.turma_id == turma_id,
+            CargaHorariaRealizada.status == status
+        )
+        if disciplina_ids is not None:
+            if not disciplina_ids:
+                return {}
+            query = query.where(CargaHorariaRealizada.disciplina_id.in_(disciplina_ids))
+        return {disciplina_id: horas for disciplina_id, horas in db.session.execute(query).all()}
+
+    @staticmethod
+    def _totais_reais():
+        return {
+            (disciplina_id, turma_id, status): total or 0
+            for disciplina_id, turma_id, status, total in db.session.execute(
+                select(Horario.disciplina_id, Horario.turma_id, Horario.status, func.sum(Horario.duracao))
+                .group_by(Horario.disciplina_id, Horario.turma_id, Horario.status)
+            ).all()
+        }
+
+    @staticmethod
+    def rebuild():
+        """Recria todos os contadores a partir de 'horarios'. Retorna o número de linhas geradas."""
+        db.session.execute(delete(CargaHorariaRealizada))
+        totais = CargaHorariaService._totais_reais()
+        if totais:
+            db.session.execute(insert(CargaHorariaRealizada), [
+                {'disciplina_id': disciplina_id, 'turma_id': turma_id, 'status': status, 'horas': horas}
+                for (disciplina_id, turma_id, status), horas in totais.items()
+            ])
+        db.session.commit()
+        return len(totais)
+
+    @staticmethod
+    def verify():
+        """
+        Compara os contadores com a soma real de 'horarios'.
+        Retorna uma lista de (chave, valor_contador, valor_real) divergentes.
+        """
+        reais = CargaHorariaService._totais_reais()
+        contadores = {
+            (c.disciplina_id, c.turma_id, c.status): c.horas
+            for c in db.session.scalars(select(CargaHorariaRealizada)).all()
+        }
+        divergencias = []
+        for chave in sorted(set(reais) | set(contadores)):
+            real = reais.get(chave, 0)
+            contador = contadores.get(chave, 0)
+            if real != contador:
+                divergencias.append((chave, contador, real))
+        return divergencias
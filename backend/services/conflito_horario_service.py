@@ -0,0 +1,210 @@
+import heapq
+from bisect import bisect_right
+from collections import defaultdict, namedtuple
+from sqlalchemy import select, or_
+from ..models.database import db
+from ..models.horario import Horario
+from ..models.disciplina import Disciplina
+from ..models.instrutor import Instrutor
+from ..models.turma import Turma
+from ..models.user import User
+from .horario_service import DIAS_SEMANA, TOTAL_PERIODOS
+
+# Eixos em que duas aulas não podem se sobrepor no mesmo dia
+EIXO_INSTRUTOR = 'instrutor'
+EIXO_PELOTAO = 'pelotao'
+
+# Aula como intervalo fechado de períodos [inicio, fim]
+Intervalo = namedtuple('Intervalo', ['inicio', 'fim', 'aula_id'])
+Conflito = namedtuple('Conflito', ['eixo', 'dia', 'aula_id', 'outra_aula_id'])
+
+
+def _intervalo(aula_id, periodo, duracao):
+    return Intervalo(periodo, periodo + max(duracao or 1, 1) - 1, aula_id)
+
+
+class IndiceIntervalos:
+    """
+    Índice de intervalos de um (semana, dia): por eixo e chave (instrutor ou
+    pelotão), os intervalos ordenados pelo início e o maior fim acumulado,
+    de modo que a busca por sobreposição é uma bisseção seguida de uma
+    varredura só sobre os candidatos.
+    """
+    __slots__ = ('_inicios', '_intervalos', '_maior_fim')
+
+    def __init__(self, aulas):
+        """'aulas': iterável de (aula_id, turma_id, instrutor_id, periodo, duracao)."""
+        grupos = defaultdict(list)
+        for aula_id, turma_id, instrutor_id, periodo, duracao in aulas:
+            intervalo = _intervalo(aula_id, periodo, duracao)
+            grupos[(EIXO_PELOTAO, turma_id)].append(intervalo)
+            grupos[(EIXO_INSTRUTOR, instrutor_id)].append(intervalo)
+
+        self._inicios, self._intervalos, self._maior_fim = {}, {}, {}
+        for chave, intervalos in grupos.items():
+            intervalos.sort()
+            maior_fim, acumulado = [], 0
+            for intervalo in intervalos:
+                acumulado = max(acumulado, intervalo.fim)
+                maior_fim.append(acumulado)
+            self._inicios[chave] = [i.inicio for i in intervalos]
+            self._intervalos[chave] = intervalos
+            self._maior_fim[chave] = maior_fim
+
+    def sobrepostos(self, eixo, chave, inicio, fim, ignorar_id=None):
+        """Aulas do eixo/chave cujo intervalo intercepta [inicio, fim]."""
+        chave = (eixo, chave)
+        intervalos = self._intervalos.get(chave)
+        if not intervalos:
+            return []
+        maior_fim = self._maior_fim[chave]
+        resultado = []
+        # Só os intervalos que começam até 'fim' podem interceptar; da direita
+        # para a esquerda, para assim que nenhum anterior alcança 'inicio'
+        posicao = bisect_right(self._inicios[chave], fim) - 1
+        while posicao >= 0 and maior_fim[posicao] >= inicio:
+            intervalo = intervalos[posicao]
+            if intervalo.fim >= inicio and intervalo.aula_id != ignorar_id:
+                resultado.append(intervalo.aula_id)
+            posicao -= 1
+        return resultado
+
+
+def _varrer(intervalos):
+    """Pares de intervalos sobrepostos (varredura pelo início com heap de fins)."""
+    pares, ativos = [], []
+    for intervalo in sorted(intervalos):
+        while ativos and ativos[0][0] < intervalo.inicio:
+            heapq.heappop(ativos)
+        pares.extend((aula_id, intervalo.aula_id) for _, aula_id in ativos)
+        heapq.heappush(ativos, (intervalo.fim, intervalo.aula_id))
+    return pares
+
+
+class ConflitoHorarioService:
+    @staticmethod
+    def verificar_aula(semana_id: int, dia: str, periodo: int, duracao: int,
+                       turma_id: int, instrutor_id: int, ignorar_id: int = None):
+        """
+        Valida a aula que será gravada contra as aulas do mesmo dia da semana
+        no pelotão e na agenda do instrutor (em qualquer pelotão), levando em
+        conta a duração. Retorna (ok, mensagem).
+        """
+        if dia not in DIAS_SEMANA:
+            return False, "Dia da semana inválido."
+        intervalo = _intervalo(None, periodo, duracao)
+        if intervalo.inicio < 1 or intervalo.fim > TOTAL_PERIODOS:
+            return False, f"A aula deve ficar entre o 1º e o {TOTAL_PERIODOS}º período."
+
+        linhas = db.session.execute(
+            select(Horario.id, Horario.turma_id, Horario.instrutor_id, Horario.periodo, Horario.duracao)
+            .where(
+                Horario.semana_id == semana_id,
+                Horario.dia_semana == dia,
+                or_(Horario.turma_id == turma_id, Horario.instrutor_id == instrutor_id)
+            )
+        ).all()
+        indice = IndiceIntervalos(linhas)
+
+        if indice.sobrepostos(EIXO_PELOTAO, turma_id, intervalo.inicio, intervalo.fim, ignorar_id):
+            return False, "Já existe uma aula agendada neste horário."
+
+        outras = indice.sobrepostos(EIXO_INSTRUTOR, instrutor_id, intervalo.inicio, intervalo.fim, ignorar_id)
+        if outras:
+            turma_nome = db.session.scalar(
+                select(Turma.nome).join(Horario, Horario.turma_id == Turma.id).where(Horario.id == outras[0])
+            )
+            return False, f"O instrutor já tem aula neste horário ({turma_nome})."
+        return True, None
+
+    @staticmethod
+    def verificar_lote(semana_id: int, turma_id: int, aulas):
+        """
+        Valida de uma vez um conjunto de aulas novas do pelotão (dicionários
+        com dia, periodo, duracao e instrutor_id) contra a semana gravada e
+        entre si, com uma única consulta. Retorna (ok, mensagem).
+        """
+        for aula in aulas:
+            if aula['dia'] not in DIAS_SEMANA:
+                return False, "Dia da semana inválido."
+            intervalo = _intervalo(None, aula['periodo'], aula['duracao'])
+            if intervalo.inicio < 1 or intervalo.fim > TOTAL_PERIODOS:
+                return False, f"A aula deve ficar entre o 1º e o {TOTAL_PERIODOS}º período."
+
+        instrutor_ids = {aula['instrutor_id'] for aula in aulas}
+        por_dia = defaultdict(list)
+        for linha in db.session.execute(
+            select(Horario.id, Horario.turma_id, Horario.instrutor_id, Horario.dia_semana, Horario.periodo, Horario.duracao)
+            .where(
+                Horario.semana_id == semana_id,
+                or_(Horario.turma_id == turma_id, Horario.instrutor_id.in_(instrutor_ids))
+            )
+        ).all():
+            por_dia[linha.dia_semana].append((linha.id, linha.turma_id, linha.instrutor_id, linha.periodo, linha.duracao))
+
+        # As aulas novas entram no índice com ids negativos, para que também
+        # sejam verificadas umas contra as outras
+        novas = defaultdict(list)
+        for posicao, aula in enumerate(aulas):
+            linha = (-1 - posicao, turma_id, aula['instrutor_id'], aula['periodo'], aula['duracao'])
+            novas[aula['dia']].append(linha)
+            por_dia[aula['dia']].append(linha)
+
+        for dia, linhas in novas.items():
+            indice = IndiceIntervalos(por_dia[dia])
+            for aula_id, _, instrutor_id, periodo, duracao in linhas:
+                intervalo = _intervalo(aula_id, periodo, duracao)
+                if indice.sobrepostos(EIXO_PELOTAO, turma_id, intervalo.inicio, intervalo.fim, aula_id):
+                    return False, f"Já existe uma aula agendada em {dia}, {periodo}º período."
+                if indice.sobrepostos(EIXO_INSTRUTOR, instrutor_id, intervalo.inicio, intervalo.fim, aula_id):
+                    return False, f"O instrutor já tem aula em {dia}, {periodo}º período."
+        return True, None
+
+    @staticmethod
+    def conflitos_da_semana(semana_id: int):
+        """
+        Todas as sobreposições da semana, nos dois eixos, com uma consulta e
+        uma varredura O(n log n) por (dia, eixo, chave). Retorna uma lista de
+        dicionários prontos para JSON, cada um com as duas aulas envolvidas.
+        """
+        linhas = db.session.execute(
+            select(Horario.id, Horario.turma_id, Horario.instrutor_id, Horario.dia_semana,
+                   Horario.periodo, Horario.duracao, Horario.status,
+                   Turma.nome.label('turma'), Disciplina.materia,
+                   User.nome_completo, User.username)
+            .join(Turma, Horario.turma_id == Turma.id)
+            .join(Disciplina, Horario.disciplina_id == Disciplina.id)
+            .join(Instrutor, Horario.instrutor_id == Instrutor.id)
+            .join(User, Instrutor.user_id == User.id)
+            .where(Horario.semana_id == semana_id)
+        ).all()
+
+        grupos = defaultdict(list)
+        for linha in linhas:
+            intervalo = _intervalo(linha.id, linha.periodo, linha.duracao)
+            grupos[(linha.dia_semana, EIXO_PELOTAO, linha.turma_id)].append(intervalo)
+            grupos[(linha.dia_semana, EIXO_INSTRUTOR, linha.instrutor_id)].append(intervalo)
+
+        conflitos = []
+        for (dia, eixo, _), intervalos in grupos.items():
+            if len(intervalos) > 1:
+                conflitos.extend(Conflito(eixo, dia, a, b) for a, b in _varrer(intervalos))
+
+        por_id = {linha.id: linha for linha in linhas}
+
+        def _aula(aula_id):
+            linha = por_id[aula_id]
+            return {
+                'id': linha.id,
+                'turma': linha.turma,
+                'disciplina': linha.materia,
+                'instrutor': linha.nome_completo or linha.username,
+                'periodo': linha.periodo,
+                'duracao': linha.duracao,
+                'status': linha.status,
+            }
+
+        conflitos.sort(key=lambda c: (DIAS_SEMANA.index(c.dia) if c.dia in DIAS_SEMANA else len(DIAS_SEMANA),
+                                      por_id[c.aula_id].periodo, c.eixo))
+        return [{'eixo': c.eixo, 'dia': c.dia, 'aulas': [_aula(c.aula_id), _aula(c.outra_aula_id)]}
+                for c in conflitos]
@@ -2,23 +2,24 @@ from ..models.database import db
 from ..models.disciplina import Disciplina
 from ..models.user import User
 from ..models.turma import Turma
-from ..models.aluno import Aluno
 from ..models.disciplina_turma import DisciplinaTurma
-from ..models.historico_disciplina import HistoricoDisciplina
 from ..models.instrutor import Instrutor
-from sqlalchemy import select, or_
+from ..models.horario import Horario
+from .historico_service import HistoricoService
+from .horario_cache_service import HorarioCacheService
+from sqlalchemy import select, or_, insert, literal
 from sqlalchemy.orm import joinedload
 from sqlalchemy.exc import IntegrityError
 from flask import current_app
 
 class DisciplinaService:
     @staticmethod
-    def get_disciplinas_with_instrutores_for_pelotao(pelotao: str):
+    def get_disciplinas_with_instrutores_for_pelotao(turma_id: int):
         """
-        Busca todas as associações de disciplina para um pelotão específico,
+        Busca todas as associações de disciplina para uma turma específica,
         garantindo que os dados do instrutor e do usuário sejam pré-carregados.
         """
-        print(f"DEBUG: Buscando disciplinas para pelotão: {pelotao}")
+        print(f"DEBUG: Buscando disciplinas para turma ID: {turma_id}")
         
         query = (
             select(DisciplinaTurma)
@@ -28,7 +29,7 @@ class DisciplinaService:
                 joinedload(DisciplinaTurma.disciplina)
             )
             .join(Disciplina)
-            .filter(DisciplinaTurma.pelotao == pelotao)
+            .filter(DisciplinaTurma.turma_id == turma_id)
             .order_by(Disciplina.materia)
         )
         
@@ -45,19 +46,19 @@ class DisciplinaService:
         return associacoes
 
     @staticmethod
-    def get_disciplinas_for_instrutor_in_pelotao(instrutor_id: int, pelotao: str):
+    def get_disciplinas_for_instrutor_in_pelotao(instrutor_id: int, turma_id: int):
         """
-        Busca disciplinas específicas de um instrutor em um pelotão específico.
+        Busca disciplinas específicas de um instrutor em uma turma específica.
         Esta é a função crítica para o problema reportado.
         """
-        print(f"DEBUG: Buscando disciplinas para instrutor ID {instrutor_id} no pelotão {pelotao}")
+        print(f"DEBUG: Buscando disciplinas para instrutor ID {instrutor_id} na turma ID {turma_id}")
         
         # Query mais explícita e com debug
         query = (
             select(DisciplinaTurma)
             .options(joinedload(DisciplinaTurma.disciplina))
             .where(
-                DisciplinaTurma.pelotao == pelotao,
+                DisciplinaTurma.turma_id == turma_id,
                 or_(
                     DisciplinaTurma.instrutor_id_1 == instrutor_id,
                     DisciplinaTurma.instrutor_id_2 == instrutor_id
@@ -76,17 +77,17 @@ class DisciplinaService:
             print(f"  - Disciplina: {assoc.disciplina.materia}")
             print(f"    Instrutor 1 ID: {assoc.instrutor_id_1}")
             print(f"    Instrutor 2 ID: {assoc.instrutor_id_2}")
-            print(f"    Pelotão: {assoc.pelotao}")
+            print(f"    Turma ID: {assoc.turma_id}")
         
         if len(associacoes) == 0:
-            print(f"DEBUG: NENHUMA associação encontrada para instrutor {instrutor_id} no {pelotao}")
+            print(f"DEBUG: NENHUMA associação encontrada para instrutor {instrutor_id} na turma ID {turma_id}")
             
-            # Vamos buscar TODAS as associações deste pelotão para debug
-            print(f"DEBUG: Listando TODAS as associações do {pelotao}:")
+            # Vamos buscar TODAS as associações desta turma para debug
+            print(f"DEBUG: Listando TODAS as associações da turma ID {turma_id}:")
             todas_associacoes = db.session.scalars(
                 select(DisciplinaTurma)
                 .options(joinedload(DisciplinaTurma.disciplina))
-                .where(DisciplinaTurma.pelotao == pelotao)
+                .where(DisciplinaTurma.turma_id == turma_id)
             ).all()
             
             for assoc in todas_associacoes:
@@ -106,7 +107,7 @@ class DisciplinaService:
             ).all()
             
             for assoc in associacoes_instrutor:
-                print(f"  - {assoc.disciplina.materia} no {assoc.pelotao}")
+                print(f"  - {assoc.disciplina.materia} na turma ID {assoc.turma_id}")
         
         return associacoes
         
@@ -137,22 +138,16 @@ class DisciplinaService:
             db.session.add(nova_disciplina)
             db.session.commit()
 
-            # Matricula todos os alunos na nova disciplina
-            todos_os_alunos = db.session.scalars(select(Aluno)).all()
-            for aluno in todos_os_alunos:
-                nova_matricula = HistoricoDisciplina(aluno_id=aluno.id, disciplina_id=nova_disciplina.id)
-                db.session.add(nova_matricula)
+            # Matricula todos os alunos na nova disciplina (um único INSERT ... SELECT)
+            HistoricoService.matricular_em_massa(disciplina_ids=[nova_disciplina.id])
             
             # Cria associações para todas as turmas (sem instrutores inicialmente)
-            turmas = db.session.scalars(select(Turma)).all()
-            for turma in turmas:
-                associacao = DisciplinaTurma(
-                    pelotao=turma.nome,
-                    disciplina_id=nova_disciplina.id,
-                    instrutor_id_1=None,  # Será definido posteriormente
-                    instrutor_id_2=None   # Será definido posteriormente
+            db.session.execute(
+                insert(DisciplinaTurma).from_select(
+                    ['turma_id', 'disciplina_id'],
+                    select(Turma.id, literal(nova_disciplina.id))
                 )
-                db.session.add(associacao)
+            )
 
             db.session.commit()
             print(f"DEBUG: Disciplina '{nome_materia}' criada e associada a todas as turmas")
@@ -192,10 +187,13 @@ class DisciplinaService:
             return False, "Carga horária deve ser um número inteiro."
 
         try:
+            renomeada = disciplina.materia != nome_materia
             disciplina.materia = nome_materia
             disciplina.carga_horaria_prevista = carga_horaria_int
             
             db.session.commit()
+            if renomeada:
+                HorarioCacheService.invalidar(HorarioCacheService.pares(Horario.disciplina_id == disciplina_id))
             return True, "Disciplina atualizada com sucesso!"
         except IntegrityError:
             db.session.rollback()
@@ -219,13 +217,13 @@ class DisciplinaService:
                 joinedload(DisciplinaTurma.instrutor_1).joinedload(Instrutor.user),
                 joinedload(DisciplinaTurma.instrutor_2).joinedload(Instrutor.user)
             )
-            .order_by(DisciplinaTurma.pelotao, DisciplinaTurma.disciplina_id)
+            .order_by(DisciplinaTurma.turma_id, DisciplinaTurma.disciplina_id)
         )
         
         todas_associacoes = db.session.scalars(query).unique().all()
         
         for assoc in todas_associacoes:
-            print(f"Pelotão: {assoc.pelotao}")
+            print(f"Turma ID: {assoc.turma_id}")
             print(f"  Disciplina: {assoc.disciplina.materia}")
             print(f"  Instrutor 1 ID: {assoc.instrutor_id_1}")
             if assoc.instrutor_1:
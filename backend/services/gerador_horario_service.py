@@ -0,0 +1,419 @@
+import heapq
+import time
+from collections import defaultdict
+from flask import current_app
+from sqlalchemy import select, insert, or_
+from ..models.database import db
+from ..models.horario import Horario
+from ..models.disciplina import Disciplina
+from ..models.disciplina_turma import DisciplinaTurma
+from ..models.instrutor import Instrutor
+from ..models.semana import Semana
+from ..models.turma import Turma
+from ..models.user import User
+from .carga_horaria_service import CargaHorariaService
+from .conflito_horario_service import ConflitoHorarioService
+from .horario_cache_service import HorarioCacheService
+from .horario_service import periodos_habilitados
+
+# Períodos consecutivos da mesma disciplina viram uma única aula de até esta duração
+DURACAO_MAXIMA_AULA = 2
+# A cada quantos nós da busca o relógio é consultado
+_NOS_POR_VERIFICACAO = 256
+
+
+class _TempoEsgotado(Exception):
+    pass
+
+
+def _ocupar(ocupados, dia, periodo, duracao):
+    for p in range(periodo, periodo + max(duracao or 1, 1)):
+        ocupados.add((dia, p))
+
+
+def _cotas(restantes, limites, capacidade):
+    """
+    Reparte as vagas da semana entre as disciplinas proporcionalmente às
+    horas que faltam (maior quociente primeiro), respeitando o limite de
+    cada uma. Sem falta de vagas, a cota é simplesmente o que falta.
+    """
+    cotas = {d: 0 for d in restantes}
+    fila = [(0.0, d) for d in restantes if min(restantes[d], limites[d]) > 0]
+    heapq.heapify(fila)
+    while capacidade > 0 and fila:
+        _, d = heapq.heappop(fila)
+        cotas[d] += 1
+        capacidade -= 1
+        if cotas[d] < min(restantes[d], limites[d]):
+            heapq.heappush(fila, (cotas[d] / restantes[d], d))
+    return cotas
+
+
+class _Distribuicao:
+    """
+    Fluxo máximo origem -> disciplina -> (disciplina, dia) -> vaga -> destino,
+    com capacidade igual à cota de cada disciplina, ao máximo diário e a uma
+    aula por vaga. Ajusta as cotas para que possam ser cumpridas ao mesmo
+    tempo (instrutores e vagas disputados entre disciplinas) e fornece uma
+    distribuição completa caso a busca esgote o tempo.
+    """
+
+    def __init__(self, vagas, opcoes, max_por_dia):
+        self.total_vagas = len(vagas)
+        self.residual = defaultdict(dict)
+        for i, (dia, _) in enumerate(vagas):
+            self._aresta(('vaga', i), 'destino', 1)
+            for d in opcoes[i]:
+                self._aresta(('dia', d, dia), ('vaga', i), 1)
+                self._aresta(('disciplina', d), ('dia', d, dia), max_por_dia)
+
+    def _aresta(self, origem, destino, capacidade):
+        if destino not in self.residual[origem]:
+            self.residual[origem][destino] = capacidade
+            self.residual[destino].setdefault(origem, 0)
+
+    def fluxo(self, d):
+        return self.residual[('disciplina', d)].get('origem', 0)
+
+    def limitar(self, cotas):
+        """Define a capacidade origem -> disciplina, descontado o fluxo já enviado."""
+        for d, cota in cotas.items():
+            self._aresta('origem', ('disciplina', d), 0)
+            self.residual['origem'][('disciplina', d)] = max(cota - self.fluxo(d), 0)
+
+    def aumentar(self):
+        """
+        Caminhos aumentantes por busca em largura (Edmonds-Karp); cada um leva
+        uma aula. O fluxo já enviado a uma disciplina nunca diminui.
+        """
+        while True:
+            anterior = {'origem': None}
+            fila = ['origem']
+            for no in fila:
+                if no == 'destino':
+                    break
+                for vizinho, capacidade in self.residual[no].items():
+                    if capacidade > 0 and vizinho not in anterior:
+                        anterior[vizinho] = no
+                        fila.append(vizinho)
+            if 'destino' not in anterior:
+                return
+            no = 'destino'
+            while anterior[no] is not None:
+                origem = anterior[no]
+                self.residual[origem][no] -= 1
+                self.residual[no][origem] += 1
+                no = origem
+
+    def atribuicao(self):
+        """Disciplina de cada vaga segundo o fluxo (None = vaga vazia)."""
+        resultado = [None] * self.total_vagas
+        for i in range(self.total_vagas):
+            for no, fluxo in self.residual[('vaga', i)].items():
+                if no != 'destino' and fluxo > 0:
+                    resultado[i] = no[1]
+        return resultado
+
+
+class _Busca:
+    """
+    Busca com retrocesso sobre as vagas livres do pelotão. Cada vaga recebe
+    uma disciplina (com um instrutor vinculado e livre naquele horário) ou
+    fica vazia. Escolhe primeiro a vaga com menos opções (MRV), tenta antes
+    continuar a disciplina do período anterior (aulas duplas) e a de maior
+    cota, e a cada atribuição verifica se as cotas restantes ainda cabem nas
+    vagas não atribuídas, dia a dia (checagem à frente).
+    """
+
+    def __init__(self, vagas, opcoes, cotas, max_por_dia, prazo):
+        self.vagas = vagas
+        self.opcoes = opcoes  # por vaga: {disciplina_id: [instrutor_id, ...]}
+        self.cotas = dict(cotas)
+        self.max_por_dia = max_por_dia
+        self.prazo = prazo
+        self.indice_vaga = {vaga: i for i, vaga in enumerate(vagas)}
+        self.atribuicao = [None] * len(vagas)
+        self.livres = set(range(len(vagas)))
+        self.no_dia = defaultdict(int)  # (disciplina_id, dia) -> aulas atribuídas
+        self.folga = len(vagas) - sum(self.cotas.values())
+        self.nos = 0
+
+    def _dominio(self, i):
+        dia = self.vagas[i][0]
+        return [d for d in self.opcoes[i]
+                if self.cotas.get(d, 0) > 0 and self.no_dia[(d, dia)] < self.max_por_dia]
+
+    def _cotas_cabem(self):
+        """Para cada disciplina com cota, as vagas livres que ainda a aceitam bastam?"""
+        por_disciplina_dia = defaultdict(int)
+        for i in self.livres:
+            dia = self.vagas[i][0]
+            for d in self.opcoes[i]:
+                if self.cotas.get(d, 0) > 0:
+                    por_disciplina_dia[(d, dia)] += 1
+        capacidade = defaultdict(int)
+        for (d, dia), n in por_disciplina_dia.items():
+            capacidade[d] += min(n, self.max_por_dia - self.no_dia[(d, dia)])
+        return all(capacidade[d] >= cota for d, cota in self.cotas.items() if cota > 0)
+
+    def _anterior(self, i):
+        dia, periodo = self.vagas[i]
+        anterior = self.indice_vaga.get((dia, periodo - 1))
+        return self.atribuicao[anterior] if anterior is not None else None
+
+    def instrutor(self, i, d):
+        """Instrutor livre para a disciplina, mantendo o do período anterior se possível."""
+        anterior = self._anterior(i)
+        if anterior and anterior[0] == d and anterior[1] in self.opcoes[i][d]:
+            return anterior[1]
+        return self.opcoes[i][d][0]
+
+    def resolver(self):
+        """Retorna a atribuição (disciplina, instrutor) por vaga, ou None se não houver no prazo."""
+        try:
+            return self.atribuicao if self._buscar() else None
+        except _TempoEsgotado:
+            return None
+
+    def _buscar(self):
+        self.nos += 1
+        if self.nos % _NOS_POR_VERIFICACAO == 0 and time.monotonic() > self.prazo:
+            raise _TempoEsgotado()
+        if not any(self.cotas.values()):
+            return True
+
+        # MRV: a vaga livre com menos disciplinas possíveis
+        escolhida, dominio = None, None
+        for i in sorted(self.livres):
+            candidato = self._dominio(i)
+            if dominio is None or len(candidato) < len(dominio):
+                escolhida, dominio = i, candidato
+                if not dominio:
+                    break
+        if escolhida is None:
+            return False
+
+        self.livres.discard(escolhida)
+        dia = self.vagas[escolhida][0]
+        anterior = self._anterior(escolhida)
+        continuar = anterior[0] if anterior else None
+        for d in sorted(dominio, key=lambda d: (d != continuar, -self.cotas[d], d)):
+            self.atribuicao[escolhida] = (d, self.instrutor(escolhida, d))
+            self.cotas[d] -= 1
+            self.no_dia[(d, dia)] += 1
+            if self._cotas_cabem() and self._buscar():
+                return True
+            self.no_dia[(d, dia)] -= 1
+            self.cotas[d] += 1
+            self.atribuicao[escolhida] = None
+
+        # Deixar a vaga vazia consome a folga entre vagas e cotas
+        if self.folga > 0:
+            self.folga -= 1
+            if self._cotas_cabem() and self._buscar():
+                return True
+            self.folga += 1
+        self.livres.add(escolhida)
+        return False
+
+
+class GeradorHorarioService:
+    @staticmethod
+    def gerar_proposta(turma_id: int, semana_id: int):
+        """
+        Propõe as aulas da semana para as vagas livres do pelotão, com as
+        disciplinas do ciclo da semana vinculadas ao pelotão. Respeita a carga
+        horária que falta (prevista menos a já agendada), os instrutores
+        vinculados em DisciplinaTurma e as aulas desses instrutores em outros
+        pelotões, os períodos habilitados e os limites de sábado e domingo.
+        Nada é gravado. Retorna (ok, mensagem, proposta).
+        """
+        semana = db.session.get(Semana, semana_id)
+        if not semana:
+            return False, "Semana não encontrada.", None
+        if not db.session.get(Turma, turma_id):
+            return False, "Turma não encontrada.", None
+
+        inicio = time.monotonic()
+        vinculos = db.session.execute(
+            select(Disciplina.id, Disciplina.materia, Disciplina.carga_horaria_prevista,
+                   DisciplinaTurma.instrutor_id_1, DisciplinaTurma.instrutor_id_2)
+            .join(DisciplinaTurma, DisciplinaTurma.disciplina_id == Disciplina.id)
+            .where(DisciplinaTurma.turma_id == turma_id, Disciplina.ciclo == semana.ciclo)
+            .order_by(Disciplina.materia)
+        ).all()
+
+        instrutores_da = {}
+        nomes_disciplinas = {}
+        for v in vinculos:
+            ids = [i for i in (v.instrutor_id_1, v.instrutor_id_2) if i]
+            if ids:
+                instrutores_da[v.id] = list(dict.fromkeys(instrutores_da.get(v.id, []) + ids))
+                nomes_disciplinas[v.id] = v.materia
+        if not instrutores_da:
+            return False, "Nenhuma disciplina do ciclo tem instrutor vinculado a este pelotão.", None
+
+        ids_disciplinas = list(instrutores_da)
+        agendadas = CargaHorariaService.get_horas(turma_id, ids_disciplinas, 'confirmado')
+        pendentes = CargaHorariaService.get_horas(turma_id, ids_disciplinas, 'pendente')
+        restantes = {}
+        for v in vinculos:
+            if v.id in instrutores_da and v.id not in restantes:
+                falta = (v.carga_horaria_prevista or 0) - agendadas.get(v.id, 0) - pendentes.get(v.id, 0)
+                if falta > 0:
+                    restantes[v.id] = falta
+        if not restantes:
+            return False, "Todas as disciplinas do ciclo já têm a carga horária agendada.", None
+
+        # Uma consulta: as aulas da semana do pelotão e dos instrutores envolvidos
+        todos_instrutores = {i for ids in instrutores_da.values() for i in ids}
+        ocupadas_pelotao = set()
+        ocupado_instrutor = defaultdict(set)
+        for aula in db.session.execute(
+            select(Horario.turma_id, Horario.instrutor_id, Horario.dia_semana, Horario.periodo, Horario.duracao)
+            .where(
+                Horario.semana_id == semana_id,
+                or_(Horario.turma_id == turma_id, Horario.instrutor_id.in_(todos_instrutores))
+            )
+        ).all():
+            if aula.turma_id == turma_id:
+                _ocupar(ocupadas_pelotao, aula.dia_semana, aula.periodo, aula.duracao)
+            _ocupar(ocupado_instrutor[aula.instrutor_id], aula.dia_semana, aula.periodo, aula.duracao)
+
+        vagas = [(dia, periodo) for dia, periodos in periodos_habilitados(semana).items()
+                 for periodo in periodos if (dia, periodo) not in ocupadas_pelotao]
+        if not vagas:
+            return False, "Não há períodos livres para este pelotão na semana.", None
+
+        opcoes = []
+        for vaga in vagas:
+            por_disciplina = {}
+            for d in restantes:
+                livres = [i for i in instrutores_da[d] if vaga not in ocupado_instrutor[i]]
+                if livres:
+                    por_disciplina[d] = livres
+            opcoes.append(por_disciplina)
+
+        max_por_dia = current_app.config['GERADOR_HORARIO_MAX_POR_DIA']
+        limites = {}
+        for d in restantes:
+            por_dia = defaultdict(int)
+            for vaga, por_disciplina in zip(vagas, opcoes):
+                if d in por_disciplina:
+                    por_dia[vaga[0]] += 1
+            limites[d] = sum(min(n, max_por_dia) for n in por_dia.values())
+
+        # Cotas proporcionais primeiro; depois o fluxo completa as vagas que
+        # sobraram com o que ainda falta de qualquer disciplina
+        capacidade = sum(1 for por_disciplina in opcoes if por_disciplina)
+        distribuicao = _Distribuicao(vagas, opcoes, max_por_dia)
+        distribuicao.limitar(_cotas(restantes, limites, capacidade))
+        distribuicao.aumentar()
+        distribuicao.limitar(restantes)
+        distribuicao.aumentar()
+        cotas = {d: distribuicao.fluxo(d) for d in restantes}
+
+        prazo = inicio + current_app.config['GERADOR_HORARIO_LIMITE_SEGUNDOS']
+        busca = _Busca(vagas, opcoes, cotas, max_por_dia, prazo)
+        atribuicao = busca.resolver()
+        busca_concluida = atribuicao is not None
+        if not busca_concluida:
+            atribuicao = [(d, opcoes[i][d][0]) if d is not None else None
+                          for i, d in enumerate(distribuicao.atribuicao())]
+
+        # Períodos consecutivos da mesma disciplina e instrutor viram uma aula só
+        aulas = []
+        for (dia, periodo), valor in zip(vagas, atribuicao):
+            if valor is None:
+                continue
+            anterior = aulas[-1] if aulas else None
+            if (anterior and anterior['dia'] == dia
+                    and anterior['periodo'] + anterior['duracao'] == periodo
+                    and (anterior['disciplina_id'], anterior['instrutor_id']) == valor
+                    and anterior['duracao'] < DURACAO_MAXIMA_AULA):
+                anterior['duracao'] += 1
+            else:
+                aulas.append({'dia': dia, 'periodo': periodo, 'duracao': 1,
+                              'disciplina_id': valor[0], 'instrutor_id': valor[1]})
+        if not aulas:
+            return False, "Nenhum instrutor vinculado está livre nos períodos vagos do pelotão.", None
+
+        nomes_instrutores = dict(db.session.execute(
+            select(Instrutor.id, db.func.coalesce(User.nome_completo, User.username))
+            .join(User, Instrutor.user_id == User.id)
+            .where(Instrutor.id.in_({a['instrutor_id'] for a in aulas}))
+        ).all()) if aulas else {}
+        horas_propostas = defaultdict(int)
+        for aula in aulas:
+            aula['disciplina'] = nomes_disciplinas[aula['disciplina_id']]
+            aula['instrutor'] = nomes_instrutores.get(aula['instrutor_id'], 'N/D')
+            horas_propostas[aula['disciplina_id']] += aula['duracao']
+
+        proposta = {
+            'aulas': aulas,
+            'busca_concluida': busca_concluida,
+            'vagas_livres': len(vagas),
+            'horas_propostas': sum(horas_propostas.values()),
+            'carga_restante': [
+                {'disciplina': nomes_disciplinas[d], 'antes': restantes[d],
+                 'depois': restantes[d] - horas_propostas[d]}
+                for d in restantes
+            ],
+            'tempo_ms': round((time.monotonic() - inicio) * 1000, 1),
+        }
+        mensagem = f"Proposta com {proposta['horas_propostas']} período(s) em {len(aulas)} aula(s)."
+        if proposta['horas_propostas'] < len(vagas):
+            mensagem += (f" {len(vagas) - proposta['horas_propostas']} período(s) livre(s) ficaram vazios"
+                         " por falta de instrutor disponível ou de carga horária a cumprir.")
+        return True, mensagem, proposta
+
+    @staticmethod
+    def aplicar_proposta(turma_id: int, semana_id: int, aulas):
+        """
+        Grava a proposta aceita pelo administrador em um único INSERT em lote,
+        depois de revalidar vínculos e conflitos contra o estado atual da
+        semana. As aulas entram confirmadas. Retorna (ok, mensagem).
+        """
+        if not db.session.get(Semana, semana_id):
+            return False, "Semana não encontrada."
+        if not aulas:
+            return False, "A proposta não tem aulas."
+        try:
+            aulas = [{'dia': a['dia'], 'periodo': int(a['periodo']), 'duracao': int(a.get('duracao', 1)),
+                      'disciplina_id': int(a['disciplina_id']), 'instrutor_id': int(a['instrutor_id'])}
+                     for a in aulas]
+        except (KeyError, TypeError, ValueError):
+            return False, "Dados inválidos na proposta."
+
+        vinculos = set()
+        for disciplina_id, instrutor_1, instrutor_2 in db.session.execute(
+            select(DisciplinaTurma.disciplina_id, DisciplinaTurma.instrutor_id_1, DisciplinaTurma.instrutor_id_2)
+            .where(DisciplinaTurma.turma_id == turma_id)
+        ).all():
+            vinculos.update((disciplina_id, i) for i in (instrutor_1, instrutor_2) if i)
+        if any((a['disciplina_id'], a['instrutor_id']) not in vinculos for a in aulas):
+            return False, "A proposta tem disciplina ou instrutor não vinculado a este pelotão."
+
+        ok, mensagem = ConflitoHorarioService.verificar_lote(semana_id, turma_id, aulas)
+        if not ok:
+            return False, f"{mensagem} Gere uma nova proposta."
+
+        try:
+            db.session.execute(insert(Horario), [
+                {'turma_id': turma_id, 'semana_id': semana_id, 'dia_semana': a['dia'], 'periodo': a['periodo'],
+                 'duracao': a['duracao'], 'disciplina_id': a['disciplina_id'], 'instrutor_id': a['instrutor_id'],
+                 'status': 'confirmado'}
+                for a in aulas
+            ])
+            horas = defaultdict(int)
+            for a in aulas:
+                horas[a['disciplina_id']] += a['duracao']
+            for disciplina_id, total in horas.items():
+                CargaHorariaService.registrar(disciplina_id, turma_id, 'confirmado', total)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Erro ao aplicar proposta de horário: {e}")
+            return False, "Erro ao gravar a proposta."
+        HorarioCacheService.invalidar({(turma_id, semana_id)})
+        return True, f"{len(aulas)} aula(s) agendada(s) a partir da proposta."
@@ -3,7 +3,7 @@ from ..models.aluno import Aluno
 from ..models.disciplina import Disciplina
 from ..models.historico_disciplina import HistoricoDisciplina
 from ..models.historico import HistoricoAluno
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, insert, exists, literal, true
 from flask import current_app
 
 class HistoricoService:
@@ -23,6 +23,28 @@ class HistoricoService:
         stmt = select(Disciplina).where(Disciplina.id.notin_(subquery)).order_by(Disciplina.materia)
         return db.session.scalars(stmt).all()
 
+    @staticmethod
+    def matricular_em_massa(aluno_ids=None, disciplina_ids=None) -> int:
+        """
+        Matricula os alunos nas disciplinas com um único INSERT ... SELECT,
+        ignorando os pares que já existem. Sem filtros, cruza todos os alunos
+        com todas as disciplinas. Não faz commit; retorna o número de matrículas criadas.
+        """
+        ja_matriculado = exists().where(
+            HistoricoDisciplina.aluno_id == Aluno.id,
+            HistoricoDisciplina.disciplina_id == Disciplina.id
+        )
+        pares = select(Aluno.id, Disciplina.id, literal('cursando')).join(Disciplina, true()).where(~ja_matriculado)
+        if aluno_ids is not None:
+            pares = pares.where(Aluno.id.in_(aluno_ids))
+        if disciplina_ids is not None:
+            pares = pares.where(Disciplina.id.in_(disciplina_ids))
+
+        result = db.session.execute(
+            insert(HistoricoDisciplina).from_select(['aluno_id', 'disciplina_id', 'status'], pares)
+        )
+        return result.rowcount
+
     @staticmethod
     def matricular_aluno(aluno_id: int, disciplina_id_str: str):
         if not disciplina_id_str or not disciplina_id_str.isdigit():
@@ -0,0 +1,95 @@
+import os
+import threading
+from collections import OrderedDict
+from flask import current_app
+from sqlalchemy import select
+from ..models.database import db
+from ..models.horario import Horario
+
+# Cache local do processo, do menos para o mais usado:
+# {(turma_id, semana_id, ciclo): (carimbo, matriz_base)}
+_matrizes_cache = OrderedDict()
+_matrizes_lock = threading.Lock()
+
+
+def _arquivo_versao(turma_id, semana_id):
+    return os.path.join(current_app.config['HORARIO_CACHE_VERSOES_DIR'], f"{turma_id}_{semana_id}.version")
+
+
+def _ler_carimbo(path):
+    """
+    Carimbo de versão de um (pelotão, semana): o conteúdo do arquivo, trocado
+    a cada escrita por um valor aleatório, para que todos os workers percebam
+    a alteração sem consultar o banco. Sem arquivo, nunca houve escrita.
+    """
+    try:
+        with open(path, 'r') as f:
+            return f.read()
+    except OSError:
+        return ''
+
+
+class HorarioCacheService:
+    """
+    Cache das matrizes do quadro horário sem a camada de permissões, por
+    (pelotão, semana, ciclo). Toda escrita que altera as aulas de um
+    (pelotão, semana), ou os nomes exibidos nelas, troca o carimbo desse par
+    depois do commit; as entradas com carimbo antigo são refeitas na próxima
+    leitura, em qualquer worker.
+    """
+
+    @staticmethod
+    def get_matriz(turma_id: int, semana_id: int, ciclo: int, construir):
+        """
+        Retorna a matriz base do cache ou a monta com construir(turma_id,
+        semana_id, ciclo). O carimbo é lido antes da montagem, de modo que uma
+        escrita concorrente nunca fica mascarada por uma matriz antiga.
+        """
+        limite = current_app.config['HORARIO_CACHE_MAX_MATRIZES']
+        if limite <= 0:
+            return construir(turma_id, semana_id, ciclo)
+
+        chave = (turma_id, semana_id, ciclo)
+        carimbo = _ler_carimbo(_arquivo_versao(turma_id, semana_id))
+        cached = _matrizes_cache.get(chave)
+        if cached and cached[0] == carimbo:
+            with _matrizes_lock:
+                if chave in _matrizes_cache:
+                    _matrizes_cache.move_to_end(chave)
+            return cached[1]
+
+        matriz = construir(turma_id, semana_id, ciclo)
+        with _matrizes_lock:
+            _matrizes_cache[chave] = (carimbo, matriz)
+            _matrizes_cache.move_to_end(chave)
+            while len(_matrizes_cache) > limite:
+                _matrizes_cache.popitem(last=False)
+        return matriz
+
+    @staticmethod
+    def pares(*criterios):
+        """(turma_id, semana_id) das aulas que atendem aos critérios; chamar antes de um delete."""
+        return set(db.session.execute(
+            select(Horario.turma_id, Horario.semana_id).where(*criterios).distinct()
+        ).all())
+
+    @staticmethod
+    def invalidar(pares):
+        """
+        Troca o carimbo de cada (turma_id, semana_id) e descarta as entradas
+        locais. Deve ser chamado somente depois do commit da escrita.
+        """
+        pares = set(pares)
+        if not pares:
+            return
+        pasta = current_app.config['HORARIO_CACHE_VERSOES_DIR']
+        os.makedirs(pasta, exist_ok=True)
+        with _matrizes_lock:
+            for turma_id, semana_id in pares:
+                path = _arquivo_versao(turma_id, semana_id)
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'w') as f:
+                    f.write(os.urandom(8).hex())
+                os.replace(tmp_path, path)
+            for chave in [c for c in _matrizes_cache if c[:2] in pares]:
+                del _matrizes_cache[chave]
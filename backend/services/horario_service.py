@@ -1,14 +1,196 @@
-from sqlalchemy import select, func
+from sqlalchemy import select
 from sqlalchemy.orm import joinedload
 from ..models.database import db
 from ..models.disciplina import Disciplina
 from ..models.instrutor import Instrutor
 from ..models.disciplina_turma import DisciplinaTurma
 from ..models.horario import Horario
+from ..models.semana import Semana
+from ..models.turma import Turma
+from ..models.user import User
+from .carga_horaria_service import CargaHorariaService
+from .horario_cache_service import HorarioCacheService
+
+DIAS_SEMANA = ['segunda', 'terca', 'quarta', 'quinta', 'sexta', 'sabado', 'domingo']
+TOTAL_PERIODOS = 15
+# Períodos após o 12º só entram quando habilitados na semana
+PERIODOS_REGULARES = 12
+
+
+def periodos_habilitados(semana: Semana):
+    """{dia: [períodos]} liberados na semana, na ordem do quadro."""
+    resultado = {}
+    for dia in DIAS_SEMANA:
+        if dia == 'sabado':
+            if not semana.mostrar_sabado:
+                continue
+            limite = semana.periodos_sabado
+        elif dia == 'domingo':
+            if not semana.mostrar_domingo:
+                continue
+            limite = semana.periodos_domingo
+        else:
+            limite = TOTAL_PERIODOS
+        resultado[dia] = [
+            periodo for periodo in range(1, min(limite, TOTAL_PERIODOS) + 1)
+            if periodo <= PERIODOS_REGULARES or getattr(semana, f'mostrar_periodo_{periodo}')
+        ]
+    return resultado
+
+
+class HorarioPermissionContext:
+    """
+    Permissões do usuário para o quadro horário, resolvidas uma única vez por
+    requisição. Evita uma consulta por aula ao montar a matriz.
+    """
+    __slots__ = ('is_admin', 'instrutor_id')
+
+    def __init__(self, is_admin: bool, instrutor_id=None):
+        self.is_admin = is_admin
+        self.instrutor_id = instrutor_id
+
+    @classmethod
+    def from_user(cls, user):
+        is_admin = user.role in ['admin', 'programador']
+        instrutor_id = None
+        if user.role == 'instrutor' and user.instrutor_profile:
+            instrutor_id = user.instrutor_profile.id
+        return cls(is_admin, instrutor_id)
+
+    def can_edit(self, aula_instrutor_id) -> bool:
+        if self.is_admin:
+            return True
+        return self.instrutor_id is not None and aula_instrutor_id == self.instrutor_id
+
 
 class HorarioService:
     @staticmethod
-    def get_scheduling_data(pelotao: str, user):
+    def get_horas_agendadas_por_disciplina(turma_id: int, disciplina_ids=None, status: str = 'confirmado'):
+        """
+        Retorna {disciplina_id: horas} agendadas para a turma, lidas da
+        tabela de contadores carga_horaria_realizada (sem varrer 'horarios').
+        """
+        return CargaHorariaService.get_horas(turma_id, disciplina_ids, status)
+
+    @staticmethod
+    def construir_matriz_horario(turma_id: int, semana_id: int, ciclo: int, contexto: HorarioPermissionContext):
+        """
+        Monta a matriz (15 períodos x 7 dias) do quadro horário. A parte que
+        não depende do usuário vem do cache por (pelotão, semana, ciclo); só
+        'can_edit' é calculado a cada requisição, sobre uma cópia das células.
+        """
+        base = HorarioCacheService.get_matriz(turma_id, semana_id, ciclo, HorarioService._construir_matriz_base)
+        return [
+            [celula if celula == 'SKIP' else
+             dict(celula) if celula['is_disposicao'] else
+             dict(celula, can_edit=contexto.can_edit(celula['instrutor_id']))
+             for celula in linha]
+            for linha in base
+        ]
+
+    @staticmethod
+    def _construir_matriz_base(turma_id: int, semana_id: int, ciclo: int):
+        """Matriz do quadro horário sem permissões, com uma única consulta."""
+        a_disposicao = {'materia': 'A disposição do C Al /S Ens', 'instrutor': None, 'duracao': 1, 'is_disposicao': True, 'id': None}
+        horario_matrix = [[dict(a_disposicao) for _ in range(7)] for _ in range(TOTAL_PERIODOS)]
+
+        aulas_agendadas = db.session.scalars(
+            select(Horario).options(joinedload(Horario.disciplina), joinedload(Horario.instrutor).joinedload(Instrutor.user))
+            .join(Disciplina)
+            .where(
+                Horario.turma_id == turma_id,
+                Horario.semana_id == semana_id,
+                Disciplina.ciclo == ciclo
+            )
+        ).all()
+
+        for aula in aulas_agendadas:
+            try:
+                dia_idx = DIAS_SEMANA.index(aula.dia_semana)
+                periodo_idx = aula.periodo - 1
+                if 0 <= periodo_idx < TOTAL_PERIODOS and 0 <= dia_idx < 7:
+                    instrutor_nome = "N/D"
+                    if aula.instrutor and aula.instrutor.user:
+                        instrutor_nome = aula.instrutor.user.nome_completo or aula.instrutor.user.username
+                    aula_info = {
+                        'id': aula.id,
+                        'materia': aula.disciplina.materia,
+                        'instrutor': instrutor_nome,
+                        'instrutor_id': aula.instrutor_id,
+                        'duracao': aula.duracao,
+                        'status': aula.status,
+                        'is_disposicao': False,
+                    }
+                    horario_matrix[periodo_idx][dia_idx] = aula_info
+                    for i in range(1, aula.duracao):
+                        if periodo_idx + i < TOTAL_PERIODOS:
+                            horario_matrix[periodo_idx + i][dia_idx] = 'SKIP'
+            except (ValueError, IndexError):
+                continue
+        return horario_matrix
+
+    @staticmethod
+    def construir_visao_geral(semana: Semana):
+        """
+        Grade da semana de todos os pelotões com uma única consulta às aulas
+        (colunas já unidas a disciplina e instrutor, sem instanciar objetos).
+        'grade[t][d][p]' é o índice da aula em 'aulas' no período em que ela
+        começa, -1 nos períodos que ela ainda ocupa e None se estiver vago;
+        't', 'd' e 'p' seguem 'turmas', DIAS_SEMANA e os períodos 1..15.
+        'periodos' lista, por dia, os períodos habilitados ou com aula.
+        """
+        turmas = db.session.execute(select(Turma.id, Turma.nome).order_by(Turma.nome)).all()
+        posicao_turma = {turma.id: t for t, turma in enumerate(turmas)}
+        grade = [[[None] * TOTAL_PERIODOS for _ in DIAS_SEMANA] for _ in turmas]
+        periodos = {dia: set(lista) for dia, lista in periodos_habilitados(semana).items()}
+
+        linhas = db.session.execute(
+            select(Horario.id, Horario.turma_id, Horario.dia_semana, Horario.periodo, Horario.duracao,
+                   Horario.status, Disciplina.materia, User.nome_completo, User.username)
+            .join(Disciplina, Horario.disciplina_id == Disciplina.id)
+            .outerjoin(Instrutor, Horario.instrutor_id == Instrutor.id)
+            .outerjoin(User, Instrutor.user_id == User.id)
+            .where(Horario.semana_id == semana.id, Disciplina.ciclo == semana.ciclo)
+            .order_by(Horario.id)
+        ).all()
+
+        posicao_dia = {dia: d for d, dia in enumerate(DIAS_SEMANA)}
+        aulas = []
+        for aula_id, turma_id, dia, periodo, duracao, status, materia, nome, username in linhas:
+            t = posicao_turma.get(turma_id)
+            d = posicao_dia.get(dia)
+            if t is None or d is None or not 1 <= periodo <= TOTAL_PERIODOS:
+                continue
+            celulas = grade[t][d]
+            inicio = periodo - 1
+            if celulas[inicio] is not None:
+                continue  # sobreposição (ver /horario/conflitos): fica a aula mais antiga
+            celulas[inicio] = len(aulas)
+            fim = min(inicio + max(duracao or 1, 1), TOTAL_PERIODOS)
+            ocupados = 1
+            while inicio + ocupados < fim and celulas[inicio + ocupados] is None:
+                celulas[inicio + ocupados] = -1
+                ocupados += 1
+            periodos.setdefault(dia, set()).update(range(periodo, periodo + ocupados))
+            aulas.append({
+                'id': aula_id,
+                'materia': materia,
+                'instrutor': nome or username or 'N/D',
+                'duracao': duracao,
+                'periodos_na_grade': ocupados,
+                'status': status,
+            })
+
+        return {
+            'turmas': [{'id': turma.id, 'nome': turma.nome} for turma in turmas],
+            'dias': [dia for dia in DIAS_SEMANA if periodos.get(dia)],
+            'periodos': {dia: sorted(lista) for dia, lista in periodos.items() if lista},
+            'aulas': aulas,
+            'grade': grade,
+        }
+
+    @staticmethod
+    def get_scheduling_data(turma_id: int, user):
         """
         Busca os dados necessários para o agendamento de aulas,
         respeitando as permissões do usuário.
@@ -23,7 +205,7 @@ class HorarioService:
                 select(DisciplinaTurma)
                 .options(joinedload(DisciplinaTurma.disciplina))
                 .join(Disciplina)
-                .filter(DisciplinaTurma.pelotao == pelotao)
+                .filter(DisciplinaTurma.turma_id == turma_id)
                 .order_by(Disciplina.materia)
             )
             todos_instrutores_query = (
@@ -53,7 +235,7 @@ class HorarioService:
                 )
                 .join(Disciplina)
                 .filter(
-                    DisciplinaTurma.pelotao == pelotao,
+                    DisciplinaTurma.turma_id == turma_id,
                     (DisciplinaTurma.instrutor_id_1 == instrutor_id) | (DisciplinaTurma.instrutor_id_2 == instrutor_id)
                 )
                 .order_by(Disciplina.materia)
@@ -62,14 +244,13 @@ class HorarioService:
             instrutores_formatados = None # Instrutor não escolhe, o sistema define
 
         # --- Preparação dos dados para o Template ---
+        horas_por_disciplina = HorarioService.get_horas_agendadas_por_disciplina(
+            turma_id, [a.disciplina_id for a in associacoes]
+        )
         disciplinas_disponiveis = []
         for a in associacoes:
             total_previsto = a.disciplina.carga_horaria_prevista
-            horas_agendadas = db.session.query(func.sum(Horario.duracao)).filter_by(
-                disciplina_id=a.disciplina.id, 
-                pelotao=pelotao,
-                status='confirmado'
-            ).scalar() or 0
+            horas_agendadas = horas_por_disciplina.get(a.disciplina.id, 0)
             
             # Para instrutores, determina qual instrutor está logado
             instrutor_principal_id = a.instrutor_id_1 if (is_admin or a.instrutor_id_1 == instrutor_id) else a.instrutor_id_2
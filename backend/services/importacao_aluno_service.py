@@ -0,0 +1,238 @@
+import csv
+import io
+import itertools
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app
+from sqlalchemy import select, insert, or_, func
+from sqlalchemy.exc import IntegrityError
+from werkzeug.security import generate_password_hash
+from ..models.database import db
+from ..models.aluno import Aluno
+from ..models.user import User
+from ..models.turma import Turma
+from .historico_service import HistoricoService
+from utils.validators import validate_username, validate_email, validate_password_strength
+
+COLUNAS_OBRIGATORIAS = ['matricula', 'nome_completo', 'nome_de_guerra', 'email', 'senha', 'opm']
+COLUNAS_OPCIONAIS = ['turma', 'funcao_atual']
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _hash_senha(senha: str) -> str:
+    # Executado nos processos filhos: o hash da senha é CPU intensivo
+    return generate_password_hash(senha)
+
+
+def _get_pool():
+    # Um único pool por processo web, reaproveitado entre as importações
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=current_app.config['IMPORTACAO_HASH_PROCESSOS'],
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+    return _pool
+
+
+def _normalizar_cabecalho(nome) -> str:
+    return str(nome or '').strip().lower().replace(' ', '_')
+
+
+def _linhas_csv(stream):
+    """Lê o CSV linha a linha, detectando ';' ou ',' como separador."""
+    texto = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    primeira = texto.readline()
+    delimitador = ';' if primeira.count(';') > primeira.count(',') else ','
+    leitor = csv.reader(itertools.chain([primeira], texto), delimiter=delimitador)
+    cabecalho = [_normalizar_cabecalho(c) for c in next(leitor, [])]
+    for numero, valores in enumerate(leitor, start=2):
+        if not any(v.strip() for v in valores):
+            continue
+        yield numero, dict(zip(cabecalho, valores))
+
+
+def _linhas_xlsx(stream):
+    """Lê a primeira planilha em modo somente leitura (sem carregá-la inteira na memória)."""
+    from openpyxl import load_workbook
+    planilha = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        linhas = planilha.active.iter_rows(values_only=True)
+        cabecalho = [_normalizar_cabecalho(c) for c in next(linhas, ())]
+        for numero, valores in enumerate(linhas, start=2):
+            if not any(v not in (None, '') for v in valores):
+                continue
+            yield numero, {chave: '' if v is None else str(v) for chave, v in zip(cabecalho, valores)}
+    finally:
+        planilha.close()
+
+
+class ImportacaoAlunoService:
+    """
+    Importação em massa de alunos a partir de CSV/XLSX: o arquivo é lido em
+    fluxo, as senhas são geradas em um pool de processos e cada lote grava
+    usuários, perfis e matrículas em uma única transação.
+    """
+
+    @staticmethod
+    def ler_arquivo(arquivo):
+        """Retorna um iterador de (número da linha, dicionário da linha) conforme a extensão."""
+        nome = (arquivo.filename or '').lower()
+        if nome.endswith('.csv'):
+            return _linhas_csv(arquivo.stream)
+        if nome.endswith('.xlsx'):
+            try:
+                import openpyxl  # noqa: F401
+            except ImportError:
+                raise ValueError("A leitura de arquivos XLSX requer o pacote 'openpyxl'. Envie o arquivo em CSV.")
+            return _linhas_xlsx(arquivo.stream)
+        raise ValueError("Formato não suportado. Envie um arquivo .csv ou .xlsx.")
+
+    @staticmethod
+    def _validar_lote(linhas, turmas_por_nome, vistos):
+        """
+        Valida as linhas do lote e retorna (válidas, erros). Matrícula e e-mail
+        são conferidos com uma consulta por lote, além das repetições no próprio arquivo.
+        """
+        validas, erros = [], []
+        for numero, linha in linhas:
+            dados = {chave: (linha.get(chave) or '').strip() for chave in COLUNAS_OBRIGATORIAS + COLUNAS_OPCIONAIS}
+            faltando = [chave for chave in COLUNAS_OBRIGATORIAS if not dados[chave]]
+            mensagem = None
+            if faltando:
+                mensagem = f"Campos obrigatórios ausentes: {', '.join(faltando)}."
+            elif not validate_username(dados['matricula']):
+                mensagem = "Matrícula inválida (use de 3 a 20 letras ou números)."
+            elif not validate_email(dados['email']):
+                mensagem = "E-mail inválido."
+            else:
+                senha_ok, mensagem_senha = validate_password_strength(dados['senha'])
+                if not senha_ok:
+                    mensagem = mensagem_senha
+                elif dados['turma'] and dados['turma'] not in turmas_por_nome:
+                    mensagem = f"Turma '{dados['turma']}' não encontrada."
+                elif dados['matricula'] in vistos['matricula']:
+                    mensagem = "Matrícula repetida no arquivo."
+                elif dados['email'].lower() in vistos['email']:
+                    mensagem = "E-mail repetido no arquivo."
+
+            if mensagem:
+                erros.append({'linha': numero, 'matricula': dados['matricula'], 'mensagem': mensagem})
+                continue
+            vistos['matricula'].add(dados['matricula'])
+            vistos['email'].add(dados['email'].lower())
+            validas.append((numero, dados))
+
+        if not validas:
+            return validas, erros
+
+        matriculas = [dados['matricula'] for _, dados in validas]
+        emails = [dados['email'].lower() for _, dados in validas]
+        matriculas_em_uso = set(db.session.scalars(
+            select(User.id_func).where(or_(User.id_func.in_(matriculas), User.username.in_(matriculas)))
+        ).all())
+        matriculas_em_uso.update(db.session.scalars(select(Aluno.matricula).where(Aluno.matricula.in_(matriculas))).all())
+        emails_em_uso = set(db.session.scalars(
+            select(func.lower(User.email)).where(func.lower(User.email).in_(emails))
+        ).all())
+
+        aprovadas = []
+        for numero, dados in validas:
+            if dados['matricula'] in matriculas_em_uso:
+                erros.append({'linha': numero, 'matricula': dados['matricula'], 'mensagem': "Esta matrícula (Id Funcional) já está em uso."})
+            elif dados['email'].lower() in emails_em_uso:
+                erros.append({'linha': numero, 'matricula': dados['matricula'], 'mensagem': "Este e-mail já está em uso."})
+            else:
+                aprovadas.append((numero, dados))
+        return aprovadas, erros
+
+    @staticmethod
+    def _gravar_lote(linhas, hashes, turmas_por_nome) -> int:
+        """Grava usuários, perfis e matrículas do lote em uma transação. Retorna o número de alunos criados."""
+        user_ids = dict(db.session.execute(
+            insert(User).returning(User.id_func, User.id),
+            [{
+                'id_func': dados['matricula'],
+                'username': dados['matricula'],
+                'email': dados['email'],
+                'password_hash': senha_hash,
+                'nome_completo': dados['nome_completo'],
+                'nome_de_guerra': dados['nome_de_guerra'],
+                'role': 'aluno',
+                'is_active': True,
+            } for (_, dados), senha_hash in zip(linhas, hashes)]
+        ).all())
+
+        aluno_ids = db.session.scalars(
+            insert(Aluno).returning(Aluno.id),
+            [{
+                'user_id': user_ids[dados['matricula']],
+                'matricula': dados['matricula'],
+                'opm': dados['opm'],
+                'turma_id': turmas_por_nome.get(dados['turma']),
+                'funcao_atual': dados['funcao_atual'] or None,
+                'foto_perfil': 'default.png',
+            } for _, dados in linhas]
+        ).all()
+
+        HistoricoService.matricular_em_massa(aluno_ids=aluno_ids)
+        db.session.commit()
+        return len(aluno_ids)
+
+    @staticmethod
+    def importar_alunos(arquivo):
+        """
+        Importa os alunos do arquivo enviado. Retorna (sucesso, mensagem, relatório),
+        onde o relatório traz o total de linhas, os importados e os erros por linha.
+        """
+        try:
+            linhas = ImportacaoAlunoService.ler_arquivo(arquivo)
+        except ValueError as e:
+            return False, str(e), None
+
+        tamanho_lote = current_app.config['IMPORTACAO_ALUNOS_LOTE']
+        turmas_por_nome = dict(db.session.execute(select(Turma.nome, Turma.id)).all())
+        vistos = {'matricula': set(), 'email': set()}
+        relatorio = {'total': 0, 'importados': 0, 'erros': []}
+
+        try:
+            pool = _get_pool()
+            while True:
+                lote = list(itertools.islice(linhas, tamanho_lote))
+                if not lote:
+                    break
+                relatorio['total'] += len(lote)
+
+                validas, erros = ImportacaoAlunoService._validar_lote(lote, turmas_por_nome, vistos)
+                relatorio['erros'].extend(erros)
+                if not validas:
+                    continue
+
+                hashes = list(pool.map(_hash_senha, [dados['senha'] for _, dados in validas], chunksize=16))
+                try:
+                    relatorio['importados'] += ImportacaoAlunoService._gravar_lote(validas, hashes, turmas_por_nome)
+                except IntegrityError:
+                    db.session.rollback()
+                    relatorio['erros'].extend(
+                        {'linha': numero, 'matricula': dados['matricula'],
+                         'mensagem': "Lote não gravado: conflito de matrícula ou e-mail com um cadastro simultâneo."}
+                        for numero, dados in validas
+                    )
+        except (UnicodeDecodeError, csv.Error) as e:
+            db.session.rollback()
+            return False, f"Não foi possível ler o arquivo: {e}", relatorio
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Erro inesperado na importação de alunos: {e}")
+            return False, f"Erro na importação: {str(e)}", relatorio
+
+        relatorio['erros'].sort(key=lambda erro: erro['linha'])
+        message = f"{relatorio['importados']} de {relatorio['total']} aluno(s) importado(s)."
+        if relatorio['erros']:
+            message += f" {len(relatorio['erros'])} linha(s) com erro."
+        return True, message, relatorio
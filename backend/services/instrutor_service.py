@@ -1,6 +1,7 @@
 from ..models.database import db
 from ..models.instrutor import Instrutor
 from ..models.user import User
+from .auth_service import AuthService
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from flask import current_app
@@ -54,6 +55,7 @@ class InstrutorService:
             )
             db.session.add(novo_instrutor)
             db.session.commit()
+            AuthService.invalidar_usuario(user_id)
             return True, "Perfil de instrutor cadastrado com sucesso!"
         except IntegrityError:
             db.session.rollback()
@@ -112,6 +114,7 @@ class InstrutorService:
             instrutor.is_rr = is_rr
 
             db.session.commit()
+            AuthService.invalidar_usuario(instrutor.user_id)
             return True, "Perfil do instrutor atualizado com sucesso!"
         except IntegrityError:
             db.session.rollback()
@@ -0,0 +1,109 @@
+from collections import defaultdict
+from sqlalchemy import select, func, insert
+from flask import current_app
+from ..models.database import db
+from ..models.horario import Horario
+from ..models.semana import Semana
+from ..models.periodo_pagamento import PeriodoPagamento
+from ..models.saldo_horas_pagas import SaldoHorasPagas
+
+
+class PagamentoService:
+    @staticmethod
+    def get_periodos_fechados():
+        return db.session.scalars(
+            select(PeriodoPagamento).order_by(PeriodoPagamento.data_fim.desc())
+        ).all()
+
+    @staticmethod
+    def get_ultimo_fechamento_antes(data):
+        """Último período fechado que termina antes da data informada."""
+        return db.session.scalars(
+            select(PeriodoPagamento)
+            .where(PeriodoPagamento.data_fim < data)
+            .order_by(PeriodoPagamento.data_fim.desc())
+        ).first()
+
+    @staticmethod
+    def _somar_horas_confirmadas(saldo, semana_inicio_apos=None, semana_inicio_ate=None, semana_inicio_antes=None):
+        """Acumula em 'saldo' as horas confirmadas das semanas dentro dos limites de data de início."""
+        query = (
+            select(Horario.instrutor_id, Horario.disciplina_id, func.sum(Horario.duracao))
+            .join(Semana, Horario.semana_id == Semana.id)
+            .where(Horario.status == 'confirmado')
+            .group_by(Horario.instrutor_id, Horario.disciplina_id)
+        )
+        if semana_inicio_apos is not None:
+            query = query.where(Semana.data_inicio > semana_inicio_apos)
+        if semana_inicio_ate is not None:
+            query = query.where(Semana.data_inicio <= semana_inicio_ate)
+        if semana_inicio_antes is not None:
+            query = query.where(Semana.data_inicio < semana_inicio_antes)
+
+        for instrutor_id, disciplina_id, total in db.session.execute(query).all():
+            saldo[(instrutor_id, disciplina_id)] += total or 0
+        return saldo
+
+    @staticmethod
+    def _saldo_do_periodo(periodo):
+        saldo = defaultdict(int)
+        if periodo:
+            for instrutor_id, disciplina_id, horas in db.session.execute(
+                select(SaldoHorasPagas.instrutor_id, SaldoHorasPagas.disciplina_id, SaldoHorasPagas.horas)
+                .where(SaldoHorasPagas.periodo_id == periodo.id)
+            ).all():
+                saldo[(instrutor_id, disciplina_id)] = horas
+        return saldo
+
+    @staticmethod
+    def get_horas_pagas_anteriormente(data_inicio):
+        """
+        Retorna {(instrutor_id, disciplina_id): horas} confirmadas em semanas que
+        começam antes de 'data_inicio'. Lê o saldo congelado do último período
+        fechado e agrega apenas as semanas ainda abertas depois dele.
+        """
+        ultimo = PagamentoService.get_ultimo_fechamento_antes(data_inicio)
+        saldo = PagamentoService._saldo_do_periodo(ultimo)
+        return PagamentoService._somar_horas_confirmadas(
+            saldo,
+            semana_inicio_apos=ultimo.data_fim if ultimo else None,
+            semana_inicio_antes=data_inicio
+        )
+
+    @staticmethod
+    def fechar_periodo(data_inicio, data_fim, user_id=None):
+        if data_fim < data_inicio:
+            return False, "A data de fim deve ser posterior à data de início."
+
+        posterior = db.session.scalars(
+            select(PeriodoPagamento).where(PeriodoPagamento.data_fim >= data_fim)
+        ).first()
+        if posterior:
+            return False, (f"Já existe um período fechado até {posterior.data_fim.strftime('%d/%m/%Y')}. "
+                           "Os períodos devem ser fechados em ordem cronológica.")
+
+        try:
+            anterior = PagamentoService.get_ultimo_fechamento_antes(data_fim)
+            saldo = PagamentoService._saldo_do_periodo(anterior)
+            PagamentoService._somar_horas_confirmadas(
+                saldo,
+                semana_inicio_apos=anterior.data_fim if anterior else None,
+                semana_inicio_ate=data_fim
+            )
+
+            periodo = PeriodoPagamento(data_inicio=data_inicio, data_fim=data_fim, fechado_por=user_id)
+            db.session.add(periodo)
+            db.session.flush()
+
+            if saldo:
+                db.session.execute(insert(SaldoHorasPagas), [
+                    {'periodo_id': periodo.id, 'instrutor_id': instrutor_id,
+                     'disciplina_id': disciplina_id, 'horas': horas}
+                    for (instrutor_id, disciplina_id), horas in saldo.items()
+                ])
+            db.session.commit()
+            return True, f"Período de {data_inicio.strftime('%d/%m/%Y')} a {data_fim.strftime('%d/%m/%Y')} fechado com sucesso!"
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Erro ao fechar período de pagamento: {e}")
+            return False, f"Erro ao fechar período: {str(e)}"
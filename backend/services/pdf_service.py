@@ -0,0 +1,41 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _render_pdf(html: str) -> bytes:
+    # Executado nos processos filhos: a WeasyPrint só é carregada ali
+    from weasyprint import HTML
+    return HTML(string=html).write_pdf()
+
+
+class PdfService:
+    """
+    Renderiza PDFs em um pool de processos de tamanho limitado, para que a
+    WeasyPrint (CPU intensiva) não dispute o GIL com as requisições web.
+    """
+
+    @staticmethod
+    def _get_pool():
+        global _pool
+        if _pool is None:
+            with _pool_lock:
+                if _pool is None:
+                    _pool = ProcessPoolExecutor(
+                        max_workers=current_app.config['RELATORIO_PDF_PROCESSOS'],
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+        return _pool
+
+    @staticmethod
+    def submit(html: str):
+        """Agenda a renderização e retorna um Future com os bytes do PDF."""
+        return PdfService._get_pool().submit(_render_pdf, html)
+
+    @staticmethod
+    def render(html: str) -> bytes:
+        return PdfService.submit(html).result()
@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from flask import current_app
+
+_CHAVE_RE = re.compile(r'^[0-9a-f]{64}$')
+_evict_lock = threading.Lock()
+
+
+class RelatorioCacheService:
+    """
+    Cache em disco dos PDFs de relatório. A chave é o hash dos parâmetros do
+    relatório (datas, tipo, instrutores e nomes das assinaturas) somado à
+    versão dos dados, que é o digest das horas agregadas do período. Qualquer
+    escrita em 'horarios' que altere o relatório gera uma nova chave.
+    """
+
+    @staticmethod
+    def _pasta():
+        return current_app.config['RELATORIO_PDF_CACHE_DIR']
+
+    @staticmethod
+    def chave(parametros: dict, dados_relatorio) -> str:
+        conteudo = json.dumps({'parametros': parametros, 'dados': dados_relatorio},
+                              sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def chave_valida(chave: str) -> bool:
+        return bool(chave and _CHAVE_RE.match(chave))
+
+    @staticmethod
+    def nome_arquivo(chave: str) -> str:
+        return f"{chave}.pdf"
+
+    @staticmethod
+    def caminho(chave: str) -> str:
+        return os.path.join(RelatorioCacheService._pasta(), RelatorioCacheService.nome_arquivo(chave))
+
+    @staticmethod
+    def get(chave: str):
+        """Retorna o caminho do PDF em cache (marcando-o como usado) ou None."""
+        if not RelatorioCacheService.chave_valida(chave):
+            return None
+        caminho = RelatorioCacheService.caminho(chave)
+        try:
+            os.utime(caminho)
+        except OSError:
+            return None
+        return caminho
+
+    @staticmethod
+    def put(chave: str, pdf: bytes) -> str:
+        pasta = RelatorioCacheService._pasta()
+        os.makedirs(pasta, exist_ok=True)
+        caminho = RelatorioCacheService.caminho(chave)
+        tmp_path = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(pdf)
+        os.replace(tmp_path, caminho)
+        RelatorioCacheService.evict(manter=caminho)
+        return caminho
+
+    @staticmethod
+    def evict(manter=None):
+        """Remove os PDFs usados há mais tempo até o total caber no limite configurado."""
+        limite = current_app.config['RELATORIO_PDF_CACHE_MAX_BYTES']
+        pasta = RelatorioCacheService._pasta()
+        with _evict_lock:
+            arquivos = []
+            total = 0
+            for entrada in os.scandir(pasta):
+                if not entrada.name.endswith('.pdf'):
+                    continue
+                try:
+                    info = entrada.stat()
+                except OSError:
+                    continue
+                arquivos.append((info.st_mtime, info.st_size, entrada.path))
+                total += info.st_size
+
+            for _, tamanho, caminho in sorted(arquivos):
+                if total <= limite:
+                    break
+                if caminho == manter:
+                    continue
+                try:
+                    os.remove(caminho)
+                    total -= tamanho
+                except OSError:
+                    continue
@@ -0,0 +1,132 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select, func, update, delete
+from ..models.database import db
+from ..models.relatorio_job import RelatorioJob
+from .relatorio_service import RelatorioService
+from .pdf_service import PdfService
+from .relatorio_cache_service import RelatorioCacheService
+
+_executor = None
+_executor_lock = threading.Lock()
+
+STATUS_ATIVOS = ('pendente', 'processando')
+
+
+def _get_executor(app):
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=app.config['RELATORIO_PDF_WORKERS'],
+                    thread_name_prefix='relatorio-pdf'
+                )
+    return _executor
+
+
+class RelatorioJobService:
+    @staticmethod
+    def get_job(job_id: int):
+        return db.session.get(RelatorioJob, job_id)
+
+    @staticmethod
+    def caminho_arquivo(job: RelatorioJob):
+        """Caminho do PDF no cache, ou None se ainda não gerado ou já removido pelo LRU."""
+        if not job.arquivo:
+            return None
+        return RelatorioCacheService.get(job.arquivo.rsplit('.', 1)[0])
+
+    @staticmethod
+    def limpar_jobs_antigos(timeout_minutos=None):
+        """
+        Marca como 'erro' as tarefas ativas além do prazo, que nenhum worker
+        vai concluir (processo reiniciado ou encerrado no meio da geração),
+        e apaga as finalizadas além da retenção. Com timeout_minutos=0 todas
+        as ativas expiram, o que só é seguro com a aplicação parada.
+        Retorna (expiradas, apagadas).
+        """
+        if timeout_minutos is None:
+            timeout_minutos = current_app.config['RELATORIO_PDF_TIMEOUT_MINUTOS']
+        agora = datetime.utcnow()
+        limite_ativos = agora - timedelta(minutes=timeout_minutos)
+        limite_retencao = agora - timedelta(days=current_app.config['RELATORIO_JOBS_RETENCAO_DIAS'])
+
+        expiradas = db.session.execute(
+            update(RelatorioJob)
+            .where(RelatorioJob.status.in_(STATUS_ATIVOS), RelatorioJob.criado_em <= limite_ativos)
+            .values(status='erro', erro='Geração interrompida ou excedeu o tempo limite.', concluido_em=agora)
+        ).rowcount
+        apagadas = db.session.execute(
+            delete(RelatorioJob)
+            .where(RelatorioJob.status.not_in(STATUS_ATIVOS), RelatorioJob.criado_em < limite_retencao)
+        ).rowcount
+        if expiradas or apagadas:
+            db.session.commit()
+            current_app.logger.info(
+                f"Tarefas de relatório: {expiradas} expirada(s), {apagadas} apagada(s)."
+            )
+        return expiradas, apagadas
+
+    @staticmethod
+    def enfileirar(parametros: dict, user_id=None):
+        """
+        Registra a tarefa e a envia para o pool de geração de PDFs.
+        Retorna (sucesso, mensagem, job).
+        """
+        RelatorioJobService.limpar_jobs_antigos()
+        ativos = db.session.scalar(
+            select(func.count(RelatorioJob.id)).where(RelatorioJob.status.in_(STATUS_ATIVOS))
+        )
+        if ativos >= current_app.config['RELATORIO_PDF_MAX_FILA']:
+            return False, "Há muitos relatórios em geração no momento. Tente novamente em instantes.", None
+
+        job = RelatorioJob(
+            tipo=parametros.get('tipo', 'mensal'),
+            parametros=json.dumps(parametros),
+            criado_por=user_id
+        )
+        db.session.add(job)
+        db.session.commit()
+
+        app = current_app._get_current_object()
+        _get_executor(app).submit(RelatorioJobService._executar, app, job.id)
+        return True, "Relatório enviado para geração.", job
+
+    @staticmethod
+    def _executar(app, job_id: int):
+        with app.app_context():
+            job = db.session.get(RelatorioJob, job_id)
+            if not job or job.status != 'pendente':
+                # Expirada pela limpeza antes de chegar a vez dela no pool
+                return
+            try:
+                job.status = 'processando'
+                db.session.commit()
+
+                parametros = json.loads(job.parametros)
+                dados_relatorio = RelatorioService.get_dados_relatorio(parametros)
+                chave = RelatorioCacheService.chave(parametros, dados_relatorio)
+                if not RelatorioCacheService.get(chave):
+                    html = RelatorioService.render_relatorio_horas_aula(parametros, dados_relatorio)
+                    RelatorioCacheService.put(chave, PdfService.render(html))
+
+                nome_arquivo = RelatorioCacheService.nome_arquivo(chave)
+                job.arquivo = nome_arquivo
+                job.status = 'concluido'
+                job.concluido_em = datetime.utcnow()
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                app.logger.error(f"Erro ao gerar relatório (job {job_id}): {e}")
+                job = db.session.get(RelatorioJob, job_id)
+                if job:
+                    job.status = 'erro'
+                    job.erro = str(e)[:500]
+                    job.concluido_em = datetime.utcnow()
+                    db.session.commit()
+            finally:
+                db.session.remove()
@@ -0,0 +1,108 @@
+import zipfile
+from concurrent.futures import wait, FIRST_COMPLETED
+from flask import current_app
+from werkzeug.utils import secure_filename
+from .relatorio_service import RelatorioService
+from .relatorio_cache_service import RelatorioCacheService
+from .pdf_service import PdfService
+
+
+class _SaidaZip:
+    """
+    Destino não posicionável para o ZipFile: acumula apenas os bytes escritos
+    desde a última coleta, de modo que cada entrada pode ser enviada ao cliente
+    assim que fica pronta.
+    """
+
+    def __init__(self):
+        self._partes = []
+
+    def write(self, dados):
+        self._partes.append(bytes(dados))
+        return len(dados)
+
+    def flush(self):
+        pass
+
+    def coletar(self) -> bytes:
+        dados = b''.join(self._partes)
+        self._partes.clear()
+        return dados
+
+
+def _nome_arquivo(info) -> str:
+    nome = secure_filename(f"{info.id_func or ''}_{info.nome_completo or ''}".strip('_'))
+    return f"{nome or f'instrutor_{info.id}'}.pdf"
+
+
+class RelatorioLoteService:
+    @staticmethod
+    def gerar_zip_por_instrutor(parametros: dict):
+        """
+        Gera um PDF por instrutor e entrega um ZIP em partes (gerador de bytes).
+        As renderizações rodam em paralelo no pool do PdfService, com no máximo
+        o dobro de processos em andamento para manter a memória constante; PDFs
+        já presentes no cache são reaproveitados e os novos são gravados nele.
+        """
+        parametros = dict(parametros, tipo='por_instrutor')
+        linhas = RelatorioService.get_dados_relatorio(parametros)
+        limite = max(1, current_app.config['RELATORIO_PDF_PROCESSOS'] * 2)
+
+        saida = _SaidaZip()
+        pendentes = {}
+        erros = []
+        nomes_usados = set()
+
+        def gravar_concluidos(modo):
+            concluidos, _ = wait(pendentes, return_when=modo)
+            for future in concluidos:
+                chave, nome = pendentes.pop(future)
+                try:
+                    pdf = future.result()
+                except Exception as e:
+                    current_app.logger.error(f"Erro ao gerar PDF do lote ({nome}): {e}")
+                    erros.append(f"{nome}: {e}")
+                    continue
+                RelatorioCacheService.put(chave, pdf)
+                zf.writestr(nome, pdf)
+
+        try:
+            with zipfile.ZipFile(saida, 'w', compression=zipfile.ZIP_STORED) as zf:
+                for linha in linhas:
+                    if linha.info is None:
+                        # Instrutor removido entre as consultas do relatório: sem
+                        # ele não há nome de arquivo nem filtro para o PDF individual
+                        current_app.logger.warning("Lote de relatórios: aulas de instrutor não encontrado ignoradas.")
+                        erros.append("Aulas de um instrutor não encontrado foram ignoradas.")
+                        continue
+                    nome = _nome_arquivo(linha.info)
+                    if nome in nomes_usados:
+                        nome = f"{nome[:-4]}_{linha.info.id}.pdf"
+                    nomes_usados.add(nome)
+
+                    parametros_instrutor = dict(parametros, instrutor_ids=[linha.info.id])
+                    dados = [linha]
+                    chave = RelatorioCacheService.chave(parametros_instrutor, dados)
+
+                    caminho = RelatorioCacheService.get(chave)
+                    if caminho:
+                        with open(caminho, 'rb') as f:
+                            zf.writestr(nome, f.read())
+                    else:
+                        html = RelatorioService.render_relatorio_horas_aula(parametros_instrutor, dados)
+                        pendentes[PdfService.submit(html)] = (chave, nome)
+                        if len(pendentes) >= limite:
+                            gravar_concluidos(FIRST_COMPLETED)
+                    yield saida.coletar()
+
+                while pendentes:
+                    gravar_concluidos(FIRST_COMPLETED)
+                    yield saida.coletar()
+
+                if erros:
+                    zf.writestr('ERROS.txt', "\n".join(erros))
+            yield saida.coletar()
+        finally:
+            # Cliente desconectou no meio do download: não renderiza o restante
+            for future in pendentes:
+                future.cancel()
@@ -4,9 +4,28 @@ from ..models.semana import Semana
 from ..models.instrutor import Instrutor
 from ..models.disciplina import Disciplina
 from ..models.user import User
+from .pagamento_service import PagamentoService
 from sqlalchemy import select, func, and_
-from sqlalchemy.orm import joinedload
-from collections import defaultdict
+from collections import defaultdict, namedtuple
+from datetime import date
+from flask import render_template
+
+# Linhas imutáveis entregues ao template do relatório (sem instâncias ORM)
+InstrutorRelatorio = namedtuple('InstrutorRelatorio', ['id', 'posto_graduacao', 'id_func', 'nome_completo'])
+DisciplinaRelatorio = namedtuple('DisciplinaRelatorio', ['nome', 'ch_total', 'ch_paga_anteriormente', 'ch_a_pagar'])
+LinhaRelatorio = namedtuple('LinhaRelatorio', ['info', 'disciplinas'])
+
+VALOR_HORA_AULA = 55.19
+
+# Nomes dos meses sem depender do locale do servidor (setlocale altera o processo inteiro)
+MESES = ['janeiro', 'fevereiro', 'março', 'abril', 'maio', 'junho', 'julho',
+         'agosto', 'setembro', 'outubro', 'novembro', 'dezembro']
+
+
+def _ordem_id_func(linha):
+    id_func = linha.info.id_func if linha.info else None
+    return int(id_func) if id_func and id_func.isdigit() else float('inf')
+
 
 class RelatorioService:
     @staticmethod
@@ -20,10 +39,6 @@ class RelatorioService:
             select(Semana.id).where(and_(Semana.data_inicio <= data_fim, Semana.data_fim >= data_inicio))
         ).all()
         
-        semanas_periodo_anterior = db.session.scalars(
-            select(Semana.id).where(Semana.data_inicio < data_inicio)
-        ).all()
-
         query_a_pagar = (
             select(
                 Horario.instrutor_id,
@@ -47,54 +62,86 @@ class RelatorioService:
             query_a_pagar.group_by(Horario.instrutor_id, Horario.disciplina_id)
         ).all()
 
-        aulas_pagas_anteriormente = db.session.execute(
-            select(
-                Horario.instrutor_id,
-                Horario.disciplina_id,
-                func.sum(Horario.duracao).label('total_horas')
-            ).where(
-                Horario.semana_id.in_(semanas_periodo_anterior),
-                Horario.status == 'confirmado'
-            ).group_by(Horario.instrutor_id, Horario.disciplina_id)
-        ).all()
-        
-        mapa_ch_paga = {
-            (aula.instrutor_id, aula.disciplina_id): aula.total_horas
-            for aula in aulas_pagas_anteriormente
-        }
+        mapa_ch_paga = PagamentoService.get_horas_pagas_anteriormente(data_inicio)
 
-        instrutores_dados = defaultdict(lambda: {
-            'info': None,
-            'disciplinas': []
-        })
+        instrutor_ids = {aula.instrutor_id for aula in aulas_a_pagar}
+        disciplina_ids = {aula.disciplina_id for aula in aulas_a_pagar}
 
-        for aula in aulas_a_pagar:
-            instrutor_id = aula.instrutor_id
-            disciplina_id = aula.disciplina_id
-            
-            if not instrutores_dados[instrutor_id]['info']:
-                instrutor = db.session.get(Instrutor, instrutor_id)
-                if instrutor:
-                    instrutores_dados[instrutor_id]['info'] = instrutor
-
-            disciplina = db.session.get(Disciplina, disciplina_id)
-            ch_total = disciplina.carga_horaria_prevista if disciplina else 0
-            
-            ch_paga_anteriormente = mapa_ch_paga.get((instrutor_id, disciplina_id), 0)
-
-            disciplina_info = {
-                'nome': disciplina.materia if disciplina else "Disciplina não encontrada",
-                'ch_total': ch_total,
-                'ch_paga_anteriormente': ch_paga_anteriormente,
-                'ch_a_pagar': aula.total_horas,
+        instrutores = {}
+        if instrutor_ids:
+            instrutores = {
+                row.id: InstrutorRelatorio(row.id, row.posto_graduacao, row.id_func, row.nome_completo)
+                for row in db.session.execute(
+                    select(Instrutor.id, Instrutor.posto_graduacao, User.id_func, User.nome_completo)
+                    .outerjoin(User, Instrutor.user_id == User.id)
+                    .where(Instrutor.id.in_(instrutor_ids))
+                ).all()
             }
-            
-            instrutores_dados[instrutor_id]['disciplinas'].append(disciplina_info)
-        
-        # Converte para lista e ordena pela Id. Func. do usuário associado
-        resultado_final = sorted(
-            instrutores_dados.values(), 
-            key=lambda x: (int(x['info'].user.id_func) if x['info'] and x['info'].user and x['info'].user.id_func.isdigit() else float('inf'))
+
+        disciplinas = {}
+        if disciplina_ids:
+            disciplinas = {
+                row.id: row
+                for row in db.session.execute(
+                    select(Disciplina.id, Disciplina.materia, Disciplina.carga_horaria_prevista)
+                    .where(Disciplina.id.in_(disciplina_ids))
+                ).all()
+            }
+
+        disciplinas_por_instrutor = defaultdict(list)
+        for aula in aulas_a_pagar:
+            disciplina = disciplinas.get(aula.disciplina_id)
+            disciplinas_por_instrutor[aula.instrutor_id].append(DisciplinaRelatorio(
+                nome=disciplina.materia if disciplina else "Disciplina não encontrada",
+                ch_total=disciplina.carga_horaria_prevista if disciplina else 0,
+                ch_paga_anteriormente=mapa_ch_paga.get((aula.instrutor_id, aula.disciplina_id), 0),
+                ch_a_pagar=aula.total_horas,
+            ))
+
+        # Ordena pela Id. Func. do usuário associado
+        return sorted(
+            (LinhaRelatorio(instrutores.get(instrutor_id), tuple(itens))
+             for instrutor_id, itens in disciplinas_por_instrutor.items()),
+            key=_ordem_id_func
         )
-        
-        return resultado_final
\ No newline at end of file
+
+    @staticmethod
+    def get_dados_relatorio(parametros: dict):
+        """Agrega os dados do relatório a partir dos parâmetros do formulário (datas em ISO)."""
+        return RelatorioService.get_horas_aula_por_instrutor(
+            date.fromisoformat(parametros['data_inicio']),
+            date.fromisoformat(parametros['data_fim']),
+            parametros.get('tipo', 'mensal') == 'efetivo_rr',
+            parametros.get('instrutor_ids') or None
+        )
+
+    @staticmethod
+    def render_relatorio_horas_aula(parametros: dict, dados_relatorio=None) -> str:
+        """
+        Monta o HTML do relatório de horas-aula a partir dos parâmetros do
+        formulário (datas em ISO), usado tanto na pré-visualização quanto na
+        geração do PDF.
+        """
+        report_type = parametros.get('tipo', 'mensal')
+        data_inicio = date.fromisoformat(parametros['data_inicio'])
+        data_fim = date.fromisoformat(parametros['data_fim'])
+
+        if dados_relatorio is None:
+            dados_relatorio = RelatorioService.get_dados_relatorio(parametros)
+
+        # String de Mês e Ano formatada corretamente
+        nome_mes_ano = f"{MESES[data_inicio.month - 1]} de {data_inicio.year}".capitalize()
+
+        titulo_curso = f"NOME DO CURSO: {parametros.get('curso_nome', '')}"
+        if report_type == 'efetivo_rr':
+            titulo_curso += " (EFETIVO RR)"
+
+        return render_template('relatorios/pdf_template.html',
+                               dados=dados_relatorio,
+                               data_inicio=data_inicio,
+                               data_fim=data_fim,
+                               titulo_curso=titulo_curso,
+                               nome_mes_ano=nome_mes_ano,
+                               comandante_nome=parametros.get('comandante_nome', ''),
+                               auxiliar_nome=parametros.get('auxiliar_nome', ''),
+                               valor_hora_aula=VALOR_HORA_AULA)
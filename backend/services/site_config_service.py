@@ -1,8 +1,73 @@
+import os
+import threading
+from types import MappingProxyType
+from flask import current_app
 from ..models.database import db
 from ..models.site_config import SiteConfig
 from sqlalchemy import select
 
+# Cache local do processo: {arquivo_de_versao: (carimbo, snapshot)}
+_snapshot_cache = {}
+_snapshot_lock = threading.Lock()
+
+
+def _version_file():
+    return current_app.config['SITE_CONFIG_VERSION_FILE']
+
+
+def _read_version_stamp(path):
+    """
+    Lê o carimbo de versão das configurações. O carimbo combina o contador
+    gravado no arquivo com o mtime, para que todos os workers percebam a
+    alteração sem consultar a tabela site_configs a cada requisição.
+    """
+    try:
+        with open(path, 'r') as f:
+            counter = int(f.read().strip() or 0)
+        return counter, os.stat(path).st_mtime_ns
+    except (OSError, ValueError):
+        return 0, 0
+
+
 class SiteConfigService:
+
+    @staticmethod
+    def get_config_snapshot():
+        """
+        Retorna um dicionário imutável com todas as configurações, recarregado
+        do banco apenas quando o carimbo de versão muda.
+        """
+        path = _version_file()
+        stamp = _read_version_stamp(path)
+        cached = _snapshot_cache.get(path)
+        if cached and cached[0] == stamp:
+            return cached[1]
+
+        with _snapshot_lock:
+            cached = _snapshot_cache.get(path)
+            if cached and cached[0] == stamp:
+                return cached[1]
+            configs = db.session.execute(
+                select(SiteConfig.config_key, SiteConfig.config_value)
+            ).all()
+            snapshot = MappingProxyType({key: value for key, value in configs})
+            _snapshot_cache[path] = (stamp, snapshot)
+            return snapshot
+
+    @staticmethod
+    def invalidate_cache():
+        """
+        Incrementa o contador de versão compartilhado entre os processos.
+        Deve ser chamado somente depois do commit da escrita.
+        """
+        path = _version_file()
+        with _snapshot_lock:
+            counter, _ = _read_version_stamp(path)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(str(counter + 1))
+            os.replace(tmp_path, path)
+            _snapshot_cache.pop(path, None)
     
     @staticmethod
     def get_config(key: str, default_value: str = None):
@@ -40,6 +105,7 @@ class SiteConfigService:
             db.session.add(config)
         
         db.session.commit()
+        SiteConfigService.invalidate_cache()
         return config
     
     @staticmethod
@@ -95,12 +161,11 @@ class SiteConfigService:
             ('turma_8_icon', '', 'image', 'Ícone da Turma 8', 'turmas'),
         ]
         
+        existing_keys = set(db.session.scalars(select(SiteConfig.config_key)).all())
+        added = False
+
         for key, value, config_type, description, category in defaults:
-            existing = db.session.execute(
-                select(SiteConfig).where(SiteConfig.config_key == key)
-            ).scalar_one_or_none()
-            
-            if not existing:
+            if key not in existing_keys:
                 config = SiteConfig(
                     config_key=key,
                     config_value=value,
@@ -109,5 +174,8 @@ class SiteConfigService:
                     category=category
                 )
                 db.session.add(config)
+                added = True
         
-        db.session.commit()
\ No newline at end of file
+        if added:
+            db.session.commit()
+            SiteConfigService.invalidate_cache()
\ No newline at end of file
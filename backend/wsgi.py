@@ -0,0 +1,11 @@
+"""
+Ponto de entrada WSGI: gunicorn backend.wsgi:app
+
+Servido pelo gunicorn, o perfil padrão é o de produção; APP_CONFIG=dev ou
+APP_CONFIG=bench escolhe outro explicitamente.
+"""
+import os
+from backend.app import create_app
+from backend.config import get_config
+
+app = create_app(get_config(os.environ.get('APP_CONFIG') or 'prod'))
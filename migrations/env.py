@@ -90,13 +90,31 @@ def run_migrations_online():
                 directives[:] = []
                 logger.info('No changes in schema detected.')
 
+    # O índice FTS5 (busca_pessoas e suas tabelas-sombra) é mantido fora dos
+    # modelos; sem este filtro o autogenerate proporia removê-lo
+    def include_name(name, type_, parent_names):
+        if type_ == 'table':
+            return not (name or '').startswith('busca_pessoas')
+        return True
+
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    if conf_args.get("include_name") is None:
+        conf_args["include_name"] = include_name
 
     connectable = get_engine()
 
     with connectable.connect() as connection:
+        # As migrações em lote do SQLite recriam tabelas; com as chaves
+        # estrangeiras ativas o DROP das tabelas antigas falharia
+        if connection.dialect.name == 'sqlite':
+            connection.exec_driver_sql('PRAGMA foreign_keys=OFF')
+            # O PRAGMA abre uma transação implícita (autobegin); sem encerrá-la
+            # aqui, a transação do Alembic ficaria aninhada nela e as migrações
+            # seriam desfeitas ao fechar a conexão
+            connection.commit()
+
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
@@ -0,0 +1,40 @@
+"""Cria tabela carga_horaria_realizada
+
+Revision ID: 0b4962c72fe5
+Revises: 1cb7ad5daa43
+Create Date: 2025-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b4962c72fe5'
+down_revision = '1cb7ad5daa43'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('carga_horaria_realizada',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('disciplina_id', sa.Integer(), nullable=False),
+    sa.Column('pelotao', sa.String(length=50), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('horas', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['disciplina_id'], ['disciplinas.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('disciplina_id', 'pelotao', 'status', name='uq_carga_horaria_realizada')
+    )
+
+    # Popula os contadores com as aulas já existentes
+    op.execute(
+        "INSERT INTO carga_horaria_realizada (disciplina_id, pelotao, status, horas) "
+        "SELECT disciplina_id, pelotao, status, SUM(duracao) FROM horarios "
+        "GROUP BY disciplina_id, pelotao, status"
+    )
+
+
+def downgrade():
+    op.drop_table('carga_horaria_realizada')
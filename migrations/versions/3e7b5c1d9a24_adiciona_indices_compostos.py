@@ -0,0 +1,52 @@
+"""Adiciona indices compostos para as consultas do quadro de horarios e relatorios
+
+Revision ID: 3e7b5c1d9a24
+Revises: 9c41d7e2a8f0
+Create Date: 2025-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3e7b5c1d9a24'
+down_revision = '9c41d7e2a8f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('horarios', schema=None) as batch_op:
+        batch_op.create_index('ix_horarios_grade', ['pelotao', 'semana_id', 'dia_semana', 'periodo'], unique=False)
+        batch_op.create_index('ix_horarios_semana_status', ['semana_id', 'status'], unique=False)
+        batch_op.create_index('ix_horarios_instrutor_status', ['instrutor_id', 'status'], unique=False)
+
+    with op.batch_alter_table('disciplina_turmas', schema=None) as batch_op:
+        batch_op.create_index('ix_disciplina_turmas_pelotao_disciplina', ['pelotao', 'disciplina_id'], unique=False)
+        batch_op.create_index('ix_disciplina_turmas_instrutor_id_1', ['instrutor_id_1'], unique=False)
+        batch_op.create_index('ix_disciplina_turmas_instrutor_id_2', ['instrutor_id_2'], unique=False)
+
+    with op.batch_alter_table('historico_disciplinas', schema=None) as batch_op:
+        batch_op.create_index('ix_historico_disciplinas_aluno_disciplina', ['aluno_id', 'disciplina_id'], unique=False)
+
+    with op.batch_alter_table('semanas', schema=None) as batch_op:
+        batch_op.create_index('ix_semanas_ciclo_data_inicio', ['ciclo', 'data_inicio'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('semanas', schema=None) as batch_op:
+        batch_op.drop_index('ix_semanas_ciclo_data_inicio')
+
+    with op.batch_alter_table('historico_disciplinas', schema=None) as batch_op:
+        batch_op.drop_index('ix_historico_disciplinas_aluno_disciplina')
+
+    with op.batch_alter_table('disciplina_turmas', schema=None) as batch_op:
+        batch_op.drop_index('ix_disciplina_turmas_instrutor_id_2')
+        batch_op.drop_index('ix_disciplina_turmas_instrutor_id_1')
+        batch_op.drop_index('ix_disciplina_turmas_pelotao_disciplina')
+
+    with op.batch_alter_table('horarios', schema=None) as batch_op:
+        batch_op.drop_index('ix_horarios_instrutor_status')
+        batch_op.drop_index('ix_horarios_semana_status')
+        batch_op.drop_index('ix_horarios_grade')
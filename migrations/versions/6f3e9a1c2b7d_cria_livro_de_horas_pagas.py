@@ -0,0 +1,46 @@
+"""Cria tabelas de periodos de pagamento fechados e saldos de horas pagas
+
+Revision ID: 6f3e9a1c2b7d
+Revises: 0b4962c72fe5
+Create Date: 2025-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6f3e9a1c2b7d'
+down_revision = '0b4962c72fe5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('periodos_pagamento',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('data_inicio', sa.Date(), nullable=False),
+    sa.Column('data_fim', sa.Date(), nullable=False),
+    sa.Column('fechado_em', sa.DateTime(), nullable=False),
+    sa.Column('fechado_por', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['fechado_por'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('data_fim')
+    )
+    op.create_table('saldos_horas_pagas',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('periodo_id', sa.Integer(), nullable=False),
+    sa.Column('instrutor_id', sa.Integer(), nullable=False),
+    sa.Column('disciplina_id', sa.Integer(), nullable=False),
+    sa.Column('horas', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['disciplina_id'], ['disciplinas.id'], ),
+    sa.ForeignKeyConstraint(['instrutor_id'], ['instrutores.id'], ),
+    sa.ForeignKeyConstraint(['periodo_id'], ['periodos_pagamento.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('periodo_id', 'instrutor_id', 'disciplina_id', name='uq_saldo_horas_pagas')
+    )
+
+
+def downgrade():
+    op.drop_table('saldos_horas_pagas')
+    op.drop_table('periodos_pagamento')
@@ -0,0 +1,120 @@
+"""Substitui a coluna texto pelotao por turma_id (FK) em horarios e disciplina_turmas
+
+Revision ID: 7a2d4f8e1b36
+Revises: 3e7b5c1d9a24
+Create Date: 2025-10-19 14:00:00.000000
+
+"""
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a2d4f8e1b36'
+down_revision = '3e7b5c1d9a24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('horarios', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('turma_id', sa.Integer(), nullable=True))
+    with op.batch_alter_table('disciplina_turmas', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('turma_id', sa.Integer(), nullable=True))
+
+    # Aulas cujo pelotão não corresponde a nenhuma turma continuam contando no
+    # relatório de horas-aula (pagamento): em vez de descartá-las, recria uma
+    # turma com o nome do pelotão para cada uma e registra quais foram criadas.
+    conexao = op.get_bind()
+    orfaos = [linha[0] for linha in conexao.execute(sa.text(
+        "SELECT DISTINCT pelotao FROM horarios "
+        "WHERE pelotao IS NOT NULL AND pelotao NOT IN (SELECT nome FROM turmas)"
+    ))]
+    for nome in orfaos:
+        conexao.execute(sa.text("INSERT INTO turmas (nome) VALUES (:nome)"), {'nome': nome})
+    if orfaos:
+        logging.getLogger('alembic.runtime.migration').warning(
+            "Turmas recriadas para aulas sem pelotão cadastrado: %s", ", ".join(orfaos)
+        )
+
+    op.execute("UPDATE horarios SET turma_id = (SELECT turmas.id FROM turmas WHERE turmas.nome = horarios.pelotao)")
+    op.execute("UPDATE disciplina_turmas SET turma_id = (SELECT turmas.id FROM turmas WHERE turmas.nome = disciplina_turmas.pelotao)")
+    # Vínculos de disciplina com pelotões inexistentes não têm aulas nem
+    # aparecem em nenhuma tela; são apenas configuração órfã
+    op.execute("DELETE FROM disciplina_turmas WHERE turma_id IS NULL")
+
+    with op.batch_alter_table('horarios', schema=None) as batch_op:
+        batch_op.drop_index('ix_horarios_grade')
+        batch_op.alter_column('turma_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key('fk_horarios_turma_id_turmas', 'turmas', ['turma_id'], ['id'])
+        batch_op.drop_column('pelotao')
+        batch_op.create_index('ix_horarios_grade', ['turma_id', 'semana_id', 'dia_semana', 'periodo'], unique=False)
+
+    with op.batch_alter_table('disciplina_turmas', schema=None) as batch_op:
+        batch_op.drop_index('ix_disciplina_turmas_pelotao_disciplina')
+        batch_op.alter_column('turma_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key('fk_disciplina_turmas_turma_id_turmas', 'turmas', ['turma_id'], ['id'])
+        batch_op.drop_column('pelotao')
+        batch_op.create_index('ix_disciplina_turmas_turma_disciplina', ['turma_id', 'disciplina_id'], unique=False)
+
+    # Os contadores são derivados de 'horarios': recria a tabela já com turma_id
+    op.drop_table('carga_horaria_realizada')
+    op.create_table('carga_horaria_realizada',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('disciplina_id', sa.Integer(), nullable=False),
+    sa.Column('turma_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('horas', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['disciplina_id'], ['disciplinas.id'], ),
+    sa.ForeignKeyConstraint(['turma_id'], ['turmas.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('disciplina_id', 'turma_id', 'status', name='uq_carga_horaria_realizada')
+    )
+    op.execute(
+        "INSERT INTO carga_horaria_realizada (disciplina_id, turma_id, status, horas) "
+        "SELECT disciplina_id, turma_id, status, SUM(duracao) FROM horarios "
+        "GROUP BY disciplina_id, turma_id, status"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('horarios', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('pelotao', sa.String(length=50), nullable=True))
+    with op.batch_alter_table('disciplina_turmas', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('pelotao', sa.String(length=50), nullable=True))
+
+    op.execute("UPDATE horarios SET pelotao = (SELECT turmas.nome FROM turmas WHERE turmas.id = horarios.turma_id)")
+    op.execute("UPDATE disciplina_turmas SET pelotao = (SELECT turmas.nome FROM turmas WHERE turmas.id = disciplina_turmas.turma_id)")
+
+    with op.batch_alter_table('disciplina_turmas', schema=None) as batch_op:
+        batch_op.drop_index('ix_disciplina_turmas_turma_disciplina')
+        batch_op.drop_constraint('fk_disciplina_turmas_turma_id_turmas', type_='foreignkey')
+        batch_op.drop_column('turma_id')
+        batch_op.alter_column('pelotao', existing_type=sa.String(length=50), nullable=False)
+        batch_op.create_index('ix_disciplina_turmas_pelotao_disciplina', ['pelotao', 'disciplina_id'], unique=False)
+
+    with op.batch_alter_table('horarios', schema=None) as batch_op:
+        batch_op.drop_index('ix_horarios_grade')
+        batch_op.drop_constraint('fk_horarios_turma_id_turmas', type_='foreignkey')
+        batch_op.drop_column('turma_id')
+        batch_op.alter_column('pelotao', existing_type=sa.String(length=50), nullable=False)
+        batch_op.create_index('ix_horarios_grade', ['pelotao', 'semana_id', 'dia_semana', 'periodo'], unique=False)
+
+    op.drop_table('carga_horaria_realizada')
+    op.create_table('carga_horaria_realizada',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('disciplina_id', sa.Integer(), nullable=False),
+    sa.Column('pelotao', sa.String(length=50), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('horas', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['disciplina_id'], ['disciplinas.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('disciplina_id', 'pelotao', 'status', name='uq_carga_horaria_realizada')
+    )
+    op.execute(
+        "INSERT INTO carga_horaria_realizada (disciplina_id, pelotao, status, horas) "
+        "SELECT disciplina_id, pelotao, status, SUM(duracao) FROM horarios "
+        "GROUP BY disciplina_id, pelotao, status"
+    )
@@ -0,0 +1,36 @@
+"""Cria tabela relatorio_jobs
+
+Revision ID: 9c41d7e2a8f0
+Revises: 6f3e9a1c2b7d
+Create Date: 2025-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c41d7e2a8f0'
+down_revision = '6f3e9a1c2b7d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('relatorio_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tipo', sa.String(length=30), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('parametros', sa.Text(), nullable=False),
+    sa.Column('arquivo', sa.String(length=255), nullable=True),
+    sa.Column('erro', sa.String(length=500), nullable=True),
+    sa.Column('criado_por', sa.Integer(), nullable=True),
+    sa.Column('criado_em', sa.DateTime(), nullable=False),
+    sa.Column('concluido_em', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['criado_por'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('relatorio_jobs')
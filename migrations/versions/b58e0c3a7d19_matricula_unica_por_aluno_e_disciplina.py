@@ -0,0 +1,38 @@
+"""Matricula unica por aluno e disciplina em historico_disciplinas
+
+Revision ID: b58e0c3a7d19
+Revises: 7a2d4f8e1b36
+Create Date: 2025-10-20 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b58e0c3a7d19'
+down_revision = '7a2d4f8e1b36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Remove matrículas duplicadas, mantendo a que já tem nota (ou a mais antiga)
+    op.execute(
+        "DELETE FROM historico_disciplinas WHERE id NOT IN ("
+        " SELECT (SELECT h2.id FROM historico_disciplinas h2"
+        "         WHERE h2.aluno_id = h.aluno_id AND h2.disciplina_id = h.disciplina_id"
+        "         ORDER BY (h2.nota IS NULL), h2.id LIMIT 1)"
+        " FROM historico_disciplinas h GROUP BY h.aluno_id, h.disciplina_id"
+        ")"
+    )
+
+    with op.batch_alter_table('historico_disciplinas', schema=None) as batch_op:
+        batch_op.drop_index('ix_historico_disciplinas_aluno_disciplina')
+        batch_op.create_unique_constraint('uq_historico_disciplinas_aluno_disciplina', ['aluno_id', 'disciplina_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('historico_disciplinas', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_historico_disciplinas_aluno_disciplina', type_='unique')
+        batch_op.create_index('ix_historico_disciplinas_aluno_disciplina', ['aluno_id', 'disciplina_id'], unique=False)
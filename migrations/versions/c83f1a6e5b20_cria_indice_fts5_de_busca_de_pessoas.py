@@ -0,0 +1,62 @@
+"""Cria o indice FTS5 de busca de pessoas (busca_pessoas) e seus triggers
+
+Revision ID: c83f1a6e5b20
+Revises: b58e0c3a7d19
+Create Date: 2025-10-21 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c83f1a6e5b20'
+down_revision = 'b58e0c3a7d19'
+branch_labels = None
+depends_on = None
+
+COLUNAS = 'nome_completo, nome_de_guerra, id_func, email, matricula, opm, especializacao'
+
+INSERT_PESSOA = (
+    f"INSERT INTO busca_pessoas (rowid, {COLUNAS})"
+    " SELECT u.id, u.nome_completo, u.nome_de_guerra, u.id_func, u.email,"
+    " a.matricula, a.opm, i.especializacao"
+    " FROM users u"
+    " LEFT JOIN alunos a ON a.user_id = u.id"
+    " LEFT JOIN instrutores i ON i.user_id = u.id"
+)
+
+
+def _atualizar(user_id_sql):
+    return (f"DELETE FROM busca_pessoas WHERE rowid = {user_id_sql}; "
+            f"{INSERT_PESSOA} WHERE u.id = {user_id_sql};")
+
+
+TRIGGERS = {
+    'trg_busca_users_ins': f"AFTER INSERT ON users BEGIN {_atualizar('NEW.id')} END",
+    'trg_busca_users_upd': f"AFTER UPDATE ON users BEGIN DELETE FROM busca_pessoas WHERE rowid = OLD.id; {_atualizar('NEW.id')} END",
+    'trg_busca_users_del': "AFTER DELETE ON users BEGIN DELETE FROM busca_pessoas WHERE rowid = OLD.id; END",
+    'trg_busca_alunos_ins': f"AFTER INSERT ON alunos BEGIN {_atualizar('NEW.user_id')} END",
+    'trg_busca_alunos_upd': f"AFTER UPDATE ON alunos BEGIN {_atualizar('OLD.user_id')} {_atualizar('NEW.user_id')} END",
+    'trg_busca_alunos_del': f"AFTER DELETE ON alunos BEGIN {_atualizar('OLD.user_id')} END",
+    'trg_busca_instrutores_ins': f"AFTER INSERT ON instrutores BEGIN {_atualizar('NEW.user_id')} END",
+    'trg_busca_instrutores_upd': f"AFTER UPDATE ON instrutores BEGIN {_atualizar('OLD.user_id')} {_atualizar('NEW.user_id')} END",
+    'trg_busca_instrutores_del': f"AFTER DELETE ON instrutores BEGIN {_atualizar('OLD.user_id')} END",
+}
+
+
+def upgrade():
+    op.execute(
+        f"CREATE VIRTUAL TABLE busca_pessoas USING fts5({COLUNAS},"
+        " tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    for nome, corpo in TRIGGERS.items():
+        op.execute(f"CREATE TRIGGER {nome} {corpo}")
+
+    op.execute(INSERT_PESSOA)
+
+
+def downgrade():
+    for nome in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {nome}")
+    op.execute("DROP TABLE IF EXISTS busca_pessoas")